@@ -0,0 +1,300 @@
+# This file is part of pex_config.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This software is dual licensed under the GNU General Public License and also
+# under a 3-clause BSD license. Recipients may choose which of these licenses
+# to use; please see the files gpl-3.0.txt and/or bsd_license.txt,
+# respectively.  If you choose the GPL option then the following text applies
+# (but note that there is still no warranty even if you opt for BSD instead):
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Caching of compiled configuration override code, in memory and
+optionally in a directory shared between processes.
+"""
+
+__all__ = ("setOverrideCacheDirectory",)
+
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+
+from ._savedLines import _compileSource
+
+_MAX_CACHED_PROGRAMS = 256
+"""Number of parsed override codes kept in memory (`int`)."""
+
+_PROGRAM_FORMAT = 1
+"""Version of the format of the parsed override code returned by
+`_compileSource`, to be increased whenever that format changes (`int`).
+"""
+
+_programCache = {}
+"""Parsed override code, keyed by a hash of the code, ``root`` and
+``sourceName``, from the least to the most recently used.
+"""
+
+_fileProgramCache = {}
+"""Parsed override files, keyed by path, modification time, size and root."""
+
+_overrideCacheDirectory = None
+"""Directory in which parsed override code is cached (`str` or `None`)."""
+
+
+def setOverrideCacheDirectory(directory=None):
+    """Set the directory in which compiled configuration override code is
+    cached between processes.
+
+    Parameters
+    ----------
+    directory : `str` or `None`, optional
+        Directory for the cache, which is created if needed. If `None`,
+        override code is only cached in memory.
+
+    Returns
+    -------
+    previous : `str` or `None`
+        The previous directory.
+
+    Notes
+    -----
+    `~lsst.pex.config.Config.load`, `~lsst.pex.config.Config.loadFromStream`
+    and `~lsst.pex.config.Config.loadFromString` always reuse the compiled
+    form of override code that has already been loaded in the same process.
+    With a cache directory, the compiled code is also written to a file
+    named after a hash of the code, like the ``__pycache__`` files of Python
+    modules, and read by later processes.
+    """
+    global _overrideCacheDirectory
+    previous = _overrideCacheDirectory
+    _overrideCacheDirectory = None if directory is None else os.fspath(directory)
+    return previous
+
+
+class _OverrideProgram:
+    """Compiled configuration override code, with the modules its execution
+    imports.
+
+    Parameters
+    ----------
+    code : `list` of `tuple` or `types.CodeType`
+        The result of `_compileSource`.
+    """
+
+    __slots__ = ("code", "imports", "_imported")
+
+    def __init__(self, code):
+        self.code = code
+        self.imports = None
+        self._imported = None
+
+    def recordImports(self, imports):
+        """Record the modules imported by the first execution of the code.
+
+        Parameters
+        ----------
+        imports : `set` of `str`
+            Names recorded by `~lsst.pex.config.config.RecordingImporter`.
+        """
+        self.imports = frozenset(imports)
+        # Names that failed to import are recorded too, but only the others
+        # are expected to stay loaded.
+        self._imported = tuple(name for name in self.imports if name in sys.modules)
+
+    def hasImports(self):
+        """Return whether the recorded imports apply to another execution of
+        the code (`bool`).
+
+        They do once recorded, unless a module imported by the code has been
+        removed from `sys.modules`, so that executing the code would import
+        it again.
+        """
+        if self.imports is None:
+            return False
+        modules = sys.modules
+        for name in self._imported:
+            if name not in modules:
+                return False
+        return True
+
+
+def _cacheProgram(cache, key, program):
+    """Add parsed override code to an in-memory cache.
+
+    Parameters
+    ----------
+    cache : `dict`
+        The cache, from the least to the most recently used entry.
+    key : `tuple`
+        Key of the code.
+    program : `_OverrideProgram`
+        The parsed code.
+    """
+    if len(cache) >= _MAX_CACHED_PROGRAMS:
+        # Forget the least recently used entry.
+        del cache[next(iter(cache))]
+    cache[key] = program
+
+
+def _getCachedProgram(cache, key):
+    """Return parsed override code from an in-memory cache, marking it as
+    the most recently used.
+
+    Parameters
+    ----------
+    cache : `dict`
+        The cache, from the least to the most recently used entry.
+    key : `tuple`
+        Key of the code.
+
+    Returns
+    -------
+    program : `_OverrideProgram` or `None`
+        The parsed code, or `None` if it is not in the cache.
+    """
+    program = cache.pop(key, None)
+    if program is not None:
+        cache[key] = program
+    return program
+
+
+def _readCachedProgram(cacheFile):
+    """Read parsed override code from the cache directory.
+
+    Parameters
+    ----------
+    cacheFile : `str`
+        Name of the cache file.
+
+    Returns
+    -------
+    program : `list` of `tuple` or `types.CodeType` or `None`
+        The result of `_compileSource`, or `None` if the file cannot be read
+        or was written with another format.
+    """
+    try:
+        with open(cacheFile, "rb") as f:
+            payload = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if type(payload) is not tuple or len(payload) != 2 or payload[0] != _PROGRAM_FORMAT:
+        return None
+    return payload[1]
+
+
+def _writeCachedProgram(cacheFile, program):
+    """Write parsed override code to the cache directory.
+
+    Parameters
+    ----------
+    cacheFile : `str`
+        Name of the cache file.
+    program : `list` of `tuple` or `types.CodeType`
+        The result of `_compileSource`.
+
+    Notes
+    -----
+    The file is written under a temporary name and renamed, so that other
+    processes never read a partial file. Errors are ignored, since the
+    cache is an optimization only.
+    """
+    directory = os.path.dirname(cacheFile)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        f = tempfile.NamedTemporaryFile(dir=directory, delete=False)
+    except OSError:
+        return
+    try:
+        with f:
+            marshal.dump((_PROGRAM_FORMAT, program), f)
+        os.replace(f.name, cacheFile)
+    except (OSError, ValueError):
+        try:
+            os.unlink(f.name)
+        except OSError:
+            pass
+
+
+def _getProgram(source, root, sourceName):
+    """Return the compiled form of configuration override code, from a cache
+    if possible.
+
+    Parameters
+    ----------
+    source : `str` or `bytes`
+        Configuration override code.
+    root : `str`
+        Name of the root config variable.
+    sourceName : `str`
+        File name with which the code is compiled.
+
+    Returns
+    -------
+    program : `_OverrideProgram`
+        The result of `_compileSource`, with the modules it imports.
+    """
+    digest = hashlib.sha256(
+        f"{__name__}\0{_PROGRAM_FORMAT}\0{sys.implementation.cache_tag}\0{root}\0{sourceName}\0"
+        f"{type(source).__name__}\0".encode()
+    )
+    digest.update(source.encode("utf-8", "surrogatepass") if isinstance(source, str) else source)
+    key = digest.hexdigest()
+    program = _getCachedProgram(_programCache, key)
+    if program is not None:
+        return program
+    code = None
+    cacheFile = None
+    if _overrideCacheDirectory is not None:
+        cacheFile = os.path.join(_overrideCacheDirectory, f"{key}.marshal")
+        code = _readCachedProgram(cacheFile)
+    if code is None:
+        code = _compileSource(source, root, sourceName)
+        if cacheFile is not None:
+            _writeCachedProgram(cacheFile, code)
+    program = _OverrideProgram(code)
+    _cacheProgram(_programCache, key, program)
+    return program
+
+
+def _getFileProgram(filename, root):
+    """Return the compiled form of a configuration override file, from a
+    cache if possible.
+
+    Parameters
+    ----------
+    filename : `str`
+        Name of the file.
+    root : `str`
+        Name of the root config variable.
+
+    Returns
+    -------
+    program : `_OverrideProgram`
+        The result of `_compileSource`, with the modules it imports.
+    """
+    stat = os.stat(filename)
+    key = (os.path.abspath(filename), filename, stat.st_mtime_ns, stat.st_size, root)
+    program = _getCachedProgram(_fileProgramCache, key)
+    if program is None:
+        with open(filename) as f:
+            program = _getProgram(f.read(), root, filename)
+        _cacheProgram(_fileProgramCache, key, program)
+    return program
@@ -0,0 +1,616 @@
+# This file is part of pex_config.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This software is dual licensed under the GNU General Public License and also
+# under a 3-clause BSD license. Recipients may choose which of these licenses
+# to use; please see the files gpl-3.0.txt and/or bsd_license.txt,
+# respectively.  If you choose the GPL option then the following text applies
+# (but note that there is still no warranty even if you opt for BSD instead):
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Fast loading of the configuration override code written by
+`lsst.pex.config.Config.saveToStream`.
+
+The lines that ``saveToStream`` writes, such as assignments of literals to
+the fields of the root config, are parsed once and applied directly rather
+than executed as Python.
+"""
+
+__all__ = ()
+
+import ast
+import builtins
+import copy
+import inspect
+import math
+import re
+
+from .callStack import StackFrame
+
+_NOT_LITERAL = object()
+"""Returned by `_parseLiteral` for text that is not a literal."""
+
+_IDENTIFIER = r"[A-Za-z_]\w*"
+_DOTTED = rf"{_IDENTIFIER}(?:\.{_IDENTIFIER})*"
+_ITEM_KEY = r"'(?:[^'\\\n]|\\.)*'|\"(?:[^\"\\\n]|\\.)*\"|-?\d+"
+_ACCESSOR = rf"\.{_IDENTIFIER}|\[(?:{_ITEM_KEY})\]"
+_ACCESSOR_RE = re.compile(rf"\.({_IDENTIFIER})|\[({_ITEM_KEY})\]")
+_IMPORT_RE = re.compile(rf"import ({_DOTTED})\s*$")
+_NAME_RE = re.compile(rf"({_DOTTED})(\(\))?")
+_STRING_RE = re.compile(r"'[^'\\\n]*'|\"[^\"\\\n]*\"")
+_INT_RE = re.compile(r"-?(?:0+|[1-9]\d*)")
+_FLOAT_RE = re.compile(r"-?(?:(?:\d+\.\d*|\.\d+)(?:[eE][-+]?\d+)?|\d+[eE][-+]?\d+)")
+_NONFINITE = {"float('nan')": math.nan, "float('inf')": math.inf, "float('-inf')": -math.inf}
+_CONSTANTS = {"None": None, "True": True, "False": False}
+_IMMUTABLE = {int, float, str, bool, type(None), bytes, complex}
+_SIMPLE = r"'[^'\\\n]*'|\"[^\"\\\n]*\"|[-+.\w]+"
+_LIST_ITEM_RE = re.compile(rf"\s*({_SIMPLE})\s*(?:,|$)")
+_DICT_ITEM_RE = re.compile(rf"\s*('[^'\\\n]*'|\"[^\"\\\n]*\")\s*:\s*({_SIMPLE})\s*(?:,|$)")
+
+_loaderPatterns = {}
+"""Compiled line patterns for `_parseSavedLines`, keyed by root name."""
+
+_acceptsAt = {}
+"""Whether a method accepts an ``at`` argument, keyed by function."""
+
+
+def _getLoaderPatterns(root):
+    """Return the patterns for the lines written by
+    `Config.saveToStream`.
+
+    Parameters
+    ----------
+    root : `str`
+        Name of the root config variable.
+
+    Returns
+    -------
+    assign : `re.Pattern`
+        Pattern for assignments to an attribute or item under ``root``.
+    retarget : `re.Pattern`
+        Pattern for calls to ``retarget`` under ``root``.
+    check : `re.Pattern`
+        Pattern for the check of the type of ``root``.
+    """
+    patterns = _loaderPatterns.get(root)
+    if patterns is None:
+        target = rf"{re.escape(root)}(?:{_ACCESSOR})+"
+        patterns = (
+            re.compile(rf"({target})\s*=(?!=)\s*(.*?)\s*$"),
+            re.compile(
+                rf"({target})\.retarget\(target=({_DOTTED}), ConfigClass=({_DOTTED})\)\s*$",
+            ),
+            re.compile(rf"assert type\({re.escape(root)}\) is ({_DOTTED}), f\"config is of type .*\"\s*$"),
+        )
+        _loaderPatterns[root] = patterns
+    return patterns
+
+
+def _parseLiteral(text):
+    """Parse the right-hand side of an assignment written by `Field.save`.
+
+    Parameters
+    ----------
+    text : `str`
+        Python source of the value.
+
+    Returns
+    -------
+    value : `object`
+        The value, or `_NOT_LITERAL` if ``text`` is not a literal.
+    """
+    if text in _CONSTANTS:
+        return _CONSTANTS[text]
+    if _INT_RE.fullmatch(text):
+        return int(text)
+    if _FLOAT_RE.fullmatch(text):
+        return float(text)
+    if text in _NONFINITE:
+        return _NONFINITE[text]
+    if text[:1] in "'\"" and len(text) > 1 and text[-1] == text[0] and _STRING_RE.fullmatch(text):
+        return text[1:-1]
+    if text[:1] == "[" and text[-1:] == "]":
+        items = _parseItems(_LIST_ITEM_RE, text[1:-1])
+        if items is not None:
+            return [item for (item,) in items]
+    elif text[:1] == "{" and text[-1:] == "}":
+        items = _parseItems(_DICT_ITEM_RE, text[1:-1])
+        if items is not None:
+            return dict(items)
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return _NOT_LITERAL
+
+
+def _parseItems(pattern, text):
+    """Parse the items of a `list` or `dict` of simple literals.
+
+    Parameters
+    ----------
+    pattern : `re.Pattern`
+        Pattern for one item, with a group for each element of the item.
+    text : `str`
+        Python source of the items, without the enclosing brackets.
+
+    Returns
+    -------
+    items : `list` of `tuple` or `None`
+        The elements of each item, or `None` if ``text`` is not a sequence of
+        simple literals.
+    """
+    items = []
+    pos = 0
+    end = len(text.rstrip())
+    while pos < end:
+        match = pattern.match(text, pos)
+        if match is None:
+            return None
+        item = tuple(_parseLiteral(element) for element in match.groups())
+        if _NOT_LITERAL in item:
+            return None
+        items.append(item)
+        pos = match.end()
+    return items
+
+
+def _callWithHistory(method, *args, at, **kwargs):
+    """Call a method, passing it the call stack if it accepts one.
+
+    Parameters
+    ----------
+    method : callable
+        Bound method to call.
+    *args
+        Positional arguments for ``method``.
+    at : `list` of `~lsst.pex.config.callStack.StackFrame`
+        The call stack.
+    **kwargs
+        Keyword arguments for ``method``.
+    """
+    function = getattr(method, "__func__", method)
+    accepts = _acceptsAt.get(function)
+    if accepts is None:
+        try:
+            accepts = "at" in inspect.signature(function).parameters
+        except (TypeError, ValueError):
+            accepts = False
+        _acceptsAt[function] = accepts
+    if accepts:
+        method(*args, at=at, **kwargs)
+    else:
+        method(*args, **kwargs)
+
+
+class _CannotApplyError(Exception):
+    """Raised by `_applySavedLine` before changing anything if a line must
+    be executed instead.
+    """
+
+
+class _PathResolver:
+    """Resolve the targets of the assignments in a saved config, caching
+    the objects found along each path.
+
+    Parameters
+    ----------
+    local : `dict`
+        Local namespace of the file being loaded.
+    root : `str`
+        Name of the root config variable.
+
+    Notes
+    -----
+    Paths are the tuples of steps returned by `_parsePath`.
+    """
+
+    def __init__(self, local, root):
+        self._local = local
+        self._root = root
+        self._cache = {}
+        # Paths of the cached objects found from each path.
+        self._children = {}
+
+    def resolve(self, path):
+        """Return the object at a path.
+
+        Parameters
+        ----------
+        path : `tuple`
+            Attribute names and item keys, as returned by `_parsePath`.
+
+        Returns
+        -------
+        obj : `object`
+            The object at ``path``.
+        """
+        obj = self._cache.get(path)
+        if obj is not None:
+            return obj
+        start = 0
+        obj = self._local[self._root]
+        # Start from the longest cached prefix.
+        for end in range(len(path) - 1, 0, -1):
+            cached = self._cache.get(path[:end])
+            if cached is not None:
+                obj = cached
+                start = end
+                break
+        for end in range(start + 1, len(path) + 1):
+            attr, key = path[end - 1]
+            obj = getattr(obj, attr) if attr is not None else obj[key]
+            self._cache[path[:end]] = obj
+            self._children.setdefault(path[: end - 1], set()).add(path[:end])
+        return obj
+
+    def split(self, path):
+        """Split a path into the object that holds its last element and that
+        element.
+
+        Parameters
+        ----------
+        path : `tuple`
+            Attribute names and item keys, as returned by `_parsePath`.
+
+        Returns
+        -------
+        parent : `object`
+            The object that holds the last element.
+        attr : `str` or `None`
+            Name of the attribute, if the last element is an attribute.
+        key : `object`
+            The key, if the last element is an item.
+        """
+        parent = self._local[self._root] if len(path) == 1 else self.resolve(path[:-1])
+        attr, key = path[-1]
+        return parent, attr, key
+
+    def invalidate(self, path=None):
+        """Forget the objects found from a path.
+
+        Parameters
+        ----------
+        path : `tuple` or `None`, optional
+            Path of an object whose attributes or items may have changed, or
+            `None` to forget everything. The object at ``path`` itself is
+            kept.
+        """
+        if path is None:
+            self._cache.clear()
+            self._children.clear()
+            return
+        stack = list(self._children.pop(path, ()))
+        while stack:
+            cached = stack.pop()
+            self._cache.pop(cached, None)
+            stack.extend(self._children.pop(cached, ()))
+
+
+def _parsePath(text, root):
+    """Parse the target of a line matched by the patterns of
+    `_getLoaderPatterns`.
+
+    Parameters
+    ----------
+    text : `str`
+        Python source of ``root`` followed by attribute and item accessors
+        matching ``_ACCESSOR``.
+    root : `str`
+        Name of the root config variable.
+
+    Returns
+    -------
+    path : `tuple` of `tuple` or `None`
+        The ``(attr, key)`` pair of each accessor, where ``attr`` is `None`
+        for an item, or `None` if ``text`` cannot be split unambiguously
+        into accessors.
+    """
+    steps = []
+    pos = len(root)
+    while pos < len(text):
+        match = _ACCESSOR_RE.match(text, pos)
+        if match is None:
+            return None
+        attr, key = match.groups()
+        if attr is None:
+            if key[0] not in "'\"":
+                key = int(key)
+            elif "\\" in key:
+                try:
+                    key = ast.literal_eval(key)
+                except (ValueError, SyntaxError):
+                    return None
+                if type(key) is not str:
+                    return None
+            else:
+                key = key[1:-1]
+        steps.append((attr, key))
+        pos = match.end()
+    return tuple(steps) or None
+
+
+def _lookupName(name, globals, local):
+    """Evaluate a dotted name as ``exec`` would.
+
+    Parameters
+    ----------
+    name : `str`
+        Dotted name.
+    globals : `dict`
+        Global namespace.
+    local : `dict`
+        Local namespace.
+
+    Returns
+    -------
+    value : `object`
+        The value of ``name``.
+    """
+    first, *rest = name.split(".")
+    if first in local:
+        value = local[first]
+    elif first in globals:
+        value = globals[first]
+    elif hasattr(builtins, first):
+        value = getattr(builtins, first)
+    else:
+        raise NameError(f"name {first!r} is not defined", name=first)
+    for attr in rest:
+        value = getattr(value, attr)
+    return value
+
+
+def _parseSavedLines(text, root, sourceName):
+    """Parse configuration override code into operations that apply the
+    lines that `Config.saveToStream` writes without running them through
+    Python.
+
+    Parameters
+    ----------
+    text : `str`
+        Configuration override code.
+    root : `str`
+        Name of the root config variable.
+    sourceName : `str`
+        File name to report in tracebacks and the history.
+
+    Returns
+    -------
+    operations : `list` of `tuple` or `None`
+        The operations to pass to `_runSavedLines`, or `None` if ``text``
+        contains a statement spanning several lines and must be executed as a
+        whole.
+
+    Notes
+    -----
+    Comments, blank lines, ``import`` statements, the check of the type of
+    the root config, ``retarget`` calls, and assignments of literals, names
+    and argument-less calls to attributes and items of the root config are
+    applied directly. Consecutive lines of any other kind are compiled
+    together, provided each line is a complete statement.
+    """
+    assign, retarget, check = _getLoaderPatterns(root)
+    operations = []
+    pending = None
+    for lineno, line in enumerate(text.split("\n"), 1):
+        line = line.removesuffix("\r")
+        stripped = line.strip()
+        if not stripped or stripped[0] == "#":
+            continue
+        operation = None
+        if match := assign.match(line):
+            path = _parsePath(match[1], root)
+            value = _parseLiteral(match[2])
+            if path is None:
+                pass
+            elif value is not _NOT_LITERAL:
+                operation = ("literal", path, value)
+            elif _NAME_RE.fullmatch(match[2]):
+                operation = ("name", path, match[2])
+        elif match := retarget.match(line):
+            path = _parsePath(match[1], root)
+            if path is not None:
+                operation = ("retarget", path, (match[2], match[3]))
+        elif match := _IMPORT_RE.match(line):
+            operation = ("import", None, match[1])
+        elif match := check.match(line):
+            operation = ("check", None, match[1])
+        if operation is None:
+            try:
+                compile(line, sourceName, "exec")
+            except SyntaxError:
+                return None
+            if pending is None or pending[1] != lineno - 1:
+                pending = [lineno, lineno, [line]]
+                operations.append(pending)
+            else:
+                pending[1] = lineno
+                pending[2].append(line)
+            continue
+        operations.append(operation + (lineno, stripped))
+    return [
+        ("exec", None, _compileLines(op[2], op[0], sourceName), op[0], None) if type(op) is list else op
+        for op in operations
+    ]
+
+
+def _compileLines(lines, start, sourceName):
+    """Compile consecutive lines of code.
+
+    Parameters
+    ----------
+    lines : `list` of `str`
+        The lines.
+    start : `int`
+        Line number of the first line.
+    sourceName : `str`
+        File name to report in tracebacks.
+
+    Returns
+    -------
+    code : `types.CodeType`
+        The compiled code.
+    """
+    tree = ast.parse("\n".join(lines), sourceName, "exec")
+    ast.increment_lineno(tree, start - 1)
+    return compile(tree, sourceName, "exec")
+
+
+def _runSavedLines(operations, globals, local, root, sourceName, at):
+    """Execute configuration override code parsed by `_parseSavedLines`.
+
+    Parameters
+    ----------
+    operations : `list` of `tuple`
+        The parsed code.
+    globals : `dict`
+        Global namespace for the code.
+    local : `dict`
+        Local namespace for the code.
+    root : `str`
+        Name of the root config variable.
+    sourceName : `str`
+        File name to report in tracebacks and the history.
+    at : `list` of `~lsst.pex.config.callStack.StackFrame`
+        Call stack of the load, to which the frame of each line is added.
+    """
+    resolver = _PathResolver(local, root)
+    for kind, path, arg, lineno, content in operations:
+        if kind == "exec":
+            exec(arg, globals, local)
+            resolver.invalidate()
+            continue
+        try:
+            _applySavedLine(kind, path, arg, lineno, content, globals, local, root, sourceName, at, resolver)
+        except _CannotApplyError:
+            # Nothing has been changed yet: execute the line to raise the
+            # error that exec would.
+            resolver.invalidate()
+            exec(_compileLines([content], lineno, sourceName), globals, local)
+
+
+def _applySavedLine(kind, path, arg, lineno, content, globals, local, root, sourceName, at, resolver):
+    """Apply a line recognized by `_parseSavedLines`.
+
+    Parameters
+    ----------
+    kind : `str`
+        Kind of line.
+    path : `tuple` or `None`
+        Path of the target of an assignment or ``retarget`` call, as
+        returned by `_parsePath`.
+    arg : `object`
+        Parsed arguments of the line.
+    lineno : `int`
+        Line number.
+    content : `str`
+        Content of the line.
+    globals : `dict`
+        Global namespace for the code.
+    local : `dict`
+        Local namespace for the code.
+    root : `str`
+        Name of the root config variable.
+    sourceName : `str`
+        File name to report in the history.
+    at : `list` of `~lsst.pex.config.callStack.StackFrame`
+        Call stack of the load.
+    resolver : `_PathResolver`
+        Resolver for the targets.
+
+    Raises
+    ------
+    _CannotApplyError
+        Raised if a name or the target of the line cannot be looked up, or if
+        the check of the type of the root config fails, before the line has
+        had any effect.
+    """
+    if kind == "import":
+        local[arg.partition(".")[0]] = __import__(arg)
+        return
+    try:
+        if kind == "check":
+            if __debug__ and type(local[root]) is not _lookupName(arg, globals, local):
+                # Executing the assertion formats its message.
+                raise _CannotApplyError()
+            return
+        elif kind == "retarget":
+            target, configClass = (_lookupName(name, globals, local) for name in arg)
+            retarget = resolver.resolve(path).retarget
+        else:
+            if kind == "name":
+                value = _lookupName(arg.removesuffix("()"), globals, local)
+            parent, attr, key = resolver.split(path)
+    except Exception as error:
+        raise _CannotApplyError() from error
+    frameAt = at + [StackFrame(sourceName, lineno, "<module>", content)]
+    if kind == "retarget":
+        _callWithHistory(retarget, target=target, ConfigClass=configClass, at=frameAt)
+        resolver.invalidate(path)
+        return
+    if kind == "name":
+        if arg.endswith("()"):
+            value = value()
+    elif type(arg) in _IMMUTABLE:
+        value = arg
+    else:
+        # Parsed code is shared between loads.
+        value = copy.deepcopy(arg)
+    if attr is not None:
+        _callWithHistory(parent.__setattr__, attr, value, at=frameAt)
+    else:
+        _callWithHistory(parent.__setitem__, key, value, at=frameAt)
+    # The assignment may change other attributes or items of the parent, such
+    # as the active config of a ConfigChoiceField when its name is set.
+    resolver.invalidate(path[:-1])
+
+
+def _compileSource(source, root, sourceName):
+    """Compile configuration override code.
+
+    Parameters
+    ----------
+    source : `str` or `bytes`
+        Configuration override code.
+    root : `str`
+        Name of the root config variable.
+    sourceName : `str`
+        File name with which the code is compiled.
+
+    Returns
+    -------
+    program : `list` of `tuple` or `types.CodeType`
+        Operations for `_runSavedLines`, or a code object to execute if the
+        code cannot be split into lines.
+    """
+    text = source
+    if isinstance(source, bytes):
+        # Source with an encoding declaration or a byte order mark is left to
+        # the compiler.
+        head = source.split(b"\n", 2)[:2]
+        if source.startswith(b"\xef\xbb\xbf") or any(b"coding" in line for line in head):
+            text = None
+        else:
+            try:
+                text = source.decode()
+            except UnicodeDecodeError:
+                text = None
+    operations = None if text is None else _parseSavedLines(text, root, sourceName)
+    return operations if operations is not None else compile(source, sourceName, "exec")
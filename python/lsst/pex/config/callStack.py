@@ -25,10 +25,44 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-__all__ = ["getCallerFrame", "getStackFrame", "StackFrame", "getCallStack"]
-
+__all__ = [
+    "getCallerFrame",
+    "getStackFrame",
+    "StackFrame",
+    "CallStack",
+    "getCallStack",
+    "setLazyCallStacks",
+]
+
+import contextvars
 import inspect
 import linecache
+import sys
+from collections.abc import Sequence
+
+_lazyCallStacks = contextvars.ContextVar("lazyCallStacks", default=False)
+"""Whether `getCallStack` returns a `CallStack` by default, in the current
+context (`contextvars.ContextVar` of `bool`).
+"""
+
+_MAX_INTERNED = 100_000
+"""Size above which the interning tables are cleared (`int`).
+
+Clearing does not affect existing stacks; it only stops new stacks from
+sharing storage with them.
+"""
+
+_internedFrames = {}
+"""Interned `StackFrame` objects, keyed by code object identity and line
+number. Values are ``(code, frame)`` so the code object cannot be reused
+while its key is in the table.
+"""
+
+_internedNodes = {}
+"""Interned `CallStack` nodes, keyed by ``(parent, id(item), lineno)``. The
+node holds its item, so the item cannot be reused while its key is in the
+table.
+"""
 
 
 def getCallerFrame(relative=0):
@@ -69,7 +103,7 @@ def getStackFrame(relative=0):
         Stack frame for the caller.
     """
     frame = getCallerFrame(relative + 1)
-    return StackFrame.fromFrame(frame)
+    return _internFrame(frame.f_code, frame.f_lineno)
 
 
 class StackFrame:
@@ -97,11 +131,16 @@ class StackFrame:
     stack trace by the fact that it does not look up the source code until it
     is absolutely necessary, reducing the I/O.
 
+    Frames captured by `getCallStack` and `getStackFrame` are shared between
+    all the stacks that contain them, and file names are interned.
+
     See Also
     --------
     getStackFrame
     """
 
+    __slots__ = ("filename", "lineno", "function", "_content")
+
     _STRIP = "/python/lsst/"
     """String to strip from the ``filename`` in the constructor."""
 
@@ -109,7 +148,7 @@ class StackFrame:
         loc = filename.rfind(self._STRIP)
         if loc > 0:
             filename = filename[loc + len(self._STRIP) :]
-        self.filename = filename
+        self.filename = sys.intern(filename)
         self.lineno = lineno
         self.function = function
         self._content = content
@@ -171,17 +210,202 @@ class StackFrame:
         return result
 
 
-def getCallStack(skip=0):
+def _internFrame(code, lineno):
+    """Return the shared `StackFrame` for a line of a code object.
+
+    Parameters
+    ----------
+    code : `types.CodeType`
+        Code object being executed.
+    lineno : `int`
+        Line number being executed.
+
+    Returns
+    -------
+    frame : `StackFrame`
+        The interned frame.
+    """
+    key = (id(code), lineno)
+    entry = _internedFrames.get(key)
+    if entry is None:
+        if len(_internedFrames) >= _MAX_INTERNED:
+            _internedFrames.clear()
+        entry = (code, StackFrame(code.co_filename, lineno, code.co_name))
+        _internedFrames[key] = entry
+    return entry[1]
+
+
+class CallStack(Sequence):
+    """A call stack stored as a node of a shared tree of stack prefixes,
+    whose `StackFrame` elements are only created when they are accessed.
+
+    Parameters
+    ----------
+    frames : iterable of `StackFrame`, optional
+        Frames of the stack, ordered with the most recent frame last.
+
+    Notes
+    -----
+    Each ``CallStack`` holds its most recent frame and a reference to the
+    ``CallStack`` of its caller. Nodes are interned, so stacks captured from
+    the same code share all their common outer frames, and a history entry
+    costs a single reference. Live frames are recorded only as a code object
+    and line number, which is much cheaper than creating a `StackFrame`; most
+    recorded stacks are never looked at.
+
+    A ``CallStack`` behaves like the read-only `list` of `StackFrame` returned
+    by `getCallStack` in its default mode, and can be concatenated with such
+    lists.
+
+    See Also
+    --------
+    getCallStack
+    setLazyCallStacks
+    """
+
+    __slots__ = ("_parent", "_item", "_lineno", "_depth", "_frame")
+
+    def __new__(cls, frames=()):
+        node = _ROOT
+        for frame in frames:
+            node = node._push(frame, None)
+        return node
+
+    def _push(self, item, lineno):
+        """Return the interned stack with one more frame.
+
+        Parameters
+        ----------
+        item : `types.CodeType` or `StackFrame`
+            Code object being executed, or an existing frame.
+        lineno : `int` or `None`
+            Line number being executed if ``item`` is a code object, otherwise
+            `None`.
+
+        Returns
+        -------
+        stack : `CallStack`
+            The extended stack.
+        """
+        key = (self, id(item), lineno)
+        node = _internedNodes.get(key)
+        if node is None:
+            if len(_internedNodes) >= _MAX_INTERNED:
+                _internedNodes.clear()
+            node = object.__new__(CallStack)
+            node._parent = self
+            node._item = item
+            node._lineno = lineno
+            node._depth = self._depth + 1
+            node._frame = item if lineno is None else None
+            _internedNodes[key] = node
+        return node
+
+    def _nodes(self):
+        """Return the nodes of this stack, ordered with the most recent frame
+        last (`list` of `CallStack`).
+        """
+        nodes = []
+        node = self
+        while node._depth:
+            nodes.append(node)
+            node = node._parent
+        nodes.reverse()
+        return nodes
+
+    @property
+    def frames(self):
+        """The stack frames, ordered with the most recent frame last
+        (`list` of `StackFrame`).
+        """
+        frames = []
+        for node in self._nodes():
+            if node._frame is None:
+                node._frame = _internFrame(node._item, node._lineno)
+            frames.append(node._frame)
+        return frames
+
+    def __len__(self):
+        return self._depth
+
+    def __getitem__(self, index):
+        return self.frames[index]
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    def __add__(self, other):
+        node = self
+        if type(other) is list:
+            for frame in other:
+                child = _internedNodes.get((node, id(frame), None))
+                node = node._push(frame, None) if child is None else child
+        elif isinstance(other, CallStack):
+            for item in other._nodes():
+                node = node._push(item._item, item._lineno)
+        else:
+            for frame in other:
+                node = node._push(frame, None)
+        return node
+
+    def __radd__(self, other):
+        return CallStack(other) + self
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.frames!r})"
+
+
+_ROOT = object.__new__(CallStack)
+_ROOT._parent = None
+_ROOT._item = None
+_ROOT._lineno = None
+_ROOT._depth = 0
+_ROOT._frame = None
+
+
+def setLazyCallStacks(lazy=True):
+    """Set whether `getCallStack` defers the creation of `StackFrame`
+    objects by default.
+
+    Parameters
+    ----------
+    lazy : `bool`, optional
+        If `True`, `getCallStack` returns a `CallStack` that records only the
+        code object and line number of each frame, and creates `StackFrame`
+        objects only when the stack is inspected (for example by
+        `lsst.pex.config.history.format`). If `False`, `getCallStack` returns
+        a `list` of `StackFrame`.
+
+    Returns
+    -------
+    previous : `bool`
+        The previous setting.
+
+    Notes
+    -----
+    The setting is held in a `contextvars.ContextVar`, so it applies to the
+    current thread or `asyncio` task, and to the tasks it creates, but not
+    to other threads.
+    """
+    previous = _lazyCallStacks.get()
+    _lazyCallStacks.set(bool(lazy))
+    return previous
+
+
+def getCallStack(skip=0, lazy=None):
     """Retrieve the call stack for the caller.
 
     Parameters
     ----------
     skip : `int`, non-negative
         Number of stack frames above caller to skip.
+    lazy : `bool`, optional
+        If `True`, return a `CallStack` that creates its `StackFrame` elements
+        on demand. If `None`, the default set by `setLazyCallStacks` is used.
 
     Returns
     -------
-    output : `list` of `StackFrame`
+    output : `list` of `StackFrame` or `CallStack`
         The call stack. The `list` is ordered with the most recent frame to
         last.
 
@@ -190,8 +414,16 @@ def getCallStack(skip=0):
     This function is excluded from the call stack.
     """
     frame = getCallerFrame(skip + 1)
-    stack = []
+    frames = []
     while frame:
-        stack.append(StackFrame.fromFrame(frame))
+        frames.append(frame)
         frame = frame.f_back
-    return list(reversed(stack))
+    node = _ROOT
+    for frame in reversed(frames):
+        code = frame.f_code
+        lineno = frame.f_lineno
+        child = _internedNodes.get((node, id(code), lineno))
+        node = node._push(code, lineno) if child is None else child
+    if lazy is None:
+        lazy = _lazyCallStacks.get()
+    return node if lazy else node.frames
@@ -32,10 +32,26 @@ or `lsst.pex.config.Field._compare` implementation, as they take care of
 writing messages as well as floating-point comparisons and shortcuts.
 """
 
-__all__ = ("getComparisonName", "compareScalars", "compareConfigs")
+__all__ = (
+    "getComparisonName",
+    "compareScalars",
+    "compareConfigs",
+    "groupConfigs",
+    "ConfigPatchEntry",
+    "diffConfigs",
+    "diffConfigsBatch",
+)
+
+import math
+from typing import Any, NamedTuple
 
 import numpy
 
+_MIN_VECTORIZED_LENGTH = 256
+"""Number of floating point items from which containers are compared with a
+single call to `numpy.isclose` (`int`).
+"""
+
 
 def getComparisonName(name1, name2):
     """Create a comparison name that is used for printed output of comparisons.
@@ -95,10 +111,19 @@ def compareScalars(name, v1, v2, output, rtol=1e-8, atol=1e-8, dtype=None):
 
     Notes
     -----
-    Floating point comparisons are performed by `numpy.allclose`.
+    Floating point comparisons are performed by `numpy.allclose`, or by an
+    equivalent pure-Python test when both values are `float` instances. NaN
+    values compare equal to each other.
     """
     if v1 is None or v2 is None:
         result = v1 == v2
+    elif dtype is float and type(v1) is float and type(v2) is float:
+        # The test of numpy.isclose, without the overhead of calling NumPy.
+        result = (
+            (abs(v1 - v2) <= atol + rtol * abs(v2) and math.isfinite(v2))
+            or v1 == v2
+            or (math.isnan(v1) and math.isnan(v2))
+        )
     elif dtype in (float, complex):
         result = numpy.allclose(v1, v2, rtol=rtol, atol=atol) or (numpy.isnan(v1) and numpy.isnan(v2))
     else:
@@ -108,6 +133,70 @@ def compareScalars(name, v1, v2, output, rtol=1e-8, atol=1e-8, dtype=None):
     return result
 
 
+def _compareItems(name, keys, values1, values2, shortcut=True, rtol=1e-8, atol=1e-8, output=None, dtype=None):
+    """Compare the items of two containers for equality (for internal use
+    only).
+
+    Parameters
+    ----------
+    name : `str`
+        Name of the containers, to which the key of an item is appended to
+        report its inequality.
+    keys : `~collections.abc.Sequence`
+        Index or key of each item.
+    values1 : `~collections.abc.Sequence`
+        Items of the left-hand side container, in the order of ``keys``.
+    values2 : `~collections.abc.Sequence`
+        Items of the right-hand side container, in the order of ``keys``.
+    shortcut : `bool`, optional
+        If `True`, return as soon as an inequality is found.
+    rtol : `float`, optional
+        Relative tolerance for floating point comparisons.
+    atol : `float`, optional
+        Absolute tolerance for floating point comparisons.
+    output : callable, optional
+        A callable that takes a string, used (possibly repeatedly) to report
+        inequalities.
+    dtype : class, optional
+        Data type of the items.
+
+    Returns
+    -------
+    areEqual : `bool`
+        `True` if all the items are equal, `False` if they are not.
+
+    Notes
+    -----
+    Each item is compared as by `compareScalars`, which reports the
+    inequalities. Long containers of floating point items are first
+    compared with a single call to `numpy.isclose`, and only the items that
+    it finds unequal (including NaN items, which may stand for `None`) are
+    compared one by one.
+    """
+    indices = range(len(keys))
+    if dtype in (float, complex) and len(keys) >= _MIN_VECTORIZED_LENGTH:
+        try:
+            array1 = numpy.array(values1, dtype=dtype)
+            array2 = numpy.array(values2, dtype=dtype)
+        except (TypeError, ValueError):
+            pass
+        else:
+            indices = numpy.flatnonzero(~numpy.isclose(array1, array2, rtol=rtol, atol=atol)).tolist()
+    equal = True
+    for i in indices:
+        v1 = values1[i]
+        v2 = values2[i]
+        if v1 == v2:
+            continue
+        if not compareScalars(
+            f"{name}[{keys[i]!r}]", v1, v2, dtype=dtype, rtol=rtol, atol=atol, output=output
+        ):
+            if shortcut:
+                return False
+            equal = False
+    return equal
+
+
 def compareConfigs(name, c1, c2, shortcut=True, rtol=1e-8, atol=1e-8, output=None):
     """Compare two `lsst.pex.config.Config` instances for equality.
 
@@ -149,6 +238,10 @@ def compareConfigs(name, c1, c2, shortcut=True, rtol=1e-8, atol=1e-8, output=Non
     If ``c1`` or ``c2`` contain `~lsst.pex.config.RegistryField` or
     `~lsst.pex.config.ConfigChoiceField` instances, *unselected*
     `~lsst.pex.config.Config` instances will not be compared.
+
+    Configs and subconfigs with the same fingerprint (see
+    `lsst.pex.config.Config.fingerprint`) are equal without being compared
+    field by field.
     """
     assert name is not None
     if c1 is None:
@@ -167,6 +260,10 @@ def compareConfigs(name, c1, c2, shortcut=True, rtol=1e-8, atol=1e-8, output=Non
         if output is not None:
             output(f"Config types do not match for {name}: {type(c1)} != {type(c2)}")
         return False
+    # Configs with the same fingerprint are equal, so only the subconfigs
+    # whose fingerprints differ are compared field by field.
+    if c1._fingerprintDigest() == c2._fingerprintDigest():
+        return True
     equal = True
     for field in c1._fields.values():
         result = field._compare(c1, c2, shortcut=shortcut, rtol=rtol, atol=atol, output=output)
@@ -174,3 +271,215 @@ def compareConfigs(name, c1, c2, shortcut=True, rtol=1e-8, atol=1e-8, output=Non
             return False
         equal = equal and result
     return equal
+
+
+def groupConfigs(configs):
+    """Group `lsst.pex.config.Config` instances into classes of equal
+    configs.
+
+    Parameters
+    ----------
+    configs : `~collections.abc.Iterable` [`lsst.pex.config.Config`]
+        The configs.
+
+    Returns
+    -------
+    groups : `list` [`list` [`int`]]
+        Indices in ``configs`` of the configs in each class, in increasing
+        order. Classes are ordered by their first config.
+
+    See Also
+    --------
+    lsst.pex.config.compareConfigs
+
+    Notes
+    -----
+    Configs are equal if they are of the same type and have the same
+    fingerprint (see `lsst.pex.config.Config.fingerprint`): no tolerance is
+    applied to floating point values, which would not make equality
+    transitive, and NaN values are equal to each other. As in
+    `compareConfigs`, *unselected* choices of
+    `~lsst.pex.config.ConfigChoiceField` fields are not taken into account.
+
+    Each config is encoded once, so the cost of grouping grows linearly with
+    the number of configs, rather than with the number of pairs of configs.
+    """
+    groups = {}
+    for i, config in enumerate(configs):
+        groups.setdefault((type(config), config._fingerprintDigest()), []).append(i)
+    return list(groups.values())
+
+
+class ConfigPatchEntry(NamedTuple):
+    """A change to a config, as returned by `diffConfigs`.
+
+    The kinds of change are:
+
+    ``"set"``
+        The value at ``path`` is assigned ``new``.
+    ``"add"``
+        The key or `~lsst.pex.config.ConfigurableActionStructField` item at
+        ``path`` is added with the value ``new``; ``old`` is `None`.
+    ``"remove"``
+        The key or `~lsst.pex.config.ConfigurableActionStructField` item at
+        ``path``, whose value is ``old``, is deleted; ``new`` is `None`.
+    ``"select"``
+        The selection of the `~lsst.pex.config.ConfigChoiceField` at
+        ``path`` is set to ``new``: a name, a sorted list of names, or `None`.
+    ``"retarget"``
+        The `~lsst.pex.config.ConfigurableField` at ``path`` is retargeted
+        to ``new``, a ``(target, ConfigClass)`` tuple.
+
+    A subconfig that is added or replaced is given as its class, which
+    assigning builds with its default values; its fields that differ from
+    these defaults are set by the entries that follow.
+    """
+
+    path: str
+    """Full name of the changed field, key or item, relative to the config
+    (`str`), as accepted by `lsst.pex.config.Config.getByPath`.
+    """
+
+    kind: str
+    """Kind of change (`str`)."""
+
+    old: Any
+    """Value before the change."""
+
+    new: Any
+    """Value after the change."""
+
+
+def diffConfigs(c1, c2):
+    """Find the changes that turn a `lsst.pex.config.Config` into another.
+
+    This function is a helper for `lsst.pex.config.Config.diff`.
+
+    Parameters
+    ----------
+    c1 : `lsst.pex.config.Config`
+        Config to change.
+    c2 : `lsst.pex.config.Config`
+        Config to turn ``c1`` into.
+
+    Returns
+    -------
+    patch : `list` [`ConfigPatchEntry`]
+        The changes, in the order in which they are to be applied. The list
+        is empty if the configs have the same fingerprint (see
+        `lsst.pex.config.Config.fingerprint`).
+
+    Raises
+    ------
+    TypeError
+        Raised if the configs are not of the same type.
+
+    See Also
+    --------
+    lsst.pex.config.compareConfigs
+
+    Notes
+    -----
+    No tolerance is applied to floating point values, and NaN values are
+    equal to each other. As in `compareConfigs`, *unselected* choices of
+    `~lsst.pex.config.ConfigChoiceField` fields are not taken into account,
+    and subconfigs with the same fingerprint are not compared field by field.
+    """
+    if type(c1) is not type(c2):
+        raise TypeError(f"Config types do not match: {type(c1)} != {type(c2)}")
+    patch = []
+    _diffConfigs(c1, c2, None, patch)
+    return patch
+
+
+def diffConfigsBatch(reference, configs):
+    """Find the changes that turn a `lsst.pex.config.Config` into each of
+    many others.
+
+    Parameters
+    ----------
+    reference : `lsst.pex.config.Config`
+        Config to change.
+    configs : `~collections.abc.Iterable` [`lsst.pex.config.Config`]
+        Configs of the same type as ``reference`` to turn it into.
+
+    Returns
+    -------
+    patches : `list` [`list` [`ConfigPatchEntry`]]
+        The changes that turn ``reference`` into each config, as returned by
+        `diffConfigs`. The paths of the changes are those of the fields
+        that differ.
+
+    Raises
+    ------
+    TypeError
+        Raised if a config is not of the same type as ``reference``.
+
+    See Also
+    --------
+    lsst.pex.config.groupConfigs
+
+    Notes
+    -----
+    Configs are diffed once per class of equal configs (see
+    `groupConfigs`), and only the subconfigs whose fingerprints differ from
+    those of ``reference`` are compared field by field. The fingerprints of
+    ``reference`` are computed only once.
+    """
+    patches = {}
+    result = []
+    for config in configs:
+        key = (type(config), config._fingerprintDigest())
+        patch = patches.get(key)
+        if patch is None:
+            patch = patches[key] = diffConfigs(reference, config)
+        result.append(list(patch))
+    return result
+
+
+def _diffConfigs(c1, c2, path, patch):
+    """Append the changes that turn a config into another one of the same
+    type to a patch (for internal use only).
+
+    Parameters
+    ----------
+    c1 : `lsst.pex.config.Config`
+        Config to change.
+    c2 : `lsst.pex.config.Config`
+        Config to turn ``c1`` into.
+    path : `str` or `None`
+        Full name of the configs, or `None` for the configs being diffed.
+    patch : `list` [`ConfigPatchEntry`]
+        The changes found so far.
+    """
+    if c1._fingerprintDigest() == c2._fingerprintDigest():
+        return
+    for field in c1._fields.values():
+        field._diff(c1, c2, f"{path}.{field.name}" if path else field.name, patch)
+
+
+def _equalValues(v1, v2):
+    """Return whether two field values are equal, with NaN equal to NaN (for
+    internal use only).
+
+    Parameters
+    ----------
+    v1 : `object`
+        A value, such as a scalar, or a `list` or `dict` of scalars.
+    v2 : `object`
+        Another value.
+
+    Returns
+    -------
+    areEqual : `bool`
+        `True` if the values are equal, `False` if they are not.
+    """
+    if v1 == v2:
+        return True
+    if isinstance(v1, (float, complex)) and isinstance(v2, (float, complex)):
+        return v1 != v1 and v2 != v2
+    if isinstance(v1, (list, tuple)) and isinstance(v2, (list, tuple)):
+        return len(v1) == len(v2) and all(map(_equalValues, v1, v2))
+    if isinstance(v1, dict) and isinstance(v2, dict):
+        return v1.keys() == v2.keys() and all(_equalValues(v, v2[k]) for k, v in v1.items())
+    return False
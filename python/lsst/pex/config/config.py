@@ -33,9 +33,15 @@ __all__ = (
     "FieldValidationError",
     "UnexpectedProxyUsageError",
     "FieldTypeVar",
+    "historyLevel",
+    "lazySubconfigs",
 )
 
+import ast
+import contextlib
+import contextvars
 import copy
+import hashlib
 import importlib
 import io
 import math
@@ -45,7 +51,9 @@ import shutil
 import sys
 import tempfile
 import warnings
-from collections.abc import Mapping
+import weakref
+import collections.abc
+from collections.abc import Mapping, MutableSequence
 from types import GenericAlias
 from typing import Any, ForwardRef, Generic, TypeVar, cast, overload
 
@@ -56,8 +64,17 @@ try:
 except ImportError:
     yaml = None
 
+from ._overrideCache import _getFileProgram, _getProgram, _OverrideProgram
+from ._savedLines import _IDENTIFIER, _callWithHistory, _runSavedLines
 from .callStack import getCallStack, getStackFrame
-from .comparison import compareConfigs, compareScalars, getComparisonName
+from .comparison import (
+    ConfigPatchEntry,
+    _equalValues,
+    compareConfigs,
+    compareScalars,
+    diffConfigs,
+    getComparisonName,
+)
 
 if yaml:
     YamlLoaders: tuple[Any, ...] = (yaml.Loader, yaml.FullLoader, yaml.SafeLoader, yaml.UnsafeLoader)
@@ -96,6 +113,629 @@ class _PexConfigGenericAlias(GenericAlias):
 
 FieldTypeVar = TypeVar("FieldTypeVar")
 
+_HISTORY_LEVELS = ("off", "last", "full")
+"""Supported history recording levels (`tuple` of `str`)."""
+
+
+def _checkHistoryLevel(level):
+    """Check that a history recording level is supported.
+
+    Parameters
+    ----------
+    level : `str`
+        History recording level.
+
+    Returns
+    -------
+    level : `str`
+        The validated level.
+
+    Raises
+    ------
+    ValueError
+        Raised if ``level`` is not one of ``"off"``, ``"last"`` or
+        ``"full"``.
+    """
+    if level not in _HISTORY_LEVELS:
+        raise ValueError(f"Unsupported history level {level!r}; expected one of {_HISTORY_LEVELS}")
+    return level
+
+
+_defaultHistoryLevel = os.environ.get("PEX_CONFIG_HISTORY", "full")
+if _defaultHistoryLevel not in _HISTORY_LEVELS:
+    warnings.warn(
+        f"Ignoring unsupported value {_defaultHistoryLevel!r} of PEX_CONFIG_HISTORY; "
+        f"expected one of {_HISTORY_LEVELS}",
+        stacklevel=1,
+    )
+    _defaultHistoryLevel = "full"
+
+_historyLevel = contextvars.ContextVar("historyLevel", default=_defaultHistoryLevel)
+"""History recording level (`contextvars.ContextVar` of `str`), used for
+`Config` classes that do not set their own level.
+"""
+
+
+@contextlib.contextmanager
+def historyLevel(level):
+    """Set the history recording level within a context.
+
+    Parameters
+    ----------
+    level : `str`
+        One of:
+
+        ``"off"``
+            No history is recorded and no call stacks are captured.
+        ``"last"``
+            Only the most recent event is kept for each field.
+        ``"full"``
+            Every event is kept (the default).
+
+    Notes
+    -----
+    The level applies to every `Config` class that does not set its own level
+    with the ``history`` class keyword. It is held in a
+    `contextvars.ContextVar`, so it applies to the current thread or
+    `asyncio` task, and to the tasks it creates, but not to other threads.
+    The default level is taken from the ``PEX_CONFIG_HISTORY`` environment
+    variable, if set.
+
+    Examples
+    --------
+    >>> with historyLevel("off"):
+    ...     config = MyConfig()
+    ...     config.load("overrides.py")
+    """
+    token = _historyLevel.set(_checkHistoryLevel(level))
+    try:
+        yield
+    finally:
+        _historyLevel.reset(token)
+
+
+def _getHistoryLevel(config):
+    """Return the history recording level that applies to a config.
+
+    Parameters
+    ----------
+    config : `Config`
+        The config whose history is being recorded.
+
+    Returns
+    -------
+    level : `str`
+        One of ``"off"``, ``"last"`` or ``"full"``.
+    """
+    level = config._classHistoryLevel
+    return _historyLevel.get() if level is None else level
+
+
+_lazySubconfigs = contextvars.ContextVar("lazySubconfigs", default=False)
+"""Whether subconfigs are built on first use (`contextvars.ContextVar` of
+`bool`), for `Config` classes that do not set their own mode.
+"""
+
+
+@contextlib.contextmanager
+def lazySubconfigs(lazy=True):
+    """Set whether the subconfigs of new configs are built on first use,
+    within a context.
+
+    Parameters
+    ----------
+    lazy : `bool`, optional
+        If `True`, the subconfigs held by `ConfigField`, `ConfigurableField`
+        and `ConfigChoiceField` fields of configs created within the context
+        are left at their defaults without being built, until they are first
+        read or written.
+
+    Notes
+    -----
+    The mode applies to every `Config` class that does not set its own mode
+    with the ``lazy`` class keyword, in the current thread or `asyncio` task
+    and the tasks it creates. A subconfig that has never been used is
+    not built by `Config.freeze`, `Config.validate`, `Config.save` or
+    `compare`: it is skipped when saving, and its defaults are only validated
+    once per field. Note that the history of a subconfig built on first use
+    starts when it is built.
+
+    Examples
+    --------
+    >>> with lazySubconfigs():
+    ...     config = MyConfig()
+    """
+    token = _lazySubconfigs.set(bool(lazy))
+    try:
+        yield
+    finally:
+        _lazySubconfigs.reset(token)
+
+
+def _isLazy(config):
+    """Return whether the subconfigs of a config are built on first use.
+
+    Parameters
+    ----------
+    config : `Config`
+        The config that holds the subconfigs.
+
+    Returns
+    -------
+    lazy : `bool`
+        `True` if subconfigs are built on first use.
+    """
+    lazy = config._classLazySubconfigs
+    return _lazySubconfigs.get() if lazy is None else lazy
+
+
+class _LazyDefault:
+    """Placeholder in `Config._storage` for a subconfig that has been left at
+    its default and not yet built (see `lazySubconfigs`).
+
+    Parameters
+    ----------
+    at : `list` of `~lsst.pex.config.callStack.StackFrame`
+        The call stack when the default was set.
+    label : `str`
+        Event label for the history.
+    """
+
+    __slots__ = ("at", "label")
+
+    def __init__(self, at, label):
+        self.at = at
+        self.label = label
+
+
+def _historyCallStack(config, skip=0):
+    """Capture the call stack of the caller for the history of a config.
+
+    Parameters
+    ----------
+    config : `Config`
+        The config whose history is being recorded.
+    skip : `int`, optional
+        Number of stack frames above the caller to skip.
+
+    Returns
+    -------
+    stack : `list` of `~lsst.pex.config.callStack.StackFrame`
+        The call stack, or an empty `list` if history is not being recorded
+        for ``config``.
+
+    Notes
+    -----
+    This function is excluded from the call stack.
+    """
+    if _getHistoryLevel(config) == "off":
+        return []
+    return getCallStack(skip + 1)
+
+
+def _modified(config):
+    """Record that the value of a field of a config has changed.
+
+    Parameters
+    ----------
+    config : `Config`
+        The config that changed.
+
+    Notes
+    -----
+    This drops the cached fingerprint of ``config``, and those of the
+    configs whose fingerprints were computed from it (see
+    `Config.fingerprint`).
+    """
+    cache = config.__dict__.get("_fingerprintCache")
+    if cache is not None:
+        config.__dict__["_fingerprintCache"] = None
+        for parent in cache[1].values():
+            parent = parent()
+            if parent is not None:
+                _modified(parent)
+
+
+def _recordHistory(config, history, value, at, label):
+    """Add an event to a history list according to the history recording
+    level of a config.
+
+    Parameters
+    ----------
+    config : `Config`
+        The config whose history is being recorded.
+    history : `list`
+        History of a single field.
+    value : object
+        The value (or description) recorded for the event.
+    at : `list` of `~lsst.pex.config.callStack.StackFrame`
+        The call stack of the event.
+    label : `str`
+        Event label.
+    """
+    _modified(config)
+    level = _getHistoryLevel(config)
+    if level == "full":
+        history.append((value, at, label))
+    elif level == "last":
+        history[:] = [(value, at, label)]
+
+
+_DELETED = object()
+"""Value recorded by `_recordChange` for the deletion of an item."""
+
+_WHOLE = object()
+"""Key recorded by `_recordChange` for a change of the whole container."""
+
+
+class _ContainerHistory(MutableSequence):
+    """History of a field holding a `list` or `dict` proxy (such as
+    `ListField` and `DictField`), stored as changes.
+
+    Parameters
+    ----------
+    events : iterable of `tuple`, optional
+        Initial ``(value, at, label)`` events.
+
+    Notes
+    -----
+    Each event of the history is a ``(value, at, label)`` tuple, as for any
+    other field, but an event recorded by `_recordChange` for a single item
+    only stores that item. The full value of the container for such an event
+    is rebuilt when the event is read, by replaying the changes since the
+    last stored value. Building a container of N items one item at a time
+    thus costs O(N) time and memory rather than O(N^2).
+
+    At the ``"last"`` history level the single event refers to a private
+    copy of the container that is kept up to date with each change.
+    """
+
+    __slots__ = ("_entries", "_owner", "_current")
+
+    def __init__(self, events=()):
+        self._entries = [("value", None, value, at, label) for value, at, label in events]
+        # Container whose changes can be recorded relative to the last event.
+        self._owner = None
+        # Value of the last event at the "last" history level.
+        self._current = None
+
+    def record(self, owner, state, key, value, at, label, level):
+        """Record a change made by a container.
+
+        Parameters
+        ----------
+        owner : `object`
+            The proxy container that changed.
+        state : `list` or `dict`
+            The value of the container after the change.
+        key : `object`
+            Index or key that changed, or `_WHOLE` if the container changed
+            as a whole.
+        value : `object`
+            New item at ``key``, or `_DELETED` if the item was deleted.
+        at : `list` of `~lsst.pex.config.callStack.StackFrame`
+            The call stack of the event.
+        label : `str`
+            Event label.
+        level : `str`
+            History recording level, ``"full"`` or ``"last"``.
+        """
+        entries = self._entries
+        inSync = key is not _WHOLE and owner is self._owner
+        if level == "last":
+            if inSync and self._current is not None:
+                self._apply(self._current, key, value)
+            else:
+                self._current = state.copy()
+            entries[:] = [("current", None, self._current, at, label)]
+        else:
+            self._freeze()
+            if inSync and entries:
+                entries.append(("change", key, value, at, label))
+            else:
+                entries.append(("value", None, state.copy(), at, label))
+        self._owner = owner
+
+    def invalidate(self):
+        """Note that a container changed without recording an event."""
+        self._owner = None
+
+    @staticmethod
+    def _apply(state, key, value):
+        if value is _DELETED:
+            del state[key]
+        else:
+            state[key] = value
+
+    def _freeze(self):
+        """Turn the event that refers to the private copy of the container
+        into an ordinary event.
+        """
+        if self._current is not None:
+            _, _, value, at, label = self._entries[-1]
+            self._entries[-1] = ("value", None, value, at, label)
+            self._current = None
+
+    def _event(self, index):
+        entries = self._entries
+        kind, _, value, at, label = entries[index]
+        if kind == "value":
+            return (value, at, label)
+        if kind == "current":
+            return (value.copy(), at, label)
+        index %= len(entries)
+        start = index
+        while entries[start][0] == "change":
+            start -= 1
+        state = entries[start][2].copy()
+        for _, key, value, _, _ in entries[start + 1 : index + 1]:
+            self._apply(state, key, value)
+        return (state, at, label)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._event(i) for i in range(*index.indices(len(self)))]
+        return self._event(index)
+
+    def __iter__(self):
+        base = state = None
+        for kind, key, value, at, label in self._entries:
+            if kind == "change":
+                if state is None:
+                    state = base.copy()
+                self._apply(state, key, value)
+                yield (state.copy(), at, label)
+            else:
+                base = value
+                state = None
+                yield (value.copy() if kind == "current" else value, at, label)
+
+    def _replace(self, events):
+        self._entries = [("value", None, value, at, label) for value, at, label in events]
+        self._owner = None
+        self._current = None
+
+    def __setitem__(self, index, event):
+        if index == slice(None):
+            self._replace(event)
+        else:
+            events = list(self)
+            events[index] = event
+            self._replace(events)
+
+    def __delitem__(self, index):
+        events = list(self)
+        del events[index]
+        self._replace(events)
+
+    def insert(self, index, event):
+        if index >= len(self):
+            self.append(event)
+        else:
+            events = list(self)
+            events.insert(index, event)
+            self._replace(events)
+
+    def append(self, event):
+        self._freeze()
+        value, at, label = event
+        self._entries.append(("value", None, value, at, label))
+        self._owner = None
+
+    def clear(self):
+        self._replace(())
+
+    def __eq__(self, other):
+        if isinstance(other, (list, _ContainerHistory)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def _containerHistory(config, name):
+    """Return the history of a field holding a `list` or `dict` proxy,
+    converting it to a `_ContainerHistory` if necessary.
+
+    Parameters
+    ----------
+    config : `Config`
+        The config that contains the field.
+    name : `str`
+        Name of the field.
+
+    Returns
+    -------
+    history : `_ContainerHistory`
+        History of the field, stored in ``config``.
+    """
+    history = config._history.get(name)
+    if not isinstance(history, _ContainerHistory):
+        history = _ContainerHistory(history or ())
+        config._history[name] = history
+    return history
+
+
+def _recordChange(config, history, owner, state, key, value, at, label):
+    """Add an event for a change to a `list` or `dict` proxy to its history
+    according to the history recording level of a config.
+
+    Parameters
+    ----------
+    config : `Config`
+        The config whose history is being recorded.
+    history : `_ContainerHistory`
+        History of the field holding the proxy.
+    owner : `object`
+        The proxy container that changed.
+    state : `list` or `dict`
+        The value of the container after the change.
+    key : `object`
+        Index or key that changed, or `_WHOLE` if the container changed as a
+        whole.
+    value : `object`
+        New item at ``key``, or `_DELETED` if the item was deleted.
+    at : `list` of `~lsst.pex.config.callStack.StackFrame`
+        The call stack of the event.
+    label : `str`
+        Event label.
+    """
+    _modified(config)
+    level = _getHistoryLevel(config)
+    if level == "off":
+        history.invalidate()
+    else:
+        history.record(owner, state, key, value, at, label, level)
+
+
+class _Fingerprint:
+    """Canonical encoding of the field values of a config, from which its
+    fingerprint is computed (for internal use only).
+
+    Parameters
+    ----------
+    config : `Config`
+        The config whose fields are encoded, in name order.
+
+    Notes
+    -----
+    Scalars are written as their `repr`, which tells apart equal values of
+    different types. All NaN floats are written the same way, as are
+    positive and negative zero. Mappings and sets are written in key order,
+    and subconfigs are written as their own (cached) digests.
+    """
+
+    def __init__(self, config):
+        self._config = config
+        self._parts = [_typeStr(config)]
+        fields = config._fields
+        for name in sorted(fields):
+            self._parts.append(f"\0{name}=")
+            fields[name]._updateFingerprint(config, self)
+
+    def add(self, value):
+        """Write a value.
+
+        Parameters
+        ----------
+        value : `object`
+            The value: `None`, a `bool`, `int`, `float`, `complex` or `str`,
+            a `Config`, or a mapping, set or sequence of those. Any other
+            value is written as its type and `repr`.
+        """
+        parts = self._parts
+        valueType = type(value)
+        if valueType is float:
+            # Adding zero turns negative zero into positive zero.
+            parts.append(f"{value + 0.0!r};")
+        elif valueType in _FINGERPRINT_SCALARS:
+            parts.append(f"{value!r};")
+        elif isinstance(value, Config):
+            parts.append(f"<{value._fingerprintDigest(self._config).hex()}>")
+        elif isinstance(value, (float, int, complex, str)):
+            parts.append(f"{_typeStr(value)}({value!r});")
+        elif isinstance(value, Mapping):
+            parts.append("{")
+            for key in self._sorted(value):
+                self.add(key)
+                self.add(value[key])
+            parts.append("}")
+        elif isinstance(value, collections.abc.Set):
+            parts.append("{{")
+            for item in self._sorted(value):
+                self.add(item)
+            parts.append("}}")
+        elif isinstance(value, collections.abc.Sequence):
+            items = [item + 0.0 if type(item) is float else item for item in value]
+            if all(type(item) in _FINGERPRINT_SCALARS for item in items):
+                parts.append(f"{items!r};")
+            else:
+                parts.append("(")
+                for item in value:
+                    self.add(item)
+                parts.append(")")
+        else:
+            parts.append(f"{_typeStr(value)}({value!r});")
+
+    def addDefault(self, default):
+        """Write a subconfig that has been left at its default without being
+        built, as the config that it stands for.
+
+        Parameters
+        ----------
+        default : `Config` or `ConfigMeta`
+            The config whose values the subconfig is to be built with, or
+            the class to build it from with its default values.
+        """
+        # Defaults are not expected to change, so they do not keep track of
+        # the configs whose fingerprints are computed from them.
+        self._parts.append(f"<{_getDefaultConfig(default)._fingerprintDigest().hex()}>")
+
+    @staticmethod
+    def _sorted(keys):
+        try:
+            return sorted(keys)
+        except TypeError:
+            return sorted(keys, key=repr)
+
+    def digest(self):
+        """Return the digest of everything written (`bytes`)."""
+        return hashlib.sha256("".join(self._parts).encode("utf-8", "surrogatepass")).digest()
+
+
+_FINGERPRINT_SCALARS = frozenset((type(None), bool, int, float, complex, str))
+"""Types whose values `_Fingerprint.add` writes as their `repr`."""
+
+
+_UNSHARED = object()
+"""Stored as the ``_defaultConfig`` of a config class whose default instance
+must not be shared (see `_getDefaultConfig`).
+"""
+
+
+def _getDefaultConfig(default):
+    """Return the config that a subconfig left at its default stands for.
+
+    Parameters
+    ----------
+    default : `Config` or `ConfigMeta`
+        The config to build the subconfig with, or the class to build it from
+        with its default values.
+
+    Returns
+    -------
+    config : `Config`
+        ``default`` itself, or a default instance of the class, which may be
+        shared and must not be modified.
+
+    Notes
+    -----
+    The default instance of a class is cached with the class only if its
+    values are the defaults of its fields, that is if the class does not
+    override ``setDefaults`` or ``__init__`` and has no fields holding
+    subconfigs, whose classes may do so. Otherwise, a new instance is built
+    on each call, since those methods may not set the same values every
+    time.
+    """
+    if isinstance(default, type):
+        config = default._defaultConfig
+        if config is None:
+            config = default()
+            fixed = (
+                default.setDefaults is Config.setDefaults
+                and default.__init__ is Config.__init__
+                and not _fieldsOverriding(default, "_iterSubconfigs")
+            )
+            default._defaultConfig = config if fixed else _UNSHARED
+        elif config is _UNSHARED:
+            config = default()
+        return config
+    return default
+
 
 class UnexpectedProxyUsageError(TypeError):
     """Exception raised when a proxy class is used in a context that suggests
@@ -118,6 +758,28 @@ def _joinNamePath(prefix=None, name=None, index=None):
         return name
 
 
+def _formatAssignment(fullname, value):
+    """Format the assignment of a value to a field, as written by
+    `Field.save`.
+
+    Parameters
+    ----------
+    fullname : `str`
+        Full name of the field.
+    value : `object`
+        The value.
+
+    Returns
+    -------
+    assignment : `str`
+        The assignment, with a trailing newline.
+    """
+    if isinstance(value, float) and not math.isfinite(value):
+        # non-finite numbers need special care
+        return f"{fullname}=float('{value!r}')\n"
+    return f"{fullname}={value!r}\n"
+
+
 def _autocast(x, dtype):
     """Cast a value to a type, if appropriate.
 
@@ -216,7 +878,7 @@ class ConfigMeta(type):
     don't have to pass the name of the field to the field constructor).
     """
 
-    def __init__(cls, name, bases, dict_):
+    def __init__(cls, name, bases, dict_, **kwargs):
         type.__init__(cls, name, bases, dict_)
         cls._fields = {}
         cls._source = getStackFrame()
@@ -236,14 +898,192 @@ class ConfigMeta(type):
         fields = getFields(cls)
         for k, v in fields.items():
             setattr(cls, k, copy.deepcopy(v))
+        cls._defaultTemplate = None
+        cls._defaultConfig = None
+        cls._overridingFields = {}
 
     def __setattr__(cls, name, value):
         if isinstance(value, Field):
             value.name = name
             cls._fields[name] = value
+            cls._defaultTemplate = None
+            cls._defaultConfig = None
+            cls._overridingFields = {}
+            # The closures of the classes that hold this one may change.
+            global _classImportGeneration
+            _classImportGeneration += 1
         type.__setattr__(cls, name, value)
 
 
+_UNCACHED = object()
+"""Placeholder in a default template for a default that is not cached."""
+
+_UNCHANGED = object()
+"""State of a field that is left at its default when a config is unpickled."""
+
+_stateSupport = {}
+"""Whether a `Field` type supports `Field._getState`, keyed by type."""
+
+
+def _supportsState(fieldType):
+    """Return whether a field type can be pickled by `Field._getState`.
+
+    Parameters
+    ----------
+    fieldType : `type`
+        A `Field` subclass.
+
+    Returns
+    -------
+    supported : `bool`
+        `True` if the class that defines how ``fieldType`` is saved also
+        defines its state.
+    """
+    supported = _stateSupport.get(fieldType)
+    if supported is None:
+        for klass in fieldType.__mro__:
+            if "_getState" in klass.__dict__:
+                supported = True
+                break
+            if "save" in klass.__dict__ or "_saveAs" in klass.__dict__:
+                supported = False
+                break
+        _stateSupport[fieldType] = supported
+    return supported
+
+
+def _fieldsOverriding(cls, method):
+    """Return the fields of a config class whose types override a method of
+    `Field`.
+
+    Parameters
+    ----------
+    cls : `ConfigMeta`
+        The config class.
+    method : `str`
+        Name of the method.
+
+    Returns
+    -------
+    fields : `tuple` of `Field`
+        The fields, in order. The result is cached with the class.
+    """
+    fields = cls._overridingFields.get(method)
+    if fields is None:
+        base = getattr(Field, method)
+        fields = tuple(field for field in cls._fields.values() if getattr(type(field), method) is not base)
+        cls._overridingFields[method] = fields
+    return fields
+
+
+_classImportGeneration = 0
+"""Number of fields added to config classes after they were created, which
+invalidates the results of `_classImports` (`int`).
+"""
+
+_loadedSubconfigs = weakref.WeakValueDictionary()
+"""Subconfigs that have had override code loaded into them, so that their
+``_imports`` may not be empty, keyed by identity.
+"""
+
+
+def _holdsLoadedSubconfigs(name, loadedNames):
+    """Return whether a config may hold subconfigs that have had override
+    code loaded into them.
+
+    Parameters
+    ----------
+    name : `str` or `None`
+        Full name of the config, or `None` for a root config.
+    loadedNames : `list` of `str`
+        Full names of the subconfigs in `_loadedSubconfigs`.
+
+    Returns
+    -------
+    holds : `bool`
+        Whether one of ``loadedNames`` is that of the config or of one of its
+        subconfigs. Configs of other trees with the same names also match.
+    """
+    if name is None:
+        return bool(loadedNames)
+    size = len(name)
+    for loadedName in loadedNames:
+        if loadedName.startswith(name) and loadedName[size : size + 1] in ("", ".", "["):
+            return True
+    return False
+
+
+def _classImports(cls):
+    """Return the modules that every config of a class needs imported when
+    it is saved, if they do not depend on the values of its fields.
+
+    Parameters
+    ----------
+    cls : `ConfigMeta`
+        The config class.
+
+    Returns
+    -------
+    imports : `frozenset` of `str` or `None`
+        The modules of ``cls`` and of all the subconfigs it can hold, or
+        `None` if they depend on the values of the fields (for example on
+        the target of a `~lsst.pex.config.ConfigurableField`) or if ``cls``
+        overrides ``_collectImports``. The result is cached with the class.
+    """
+    cached = cls.__dict__.get("_importClosure")
+    if cached is not None and cached[0] == _classImportGeneration:
+        return cached[1]
+    imports = None
+    if cls._collectImports is Config._collectImports:
+        imports = {cls.__module__}
+        for field in cls._fields.values():
+            fieldImports = field._classImports()
+            if fieldImports is None:
+                imports = None
+                break
+            imports |= fieldImports
+        if imports is not None:
+            imports = frozenset(imports)
+    cls._importClosure = (_classImportGeneration, imports)
+    return imports
+
+
+def _makeDefaultTemplate(cls):
+    """Validate the defaults of the fields of a config class.
+
+    Parameters
+    ----------
+    cls : `ConfigMeta`
+        The config class.
+
+    Returns
+    -------
+    template : `list` of `tuple`
+        A ``(field, default, value)`` tuple for each field of the class, where
+        ``value`` is the validated value of ``default``, or `_UNCACHED` if the
+        default must be set with ``field.__set__``.
+
+    Notes
+    -----
+    Only the defaults of fields that use `Field.__set__` are validated in
+    advance; those are scalars, which can be shared between instances. A
+    default that fails validation is not cached, so that the error is raised
+    by ``field.__set__`` when an instance is created.
+    """
+    template = []
+    for field in cls._fields.values():
+        default = field.default
+        value = _UNCACHED
+        if type(field).__set__ is Field.__set__:
+            try:
+                value = _autocast(default, field.dtype)
+                field._validateValue(value)
+            except Exception:
+                value = _UNCACHED
+        template.append((field, default, value))
+    return template
+
+
 class FieldValidationError(ValueError):
     """Raised when a ``~lsst.pex.config.Field`` is not valid in a
     particular ``~lsst.pex.config.Config``.
@@ -538,11 +1378,38 @@ class Field(Generic[FieldTypeVar]):
 
         Renaming is only relevant for `~lsst.pex.config.Field` instances that
         hold subconfigs. `~lsst.pex.config.Field`\s that hold subconfigs should
-        rename each subconfig with the full field name as generated by
+        return them from ``_iterSubconfigs``, which is used to rename them, or
+        else rename each subconfig with the full field name as generated by
         `lsst.pex.config.config._joinNamePath`.
         """
         pass
 
+    def _iterSubconfigs(self, instance, path):
+        """Return the subconfigs held by this field (for internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+        path : `str`
+            Full name of this field.
+
+        Returns
+        -------
+        subconfigs : iterable of `tuple` [`str`, `lsst.pex.config.Config`]
+            The full name and value of each subconfig that has been built, in
+            the order in which `save` writes them.
+
+        Notes
+        -----
+        This is how `lsst.pex.config.Config.walk` and the methods of
+        `lsst.pex.config.Config` built on it, such as ``freeze``, descend
+        into subconfigs. The `rename`, `freeze` and ``_collectImports``
+        methods of a field that returns its subconfigs here should not
+        recurse into them.
+        """
+        return ()
+
     def validate(self, instance):
         """Validate the field (for internal use only).
 
@@ -583,7 +1450,8 @@ class Field(Generic[FieldTypeVar]):
         Notes
         -----
         Freezing is only relevant for fields that hold subconfigs. Fields which
-        hold subconfigs should freeze each subconfig.
+        hold subconfigs should return them from ``_iterSubconfigs``, which is
+        used to freeze them, or else freeze each subconfig.
 
         **Subclasses should implement this method.**
         """
@@ -628,9 +1496,57 @@ class Field(Generic[FieldTypeVar]):
             A config object that has this field defined on it
         imports : `set`
             Set of python modules that need imported after persistence
+
+        Notes
+        -----
+        The imports of the subconfigs returned by ``_iterSubconfigs`` are
+        collected by `lsst.pex.config.Config`, so only other modules need to
+        be added here.
         """
         pass
 
+    def _classImports(self):
+        """Return the modules that this field needs imported when it is
+        saved, if they do not depend on its value (for internal use only).
+
+        Returns
+        -------
+        imports : `frozenset` of `str` or `None`
+            The modules, including those of the subconfigs the field can
+            hold, or `None` if `_collectImports` must be called for each
+            config.
+        """
+        cls = type(self)
+        if cls._collectImports is Field._collectImports and cls._iterSubconfigs is Field._iterSubconfigs:
+            return frozenset()
+        return None
+
+    def _iterNames(self, instance, name):
+        """Yield the name of this field and the names of any fields nested
+        in it (for internal use only).
+
+        Parameters
+        ----------
+        instance : `~lsst.pex.config.Config` or `None`
+            The config that contains this field, or `None` if that config has
+            not been built, in which case the field has its default value.
+        name : `str`
+            Name of this field relative to the root config.
+
+        Yields
+        ------
+        name : `str`
+            Field names, in the order in which `save` writes them.
+
+        Notes
+        -----
+        Like `save`, this skips a deprecated field that has its default
+        value.
+        """
+        if self.deprecated and (instance is None or self.__get__(instance) == self.default):
+            return
+        yield name
+
     def save(self, outfile, instance):
         """Save this field to a file (for internal use only).
 
@@ -652,20 +1568,50 @@ class Field(Generic[FieldTypeVar]):
 
         This output can be executed with Python.
         """
+        self._saveAs(outfile, instance, _joinNamePath(instance._name, self.name))
+
+    def _saveAs(self, outfile, instance, fullname, compact=False, reference=None):
+        """Save this field to a file under a given name (for internal use
+        only).
+
+        Parameters
+        ----------
+        outfile : file-like object
+            A writeable field handle.
+        instance : `~lsst.pex.config.Config`
+            The `~lsst.pex.config.Config` instance that contains this field.
+        fullname : `str`
+            Full name of this field in the output, including the name of the
+            root config.
+        compact : `bool`, optional
+            If `True`, leave out the documentation comments and blank lines.
+        reference : `~lsst.pex.config.Config` or `None`, optional
+            Config of the same type as ``instance`` that the output will be
+            loaded into. If given, values that would not change it are left
+            out.
+
+        Notes
+        -----
+        Unlike `save`, this does not use the name of ``instance``, so a config
+        can be saved under any root name without being renamed. Field types
+        that hold subconfigs save them with `Config._saveAs`, passing down the
+        matching subconfigs of ``reference``.
+        """
         value = self.__get__(instance)
-        fullname = _joinNamePath(instance._name, self.name)
 
         if self.deprecated and value == self.default:
             return
 
-        # write full documentation string as comment lines
-        # (i.e. first character is #)
-        doc = "# " + str(self.doc).replace("\n", "\n# ")
-        if isinstance(value, float) and not math.isfinite(value):
-            # non-finite numbers need special care
-            outfile.write(f"{doc}\n{fullname}=float('{value!r}')\n\n")
+        assignment = _formatAssignment(fullname, value)
+        if reference is not None and assignment == _formatAssignment(fullname, self.__get__(reference)):
+            return
+        if compact:
+            outfile.write(assignment)
         else:
-            outfile.write(f"{doc}\n{fullname}={value!r}\n\n")
+            # write full documentation string as comment lines
+            # (i.e. first character is #)
+            doc = "# " + str(self.doc).replace("\n", "\n# ")
+            outfile.write(f"{doc}\n{assignment}\n")
 
     def toDict(self, instance):
         """Convert the field value so that it can be set as the value of an
@@ -694,6 +1640,100 @@ class Field(Generic[FieldTypeVar]):
         """
         return self.__get__(instance)
 
+    def _getState(self, instance):
+        """Get the value of this field in a form that can be pickled (for
+        internal use only).
+
+        Parameters
+        ----------
+        instance : `~lsst.pex.config.Config`
+            The `~lsst.pex.config.Config` that contains this field.
+
+        Returns
+        -------
+        state : `object`
+            The state of the field, to be passed to `_setState`, or
+            `_UNCHANGED` if the field does not need to be restored.
+
+        Notes
+        -----
+        This is the structured equivalent of `save`, used to pickle configs
+        without generating and executing Python code. A subclass that
+        overrides `save` must also override this method and `_setState`,
+        otherwise configs that hold it are pickled with `save`.
+        """
+        value = self.__get__(instance)
+        if self.deprecated and value == self.default:
+            return _UNCHANGED
+        return value
+
+    def _setState(self, instance, state, at, label):
+        """Restore the value of this field from the result of `_getState` (for
+        internal use only).
+
+        Parameters
+        ----------
+        instance : `~lsst.pex.config.Config`
+            The `~lsst.pex.config.Config` that contains this field.
+        state : `object`
+            The state of the field.
+        at : `list` of `~lsst.pex.config.callStack.StackFrame`
+            The call stack.
+        label : `str`
+            Event label for the history.
+        """
+        self.__set__(instance, state, at=at, label=label)
+
+    def _updateFingerprint(self, instance, fingerprint):
+        """Write the value of this field to the fingerprint of a config (for
+        internal use only).
+
+        Parameters
+        ----------
+        instance : `~lsst.pex.config.Config`
+            The `~lsst.pex.config.Config` that contains this field.
+        fingerprint : `_Fingerprint`
+            The encoding of the fields of ``instance``.
+
+        Notes
+        -----
+        A subclass whose value is not made of the types understood by
+        `_Fingerprint.add`, or which holds configs that are not part of its
+        value (like the unselected choices of a
+        `~lsst.pex.config.ConfigChoiceField`), must override this method.
+        Everything that `_compare` compares must be written, as configs with
+        equal fingerprints are not compared field by field.
+        """
+        fingerprint.add(self.__get__(instance))
+
+    def _diff(self, instance1, instance2, path, patch):
+        """Append the changes that turn the value of this field in a config
+        into its value in another config to a patch (for internal use only).
+
+        Parameters
+        ----------
+        instance1 : `~lsst.pex.config.Config`
+            The `~lsst.pex.config.Config` to change.
+        instance2 : `~lsst.pex.config.Config`
+            The `~lsst.pex.config.Config` of the same type to turn
+            ``instance1`` into.
+        path : `str`
+            Full name of this field, relative to the config being diffed.
+        patch : `list` [`~lsst.pex.config.ConfigPatchEntry`]
+            The changes found so far.
+
+        Notes
+        -----
+        A subclass whose value is not set by assigning it, or which holds
+        subconfigs, must override this method. Everything that `_compare`
+        compares must be diffed, and the changes must be such that
+        `Config.applyPatch` can apply them.
+        """
+        value1 = self.__get__(instance1)
+        value2 = self.__get__(instance2)
+        if not _equalValues(value1, value2):
+            patch.append(ConfigPatchEntry(path, "set", value1, value2))
+
     @overload
     def __get__(
         self, instance: None, owner: Any = None, at: Any = None, label: str = "default"
@@ -788,8 +1828,8 @@ class Field(Generic[FieldTypeVar]):
 
         instance._storage[self.name] = value
         if at is None:
-            at = getCallStack()
-        history.append((value, at, label))
+            at = _historyCallStack(instance)
+        _recordHistory(instance, history, value, at, label)
 
     def __delete__(self, instance, at=None, label="deletion"):
         """Delete an attribute from a `lsst.pex.config.Config` instance.
@@ -810,7 +1850,7 @@ class Field(Generic[FieldTypeVar]):
         should not be called directly.
         """
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(instance)
         self.__set__(instance, None, at=at, label=label)
 
     def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
@@ -900,15 +1940,271 @@ class RecordingImporter:
         # Return None because we don't do any importing.
         return None
 
-    def getModules(self):
-        """Get the set of modules that were imported.
+    def getModules(self):
+        """Get the set of modules that were imported.
+
+        Returns
+        -------
+        modules : `set` of `str`
+            Set of imported module names.
+        """
+        return self._modules
+
+
+def _iterConfigNames(configClass, config, prefix):
+    """Yield the names of the fields of a config, recursively.
+
+    Parameters
+    ----------
+    configClass : `type`
+        Type of the config.
+    config : `Config` or `None`
+        The config, or `None` if it has not been built, in which case the
+        names are those of a default instance of ``configClass``.
+    prefix : `str` or `None`
+        Name of the config relative to the root config, or `None` for the
+        root config.
+
+    Yields
+    ------
+    name : `str`
+        Field names relative to the root config.
+    """
+    for field in configClass._fields.values():
+        yield from field._iterNames(config, _joinNamePath(prefix, field.name))
+
+
+def _peekValue(config, field):
+    """Return the value of a field without building a subconfig.
+
+    Parameters
+    ----------
+    config : `Config`
+        The config containing the field.
+    field : `Field`
+        The field.
+
+    Returns
+    -------
+    value : `object`
+        The value of the field, or `None` if it is a subconfig that has not
+        been built yet.
+    """
+    if type(config._storage.get(field.name)) is _LazyDefault:
+        return None
+    return field.__get__(config)
+
+
+def _walk(config, path=None, prune=None):
+    """Walk the fields of a config and its subconfigs, depth first in field
+    order.
+
+    Parameters
+    ----------
+    config : `Config`
+        The config.
+    path : `str`, optional
+        Full name of ``config``. If `None`, names are relative to ``config``.
+    prune : callable, optional
+        Function called as ``prune(path, config, field)`` after each field
+        holding subconfigs has been yielded. If it returns `True`, the
+        subconfigs of that field are skipped.
+
+    Yields
+    ------
+    path : `str`
+        Full name of the field.
+    config : `Config`
+        The config containing the field.
+    field : `Field`
+        The field.
+
+    Notes
+    -----
+    Subconfigs are found with `Field._iterSubconfigs`, so only subconfigs
+    that have been built are visited. The fields of a subconfig are yielded
+    right after the field that holds it, as `Config.saveToStream` writes
+    them.
+    """
+    # Each frame holds a config, its name, an iterator over its fields, the
+    # fields holding subconfigs, and an iterator over the subconfigs of the
+    # current field, if any.
+    stack = [[path, config, iter(config._fields.values()), None]]
+    while stack:
+        frame = stack[-1]
+        subconfigs = frame[3]
+        if subconfigs is not None:
+            for subPath, subconfig in subconfigs:
+                stack.append([subPath, subconfig, iter(subconfig._fields.values()), None])
+                break
+            else:
+                frame[3] = None
+            continue
+        prefix, parent, fields = frame[0], frame[1], frame[2]
+        holders = _fieldsOverriding(type(parent), "_iterSubconfigs")
+        for field in fields:
+            fieldPath = f"{prefix}.{field.name}" if prefix else field.name
+            yield fieldPath, parent, field
+            if field in holders:
+                subconfigs = field._iterSubconfigs(parent, fieldPath)
+                if subconfigs and (prune is None or not prune(fieldPath, parent, field)):
+                    frame[3] = iter(subconfigs)
+                    break
+        else:
+            stack.pop()
+
+
+def _walkConfigs(config, path=None, prune=None):
+    """Walk a config and its subconfigs, depth first.
+
+    Parameters
+    ----------
+    config : `Config`
+        The config.
+    path : `str`, optional
+        Full name of ``config``. If `None`, names are relative to ``config``.
+    prune : callable, optional
+        Function called as ``prune(path, config)`` after each config has been
+        yielded. If it returns `True`, the subconfigs of that config are
+        skipped.
+
+    Yields
+    ------
+    path : `str` or `None`
+        Full name of the config.
+    config : `Config`
+        The config, which is yielded before its subconfigs.
+
+    Notes
+    -----
+    Subconfigs are found with `Field._iterSubconfigs`, like in `_walk`, but
+    the fields that do not hold subconfigs are not visited.
+    """
+    stack = [(path, config)]
+    while stack:
+        path, config = stack.pop()
+        yield path, config
+        if prune is not None and prune(path, config):
+            continue
+        subconfigs = _subconfigsOf(config, path)
+        subconfigs.reverse()
+        stack.extend(subconfigs)
+
+
+def _subconfigsOf(config, path):
+    """Return the subconfigs held by the fields of a config.
+
+    Parameters
+    ----------
+    config : `Config`
+        The config.
+    path : `str` or `None`
+        Full name of ``config``, or `None` to name the subconfigs relative to
+        it.
+
+    Returns
+    -------
+    subconfigs : `list` of `tuple`
+        The full name and the config of each subconfig that has been built,
+        in field order.
+    """
+    subconfigs = []
+    for field in _fieldsOverriding(type(config), "_iterSubconfigs"):
+        subconfigs.extend(field._iterSubconfigs(config, f"{path}.{field.name}" if path else field.name))
+    return subconfigs
+
+
+_MAX_CACHED_PATHS = 4096
+"""Number of compiled field paths kept in memory (`int`)."""
+
+_KEY = r"'(?:[^'\\\n]|\\.)*'|\"(?:[^\"\\\n]|\\.)*\"|[-+.\w]+"
+_PATH_START_RE = re.compile(_IDENTIFIER)
+_PATH_STEP_RE = re.compile(rf"\.({_IDENTIFIER})|\[\s*({_KEY})\s*\]")
+
+_pathAccessors = {}
+"""Compiled field paths, keyed by path."""
+
+
+class _PathAccessor:
+    """Compiled access to the object at a field path, such as
+    ``"sub.choice['key'].name"``.
+
+    Parameters
+    ----------
+    path : `str`
+        The path, relative to a config.
+
+    Raises
+    ------
+    ValueError
+        Raised if ``path`` is not a sequence of attribute names and item
+        accessors with literal keys.
+
+    Notes
+    -----
+    Every step is looked up when the accessor is called, so an accessor
+    holds no config and can be used with any config. Retargeting a
+    `~lsst.pex.config.ConfigurableField` or changing the selection of a
+    `~lsst.pex.config.ConfigChoiceField` is seen by the next call.
+    """
+
+    __slots__ = ("get", "getParent", "attr", "key")
+
+    def __init__(self, path):
+        match = _PATH_START_RE.match(path)
+        if match is None:
+            raise ValueError(f"Invalid field path {path!r}")
+        steps = [(match.group(), None)]
+        pos = match.end()
+        while pos < len(path):
+            match = _PATH_STEP_RE.match(path, pos)
+            if match is None:
+                raise ValueError(f"Invalid field path {path!r}")
+            attr, key = match.groups()
+            if attr is None:
+                try:
+                    key = ast.literal_eval(key)
+                except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+                    key = None
+                if type(key) not in (str, int, float, bool):
+                    raise ValueError(f"Invalid key {match.group(2)} in field path {path!r}")
+            steps.append((attr, key))
+            pos = match.end()
 
-        Returns
-        -------
-        modules : `set` of `str`
-            Set of imported module names.
-        """
-        return self._modules
+        keys = []
+        source = "_c"
+        for attr, key in steps:
+            parentSource = source
+            if attr is not None:
+                source += f".{attr}"
+            else:
+                source += f"[_keys[{len(keys)}]]"
+                keys.append(key)
+        namespace = {"_keys": tuple(keys)}
+        self.get = eval(f"lambda _c: {source}", namespace)
+        self.getParent = eval(f"lambda _c: {parentSource}", namespace)
+        self.attr, self.key = steps[-1]
+
+
+def _getPathAccessor(path):
+    """Return the compiled accessor of a field path.
+
+    Parameters
+    ----------
+    path : `str`
+        The path, relative to a config.
+
+    Returns
+    -------
+    accessor : `_PathAccessor`
+        The accessor, shared by all the users of ``path``.
+    """
+    accessor = _pathAccessors.get(path)
+    if accessor is None:
+        if len(_pathAccessors) >= _MAX_CACHED_PATHS:
+            _pathAccessors.clear()
+        accessor = _pathAccessors[path] = _PathAccessor(path)
+    return accessor
 
 
 # type ignore because type checker thinks ConfigMeta is Generic when it is not
@@ -962,6 +2258,27 @@ class Config(metaclass=ConfigMeta):  # type: ignore
     _history: dict[str, list[Any]]
     _imports: set[Any]
 
+    _classHistoryLevel: str | None = None
+    """History recording level set with the ``history`` class keyword, or
+    `None` to use the process-wide level (see `historyLevel`).
+    """
+
+    _classLazySubconfigs: bool | None = None
+    """Whether subconfigs are built on first use, as set with the ``lazy``
+    class keyword, or `None` to use the process-wide mode (see
+    `lazySubconfigs`).
+    """
+
+    _defaultTemplate: list[tuple[Field, Any, Any]] | None
+    """Validated field defaults, built when the first instance is created
+    (see `_makeDefaultTemplate`).
+    """
+
+    _overridingFields: dict[str, tuple[Field, ...]]
+    """Fields whose types override a `Field` method, keyed by the name of the
+    method (see `_fieldsOverriding`).
+    """
+
     def __iter__(self):
         """Iterate over fields."""
         return self._fields.__iter__()
@@ -984,6 +2301,7 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         values : `~collections.abc.ValuesView`
             Iterator of field values.
         """
+        self._buildLazyDefaults()
         return self._storage.values()
 
     def items(self):
@@ -997,8 +2315,17 @@ class Config(metaclass=ConfigMeta):  # type: ignore
             0. Field name.
             1. Field value.
         """
+        self._buildLazyDefaults()
         return self._storage.items()
 
+    def _buildLazyDefaults(self):
+        """Build the subconfigs that have been left at their defaults without
+        being built (see `lazySubconfigs`).
+        """
+        for name, value in self._storage.items():
+            if type(value) is _LazyDefault:
+                self._fields[name].__get__(self)
+
     def __contains__(self, name):
         """Return `True` if the specified field exists in this config.
 
@@ -1027,7 +2354,9 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         when or even the base ``Config.__init__`` should be called.
         """
         name = kw.pop("__name", None)
-        at = kw.pop("__at", getCallStack())
+        at = kw.pop("__at", None)
+        if at is None:
+            at = _historyCallStack(cls)
         # remove __label and ignore it
         kw.pop("__label", "default")
 
@@ -1037,10 +2366,21 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         instance._storage = {}
         instance._history = {}
         instance._imports = set()
+        instance._fingerprintCache = None
         # load up defaults
-        for field in instance._fields.values():
-            instance._history[field.name] = []
-            field.__set__(instance, field.default, at=at + [field.source], label="default")
+        template = cls._defaultTemplate
+        if template is None:
+            template = cls._defaultTemplate = _makeDefaultTemplate(cls)
+        recordHistory = _getHistoryLevel(cls) != "off"
+        for field, default, value in template:
+            if value is not _UNCACHED and field.default is default:
+                # The default was validated by _makeDefaultTemplate.
+                instance._storage[field.name] = value
+                history = [(value, at + [field.source], "default")] if recordHistory else []
+                instance._history[field.name] = history
+            else:
+                instance._history[field.name] = []
+                field.__set__(instance, field.default, at=at + [field.source], label="default")
         # set custom default-overrides
         instance.setDefaults()
         # set constructor overrides
@@ -1053,12 +2393,63 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         We need to condense and reconstitute the `~lsst.pex.config.Config`,
         since it may contain lambdas (as the ``check`` elements) that cannot
         be pickled.
+
+        Only the field values are pickled, and they are restored by
+        assignment, without generating or executing Python code. Configs with
+        fields that do not support this (see `Field._getState`) are pickled
+        as the code written by `saveToStream`.
         """
-        # The stream must be in characters to match the API but pickle
-        # requires bytes
-        stream = io.StringIO()
-        self.saveToStream(stream)
-        return (unreduceConfig, (self.__class__, stream.getvalue().encode()))
+        try:
+            state = self._getState()
+        except NotImplementedError:
+            # The stream must be in characters to match the API but pickle
+            # requires bytes
+            stream = io.StringIO()
+            self.saveToStream(stream)
+            return (unreduceConfig, (self.__class__, stream.getvalue().encode()))
+        self._collectImports()
+        imports = sorted(imp for imp in self._imports if sys.modules.get(imp) is not None)
+        return (unreduceConfigState, (self.__class__, state, imports))
+
+    def _getState(self):
+        """Get the values of all the fields in a form that can be pickled.
+
+        Returns
+        -------
+        state : `dict`
+            The state of each field that must be restored, keyed by field name.
+
+        Raises
+        ------
+        NotImplementedError
+            Raised if this config, or a config it holds, has a field that does
+            not support `Field._getState`.
+        """
+        if type(self)._save is not Config._save:
+            raise NotImplementedError(f"{_typeStr(self)} overrides _save")
+        state = {}
+        for name, field in self._fields.items():
+            if not _supportsState(type(field)):
+                raise NotImplementedError(f"{_typeStr(field)} does not support _getState")
+            fieldState = field._getState(self)
+            if fieldState is not _UNCHANGED:
+                state[name] = fieldState
+        return state
+
+    def _setState(self, state, at, label):
+        """Restore the values of fields from the result of `_getState`.
+
+        Parameters
+        ----------
+        state : `dict`
+            The state of each field, keyed by field name.
+        at : `list` of `~lsst.pex.config.callStack.StackFrame`
+            The call stack.
+        label : `str`
+            Event label for the history.
+        """
+        for name, fieldState in state.items():
+            self._fields[name]._setState(self, fieldState, at, label)
 
     def setDefaults(self):
         """Subclass hook for computing defaults.
@@ -1123,7 +2514,9 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         fieldB: True
         fieldC: 'Updated!'
         """
-        at = kw.pop("__at", getCallStack())
+        at = kw.pop("__at", None)
+        if at is None:
+            at = _historyCallStack(self)
         label = kw.pop("__label", "update")
 
         for name, value in kw.items():
@@ -1161,9 +2554,7 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         lsst.pex.config.Config.saveToStream
         lsst.pex.config.Config.saveToString
         """
-        with open(filename) as f:
-            code = compile(f.read(), filename=filename, mode="exec")
-            self.loadFromString(code, root=root, filename=filename)
+        self._loadProgram(_getFileProgram(filename, root), root, filename, None, filename)
 
     def loadFromStream(self, stream, root="config", filename=None, extraLocals=None):
         """Modify this Config in place by executing the Python code in the
@@ -1207,10 +2598,10 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         if hasattr(stream, "read"):
             if filename is None:
                 filename = getattr(stream, "name", "?")
-            code = compile(stream.read(), filename=filename, mode="exec")
+            program = _getProgram(stream.read(), root, filename)
+            self._loadProgram(program, root, filename, extraLocals, filename)
         else:
-            code = stream
-        self.loadFromString(code, root=root, filename=filename, extraLocals=extraLocals)
+            self.loadFromString(stream, root=root, filename=filename, extraLocals=extraLocals)
 
     def loadFromString(self, code, root="config", filename=None, extraLocals=None):
         """Modify this Config in place by executing the Python code in the
@@ -1242,6 +2633,14 @@ class Config(metaclass=ConfigMeta):  # type: ignore
             Raised if a key in extraLocals is the same value as the value of
             the root argument.
 
+        Notes
+        -----
+        Lines like those written by `saveToStream`, such as assignments of
+        literals, are applied directly rather than compiled and executed.
+        This does not change the result: any other lines are executed as
+        Python, and code with statements that span several lines is executed
+        as a whole.
+
         See Also
         --------
         lsst.pex.config.Config.load
@@ -1254,21 +2653,69 @@ class Config(metaclass=ConfigMeta):  # type: ignore
             # try to determine the file name; a compiled string
             # has attribute "co_filename",
             filename = getattr(code, "co_filename", "?")
-        with RecordingImporter() as importer:
-            globals = {"__file__": filename}
-            local = {root: self}
-            if extraLocals is not None:
-                # verify the value of root was not passed as extra local args
-                if root in extraLocals:
-                    raise ValueError(
-                        f"{root} is reserved and cannot be used as a variable name in extraLocals"
-                    )
-                local.update(extraLocals)
-            exec(code, globals, local)
+        if isinstance(code, str | bytes):
+            code = _getProgram(code, root, "<string>")
+        self._loadProgram(code, root, filename, extraLocals, "<string>")
+
+    def _loadProgram(self, program, root, filename, extraLocals, sourceName):
+        """Modify this Config in place by executing compiled Python code.
+
+        Parameters
+        ----------
+        program : `_OverrideProgram` or `~types.CodeType`
+            Configuration override code, as returned by `_getProgram` or
+            compiled by the caller.
+        root : `str`
+            Name of the variable in the code that refers to this config.
+        filename : `str`
+            Name of the configuration file, used for ``__file__``.
+        extraLocals : `dict` of `str` to `object` or `None`
+            Any extra variables to include in local scope when loading.
+        sourceName : `str`
+            File name with which the code was compiled.
 
-        self._imports.update(importer.getModules())
+        Notes
+        -----
+        The modules imported by the first execution of an `_OverrideProgram`
+        are recorded with it, and later executions add the same modules to
+        ``_imports`` without installing a `RecordingImporter`, unless
+        ``extraLocals`` is given. A later execution thus adds the modules
+        imported by the first one even if they were already imported by
+        then.
+        """
+        globals = {"__file__": filename}
+        local = {root: self}
+        if extraLocals is not None:
+            # verify the value of root was not passed as extra local args
+            if root in extraLocals:
+                raise ValueError(f"{root} is reserved and cannot be used as a variable name in extraLocals")
+            local.update(extraLocals)
+        code = program
+        importer = None
+        # The modules imported by code run with extra variables may depend on
+        # them, so they are neither reused nor recorded.
+        reuseImports = isinstance(program, _OverrideProgram) and extraLocals is None
+        if isinstance(program, _OverrideProgram):
+            code = program.code
+        if not reuseImports or not program.hasImports():
+            importer = RecordingImporter()
+
+        with importer if importer is not None else contextlib.nullcontext():
+            if isinstance(code, list):
+                _runSavedLines(code, globals, local, root, sourceName, _historyCallStack(self))
+            else:
+                exec(code, globals, local)
+
+        if importer is None:
+            self._imports.update(program.imports)
+        else:
+            self._imports.update(importer.getModules())
+            if reuseImports:
+                program.recordImports(importer.getModules())
+        if self._name is not None and self._imports:
+            _loadedSubconfigs[id(self)] = self
 
-    def save(self, filename, root="config"):
+    def save(self, filename, root="config", compact=False, skipDefaults=False):
         """Save a Python script to the named file, which, when loaded,
         reproduces this config.
 
@@ -1279,6 +2726,13 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         root : `str`, optional
             Name to use for the root config variable. The same value must be
             used when loading (see `lsst.pex.config.Config.load`).
+        compact : `bool`, optional
+            If `True`, leave out the documentation of the fields, written as
+            comments, and the blank lines between fields.
+        skipDefaults : `bool`, optional
+            If `True`, leave out the values that are the same in a newly
+            constructed config of the same type. The output then reproduces
+            this config only when it is loaded into such a config.
 
         See Also
         --------
@@ -1290,7 +2744,7 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         """
         d = os.path.dirname(filename)
         with tempfile.NamedTemporaryFile(mode="w", delete=False, dir=d) as outfile:
-            self.saveToStream(outfile, root)
+            self.saveToStream(outfile, root, compact=compact, skipDefaults=skipDefaults)
             # tempfile is hardcoded to create files with mode '0600'
             # for an explantion of these antics see:
             # https://stackoverflow.com/questions/10291131/how-to-use-os-umask-in-python
@@ -1302,7 +2756,7 @@ class Config(metaclass=ConfigMeta):  # type: ignore
             # os.rename may not work across filesystems
             shutil.move(outfile.name, filename)
 
-    def saveToString(self, skipImports=False):
+    def saveToString(self, skipImports=False, compact=False, skipDefaults=False):
         """Return the Python script form of this configuration as an executable
         string.
 
@@ -1312,6 +2766,13 @@ class Config(metaclass=ConfigMeta):  # type: ignore
             If `True` then do not include ``import`` statements in output,
             this is to support human-oriented output from ``pipetask`` where
             additional clutter is not useful.
+        compact : `bool`, optional
+            If `True`, leave out the documentation of the fields, written as
+            comments, and the blank lines between fields.
+        skipDefaults : `bool`, optional
+            If `True`, leave out the values that are the same in a newly
+            constructed config of the same type. The output then reproduces
+            this config only when it is loaded into such a config.
 
         Returns
         -------
@@ -1327,10 +2788,10 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         lsst.pex.config.Config.loadFromString
         """
         buffer = io.StringIO()
-        self.saveToStream(buffer, skipImports=skipImports)
+        self.saveToStream(buffer, skipImports=skipImports, compact=compact, skipDefaults=skipDefaults)
         return buffer.getvalue()
 
-    def saveToStream(self, outfile, root="config", skipImports=False):
+    def saveToStream(self, outfile, root="config", skipImports=False, compact=False, skipDefaults=False):
         """Save a configuration file to a stream, which, when loaded,
         reproduces this config.
 
@@ -1346,6 +2807,18 @@ class Config(metaclass=ConfigMeta):  # type: ignore
             If `True` then do not include ``import`` statements in output,
             this is to support human-oriented output from ``pipetask`` where
             additional clutter is not useful.
+        compact : `bool`, optional
+            If `True`, leave out the documentation of the fields, written as
+            comments, and the blank lines between fields.
+        skipDefaults : `bool`, optional
+            If `True`, leave out the values that are the same in a newly
+            constructed config of the same type. The output then reproduces
+            this config only when it is loaded into such a config.
+
+        Notes
+        -----
+        Configs saved with ``compact`` or ``skipDefaults`` are loaded in the
+        same way as any other saved config.
 
         See Also
         --------
@@ -1355,35 +2828,89 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         lsst.pex.config.Config.loadFromStream
         lsst.pex.config.Config.loadFromString
         """
-        tmp = self._name
-        self._rename(root)
-        try:
-            if not skipImports:
-                self._collectImports()
-                # Remove self from the set, as it is handled explicitly below
-                self._imports.remove(self.__module__)
-                configType = type(self)
-                typeString = _typeStr(configType)
-                outfile.write(f"import {configType.__module__}\n")
-                # We are required to write this on a single line because
-                # of later regex matching, rather than adopting black style
-                # formatting.
-                outfile.write(
-                    f'assert type({root}) is {typeString}, f"config is of type '
-                    f'{{type({root}).__module__}}.{{type({root}).__name__}} instead of {typeString}"\n\n'
-                )
-                for imp in sorted(self._imports):
-                    if imp in sys.modules and sys.modules[imp] is not None:
-                        outfile.write(f"import {imp}\n")
-            self._save(outfile)
-        finally:
-            self._rename(tmp)
+        for chunk in self.saveToChunks(root, skipImports, compact, skipDefaults):
+            outfile.write(chunk)
+
+    def saveToChunks(
+        self, root="config", skipImports=False, compact=False, skipDefaults=False, chunkSize=65536
+    ):
+        """Generate the Python script form of this configuration in chunks.
+
+        Parameters
+        ----------
+        root : `str`, optional
+            Name to use for the root config variable. The same value must be
+            used when loading (see `lsst.pex.config.Config.load`).
+        skipImports : `bool`, optional
+            If `True` then do not include ``import`` statements in output.
+        compact : `bool`, optional
+            If `True`, leave out the documentation of the fields.
+        skipDefaults : `bool`, optional
+            If `True`, leave out the values that are the same in a newly
+            constructed config of the same type.
+        chunkSize : `int`, optional
+            Number of characters from which a chunk is yielded.
+
+        Yields
+        ------
+        chunk : `str`
+            Part of the script. The chunks are in order, and joined they
+            are the output of `saveToStream`.
+
+        Notes
+        -----
+        The fields of this config are saved one at a time, and the output
+        is yielded once at least ``chunkSize`` characters have been written,
+        so the chunks can be sent to a socket or a compressor while the rest
+        of the config is saved. A chunk holds whole fields, so it can be
+        longer than ``chunkSize``.
+
+        See Also
+        --------
+        lsst.pex.config.Config.saveToStream
+        """
+        buffer = io.StringIO()
+        if not skipImports:
+            self._collectImports()
+            # Leave out the module of self, as it is handled explicitly below
+            imports = self._imports - {self.__module__}
+            configType = type(self)
+            typeString = _typeStr(configType)
+            buffer.write(f"import {configType.__module__}\n")
+            # We are required to write this on a single line because
+            # of later regex matching, rather than adopting black style
+            # formatting.
+            buffer.write(
+                f'assert type({root}) is {typeString}, f"config is of type '
+                f'{{type({root}).__module__}}.{{type({root}).__name__}} instead of {typeString}"\n\n'
+            )
+            for imp in sorted(imports):
+                if imp in sys.modules and sys.modules[imp] is not None:
+                    buffer.write(f"import {imp}\n")
+        reference = type(self)() if skipDefaults else None
+        for _ in self._iterSaveAs(buffer, root, compact, reference):
+            if buffer.tell() >= chunkSize:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
 
     def freeze(self):
         """Make this config, and all subconfigs, read-only."""
-        self._frozen = True
-        for field in self._fields.values():
-            field.freeze(self)
+        for _, config in _walkConfigs(self, prune=self._delegatesFreeze):
+            if self._delegatesFreeze(None, config):
+                config.freeze()
+                continue
+            config._frozen = True
+            for field in _fieldsOverriding(type(config), "freeze"):
+                field.freeze(config)
+
+    def _delegatesFreeze(self, path, config):
+        """Return whether `freeze` calls the ``freeze`` method of a subconfig,
+        which overrides it, rather than walking the subconfig (`bool`).
+        """
+        return config is not self and type(config).freeze is not Config.freeze
 
     def _save(self, outfile):
         """Save this config to an open stream object.
@@ -1397,19 +2924,124 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         for field in self._fields.values():
             field.save(outfile, self)
 
+    def _saveAs(self, outfile, name, compact=False, reference=None):
+        """Save this config to an open stream object under a given name.
+
+        Parameters
+        ----------
+        outfile : file-like object
+            Destination file object write the config into. Accepts strings not
+            bytes.
+        name : `str`
+            Full name of this config in the output, including the name of the
+            root config.
+        compact : `bool`, optional
+            If `True`, leave out the documentation comments and blank lines.
+        reference : `~lsst.pex.config.Config` or `None`, optional
+            Config that the output will be loaded into. If given, and of the
+            same type as this config, values that would not change it are
+            left out.
+
+        Notes
+        -----
+        The names of this config and of its subconfigs are not changed, so a
+        config can be saved while it is shared. A config whose class
+        overrides `_save`, or that has fields whose types override
+        `~lsst.pex.config.Field.save`, is renamed while it is saved, because
+        those methods take the names from the configs. Such configs are
+        always saved in full.
+        """
+        for _ in self._iterSaveAs(outfile, name, compact, reference):
+            pass
+
+    def _iterSaveAs(self, outfile, name, compact=False, reference=None):
+        """Save this config under a given name, one field at a time.
+
+        Parameters
+        ----------
+        outfile : file-like object
+            Destination file object write the config into. Accepts strings not
+            bytes.
+        name : `str`
+            Full name of this config in the output, including the name of the
+            root config.
+        compact : `bool`, optional
+            If `True`, leave out the documentation comments and blank lines.
+        reference : `~lsst.pex.config.Config` or `None`, optional
+            Config that the output will be loaded into, as for `_saveAs`.
+
+        Yields
+        ------
+        None
+            After each field has been written, or once if the config cannot
+            be saved a field at a time.
+        """
+        cls = type(self)
+        if cls._save is Config._save and not _fieldsOverriding(cls, "save"):
+            if type(reference) is not cls:
+                reference = None
+            for field in self._fields.values():
+                field._saveAs(outfile, self, _joinNamePath(name, field.name), compact, reference)
+                yield
+        elif name == self._name:
+            self._save(outfile)
+            yield
+        else:
+            previous = self._name
+            self._rename(name)
+            try:
+                self._save(outfile)
+            finally:
+                self._rename(previous)
+            yield
+
     def _collectImports(self):
         """Add module containing self to the list of things to import and
         then loops over all the fields in the config calling a corresponding
         collect method.
 
-        The field method will call _collectImports on any
-        configs it may own and return the set of things to import. This
-        returned set will be merged with the set of imports for this config
-        class.
+        The modules of the subconfigs found by `walk`, and any modules
+        imported when they were loaded, are added too. The field method adds
+        any other modules the field needs, and the imports of any configs it
+        owns that `walk` does not visit. A subconfig of a class that
+        overrides this method is not walked; its own method is called and
+        its imports are merged.
+
+        Only the ``_imports`` of this config are updated: those of the
+        subconfigs that are walked are merged into them but are left
+        unchanged. The modules of the subconfigs of a config are found from
+        its class when that gives the same result as walking them, which is
+        the case unless override code has been loaded into one of them.
         """
-        self._imports.add(self.__module__)
-        for name, field in self._fields.items():
-            field._collectImports(self, self._imports)
+        imports = self._imports
+        # Names of the subconfigs whose override code may have imported other
+        # modules, which may be in this tree.
+        loadedNames = [config._name for config in _loadedSubconfigs.values()]
+        stack = [(None, self)]
+        while stack:
+            path, config = stack.pop()
+            if self._delegatesCollectImports(path, config):
+                config._collectImports()
+                imports |= config._imports
+                continue
+            if config is not self:
+                imports |= config._imports
+            if not _holdsLoadedSubconfigs(config._name, loadedNames):
+                closure = _classImports(type(config))
+                if closure is not None:
+                    imports |= closure
+                    continue
+            imports.add(config.__module__)
+            for field in _fieldsOverriding(type(config), "_collectImports"):
+                field._collectImports(config, imports)
+            stack.extend(_subconfigsOf(config, path))
+
+    def _delegatesCollectImports(self, path, config):
+        """Return whether `_collectImports` calls the ``_collectImports``
+        method of a subconfig, which overrides it, rather than walking the
+        subconfig (`bool`).
+        """
+        return config is not self and type(config)._collectImports is not Config._collectImports
 
     def toDict(self):
         """Make a dictionary of field names and their values.
@@ -1442,28 +3074,163 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         -------
         names : `list` of `str`
             Field names.
+
+        See Also
+        --------
+        lsst.pex.config.Config.iterNames
         """
-        #
-        # Rather than sort out the recursion all over again use the
-        # pre-existing saveToStream()
-        #
-        with io.StringIO() as strFd:
-            self.saveToStream(strFd, "config")
-            contents = strFd.getvalue()
-            strFd.close()
-        #
-        # Pull the names out of the dumped config
-        #
-        keys = []
-        for line in contents.split("\n"):
-            if re.search(r"^((assert|import)\s+|\s*$|#)", line):
-                continue
+        return list(self.iterNames())
+
+    def iterNames(self):
+        """Iterate over all the field names in the config, recursively.
+
+        Yields
+        ------
+        name : `str`
+            Field name, relative to this config. Fields of subconfigs are
+            given as ``"sub.name"``, and fields of the configs in a
+            `~lsst.pex.config.ConfigChoiceField` or
+            `~lsst.pex.config.ConfigDictField` as ``"choice['key'].name"``.
+
+        Notes
+        -----
+        The names are found by walking the fields, in the order in which
+        `saveToStream` writes them, without formatting any values. Subconfigs
+        that have not been built yet (see `~lsst.pex.config.lazySubconfigs`)
+        and all the configs that a `~lsst.pex.config.ConfigChoiceField` can
+        select are included, without building them.
 
-            mat = re.search(r"^(?:config\.)?([^=]+)\s*=\s*.*", line)
-            if mat:
-                keys.append(mat.group(1))
+        See Also
+        --------
+        lsst.pex.config.Config.names
+        """
+        return _iterConfigNames(type(self), self, None)
+
+    def walk(self, root=None, prune=None):
+        """Iterate over the fields of this config and of all its subconfigs.
+
+        Parameters
+        ----------
+        root : `str`, optional
+            Name to prefix the field names with, such as ``"config"``. By
+            default the names are relative to this config.
+        prune : callable, optional
+            Function called as ``prune(name, field, value)`` after a field
+            that holds subconfigs has been yielded. If it returns `True`, the
+            subconfigs of that field are skipped.
+
+        Yields
+        ------
+        name : `str`
+            Full name of the field, such as ``"sub.name"`` or
+            ``"choice['key'].name"``.
+        field : `~lsst.pex.config.Field`
+            The field.
+        value : `object`
+            The value of the field, or `None` for a subconfig that has not
+            been built yet (see `~lsst.pex.config.lazySubconfigs`).
+
+        Notes
+        -----
+        The fields are visited depth first in the order in which
+        `saveToStream` writes them, with the fields of the subconfigs of a
+        field following that field. Only subconfigs that have been built are
+        visited. That includes every config of a
+        `~lsst.pex.config.ConfigChoiceField` that has been used, whether or
+        not it is selected, but not subconfigs left at their defaults without
+        being built. The walk itself builds nothing.
+
+        The methods of `~lsst.pex.config.Config` that need to visit every
+        subconfig, such as `freeze`, find them in the same way.
+
+        See Also
+        --------
+        lsst.pex.config.Config.iterNames
+        """
+        fieldPrune = None
+        if prune is not None:
+
+            def fieldPrune(path, config, field):
+                return prune(path, field, _peekValue(config, field))
+
+        for path, config, field in _walk(self, root, fieldPrune):
+            yield path, field, _peekValue(config, field)
+
+    def getByPath(self, path):
+        """Get the value of a field of this config or of one of its
+        subconfigs from its full name.
+
+        Parameters
+        ----------
+        path : `str`
+            Full name of the field, relative to this config, as given by
+            `iterNames` and `walk`, such as ``"sub.name"``,
+            ``"choice['key'].name"`` or ``"dict['key']"``. Other attributes
+            and items may also be used, such as ``"choice.name"`` or
+            ``"choice.active.name"``.
+
+        Returns
+        -------
+        value : `object`
+            The value, as given by ordinary attribute and item access.
+
+        Raises
+        ------
+        ValueError
+            Raised if ``path`` is not a sequence of attribute names and item
+            accessors with literal keys.
+        AttributeError
+            Raised if an attribute in ``path`` does not exist.
+        KeyError
+            Raised if a key in ``path`` does not exist.
+
+        Notes
+        -----
+        Each path is parsed only once, and accessing it afterwards is as fast
+        as writing out the attributes. The objects along the path are looked
+        up on every call, so retargets and selection changes are followed.
+
+        See Also
+        --------
+        lsst.pex.config.Config.setByPath
+        """
+        return _getPathAccessor(path).get(self)
+
+    def setByPath(self, path, value):
+        """Set the value of a field of this config or of one of its
+        subconfigs from its full name.
+
+        Parameters
+        ----------
+        path : `str`
+            Full name of the field, relative to this config, as described in
+            `getByPath`.
+        value : `object`
+            New value.
+
+        Raises
+        ------
+        ValueError
+            Raised if ``path`` is not a sequence of attribute names and item
+            accessors with literal keys.
+
+        Notes
+        -----
+        The value is assigned to the last attribute or item of ``path`` as an
+        ordinary assignment would, and the history records the caller of this
+        method.
 
-        return keys
+        See Also
+        --------
+        lsst.pex.config.Config.getByPath
+        """
+        accessor = _getPathAccessor(path)
+        at = _historyCallStack(self)
+        parent = accessor.getParent(self)
+        if accessor.attr is not None:
+            _callWithHistory(parent.__setattr__, accessor.attr, value, at=at)
+        else:
+            _callWithHistory(parent.__setitem__, accessor.key, value, at=at)
 
     def _rename(self, name):
         """Rename this config object in its parent `~lsst.pex.config.Config`.
@@ -1475,18 +3242,31 @@ class Config(metaclass=ConfigMeta):  # type: ignore
 
         Notes
         -----
-        This method uses the `~lsst.pex.config.Field.rename` method of
+        The subconfigs found by `walk` are renamed with their full names.
+        This method also uses the `~lsst.pex.config.Field.rename` method of
         individual `lsst.pex.config.Field` instances.
-        `lsst.pex.config.Field` subclasses may need to implement a ``rename``
-        method for *this* method to work.
+        `lsst.pex.config.Field` subclasses that hold subconfigs which `walk`
+        does not visit may need to implement a ``rename`` method for *this*
+        method to work.
 
         See Also
         --------
         lsst.pex.config.Field.rename
         """
-        self._name = name
-        for field in self._fields.values():
-            field.rename(self)
+        for path, config in _walkConfigs(self, name, self._delegatesRename):
+            if self._delegatesRename(path, config):
+                config._rename(path)
+                continue
+            config._name = path
+            for field in _fieldsOverriding(type(config), "rename"):
+                field.rename(config)
+
+    def _delegatesRename(self, path, config):
+        """Return whether `_rename` calls the ``_rename`` method of a
+        subconfig, which overrides it, rather than walking the subconfig
+        (`bool`).
+        """
+        return config is not self and type(config)._rename is not Config._rename
 
     def validate(self):
         """Validate the Config, raising an exception if invalid.
@@ -1563,13 +3343,20 @@ class Config(metaclass=ConfigMeta):  # type: ignore
                     stacklevel=2,
                 )
             if at is None:
-                at = getCallStack()
+                at = _historyCallStack(self)
             # This allows Field descriptors to work.
             self._fields[attr].__set__(self, value, at=at, label=label)
         elif hasattr(getattr(self.__class__, attr, None), "__set__"):
             # This allows properties and other non-Field descriptors to work.
             return object.__setattr__(self, attr, value)
-        elif attr in self.__dict__ or attr in ("_name", "_history", "_storage", "_frozen", "_imports"):
+        elif attr in self.__dict__ or attr in (
+            "_name",
+            "_history",
+            "_storage",
+            "_frozen",
+            "_imports",
+            "_fingerprintCache",
+        ):
             # This allows specific private attributes to work.
             self.__dict__[attr] = value
         else:
@@ -1579,7 +3366,7 @@ class Config(metaclass=ConfigMeta):  # type: ignore
     def __delattr__(self, attr, at=None, label="deletion"):
         if attr in self._fields:
             if at is None:
-                at = getCallStack()
+                at = _historyCallStack(self)
             self._fields[attr].__delete__(self, at=at, label=label)
         else:
             object.__delattr__(self, attr)
@@ -1609,6 +3396,52 @@ class Config(metaclass=ConfigMeta):  # type: ignore
             ", ".join(f"{k}={v!r}" for k, v in self.toDict().items() if v is not None),
         )
 
+    def fingerprint(self):
+        """Return a digest of the values of this config and its subconfigs.
+
+        Returns
+        -------
+        fingerprint : `str`
+            Hexadecimal SHA-256 digest. Configs of the same class have the
+            same fingerprint if their fields are equal, with NaN equal to NaN
+            and with only the selected choices of
+            `~lsst.pex.config.ConfigChoiceField` fields taken into account.
+
+        Notes
+        -----
+        The digest of each subconfig is cached with it, and is computed from
+        the digests of its own subconfigs. Changing a field drops the
+        digests of its config and of the configs that hold it, so computing
+        the fingerprint again only encodes the configs on the path from that
+        one to this one. The digest of a frozen config is computed once and
+        kept.
+
+        Unlike `compare`, no tolerance is applied to floating point values,
+        and the fingerprint is not affected by history or names.
+        """
+        return self._fingerprintDigest().hex()
+
+    def _fingerprintDigest(self, parent=None):
+        """Return the digest formatted by `fingerprint`.
+
+        Parameters
+        ----------
+        parent : `Config`, optional
+            Config whose fingerprint is computed from this one, and whose
+            cached fingerprint must be dropped when this config changes.
+
+        Returns
+        -------
+        digest : `bytes`
+            The digest.
+        """
+        cache = self._fingerprintCache
+        if cache is None:
+            cache = self.__dict__["_fingerprintCache"] = (_Fingerprint(self).digest(), {})
+        if parent is not None:
+            cache[1][id(parent)] = weakref.ref(parent)
+        return cache[0]
+
     def compare(self, other, shortcut=True, rtol=1e-8, atol=1e-8, output=None):
         """Compare this configuration to another `~lsst.pex.config.Config` for
         equality.
@@ -1652,15 +3485,109 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         name = getComparisonName(name1, name2)
         return compareConfigs(name, self, other, shortcut=shortcut, rtol=rtol, atol=atol, output=output)
 
+    def diff(self, other):
+        """Return the changes that turn this config into another one.
+
+        Parameters
+        ----------
+        other : `lsst.pex.config.Config`
+            Config of the same type as this one.
+
+        Returns
+        -------
+        patch : `list` [`lsst.pex.config.ConfigPatchEntry`]
+            The changes, in the order in which `applyPatch` applies them. The
+            list is empty if the configs have the same fingerprint.
+
+        Raises
+        ------
+        TypeError
+            Raised if ``other`` is not of the same type as this config.
+
+        See Also
+        --------
+        lsst.pex.config.diffConfigs
+        lsst.pex.config.Config.applyPatch
+
+        Notes
+        -----
+        Applying the patch to this config, or to any config equal to it,
+        makes it equal to ``other``, as `compare` and `fingerprint` see
+        it. Changes of selections, dict keys and targets are entries of
+        their own, so a patch between similar configs is small, and applying
+        it involves no Python code to generate or load.
+
+        Unselected choices of `~lsst.pex.config.ConfigChoiceField` fields
+        are not taken into account.
+        """
+        return diffConfigs(self, other)
+
+    def applyPatch(self, patch):
+        """Apply changes returned by `diff` to this config.
+
+        Parameters
+        ----------
+        patch : `list` [`lsst.pex.config.ConfigPatchEntry`]
+            The changes, in order.
+
+        Raises
+        ------
+        ValueError
+            Raised if a change is of an unknown kind, or if its path is
+            invalid.
+        lsst.pex.config.FieldValidationError
+            Raised if this config is frozen, or if a change cannot be made.
+
+        See Also
+        --------
+        lsst.pex.config.Config.diff
+
+        Notes
+        -----
+        The old values of the changes are not checked. Each path is parsed
+        only once (see `getByPath`), and the history records the caller of
+        this method.
+        """
+        at = _historyCallStack(self)
+        for path, kind, old, new in patch:
+            accessor = _getPathAccessor(path)
+            if kind == "set" or kind == "add":
+                parent = accessor.getParent(self)
+                if accessor.attr is not None:
+                    _callWithHistory(parent.__setattr__, accessor.attr, new, at=at)
+                else:
+                    _callWithHistory(parent.__setitem__, accessor.key, new, at=at)
+            elif kind == "remove":
+                parent = accessor.getParent(self)
+                if accessor.attr is not None:
+                    _callWithHistory(parent.__delattr__, accessor.attr, at=at)
+                else:
+                    _callWithHistory(parent.__delitem__, accessor.key, at=at)
+            elif kind == "select":
+                accessor.get(self)._setSelection(new, at=at)
+            elif kind == "retarget":
+                accessor.get(self).retarget(*new, at=at)
+            else:
+                raise ValueError(f"Unknown kind of change {kind!r} for {path!r}")
+
     @classmethod
-    def __init_subclass__(cls, **kwargs):
+    def __init_subclass__(cls, history=None, lazy=None, **kwargs):
         """Run initialization for every subclass.
 
-        Specifically registers the subclass with a YAML representer
-        and YAML constructor (if pyyaml is available)
+        Specifically records the history recording level given by the
+        ``history`` class keyword (one of ``"off"``, ``"last"`` or
+        ``"full"``, see `historyLevel`), records whether subconfigs are built
+        on first use as given by the ``lazy`` class keyword (see
+        `lazySubconfigs`), and registers the subclass with a YAML
+        representer and YAML constructor (if pyyaml is available).
         """
         super().__init_subclass__(**kwargs)
 
+        if history is not None:
+            cls._classHistoryLevel = _checkHistoryLevel(history)
+        if lazy is not None:
+            cls._classLazySubconfigs = bool(lazy)
+
         if not yaml:
             return
 
@@ -1761,3 +3688,33 @@ def unreduceConfig(cls_, stream):
     config = cls_()
     config.loadFromStream(stream)
     return config
+
+
+def unreduceConfigState(cls_, state, imports):
+    """Create a `~lsst.pex.config.Config` from pickled field values.
+
+    Parameters
+    ----------
+    cls_ : `lsst.pex.config.Config`-type
+        A `lsst.pex.config.Config` type (not an instance) that is instantiated
+        with the field values in ``state``.
+    state : `dict`
+        The state of the config, as returned by ``Config._getState``.
+    imports : `list` of `str`
+        Modules to import before the values are restored, so that registries
+        are populated.
+
+    Returns
+    -------
+    config : `lsst.pex.config.Config`
+        Config instance.
+
+    See Also
+    --------
+    unreduceConfig
+    """
+    for imp in imports:
+        importlib.import_module(imp)
+    config = cls_()
+    config._setState(state, _historyCallStack(config), "assignment")
+    return config
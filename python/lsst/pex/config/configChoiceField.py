@@ -33,9 +33,22 @@ import copy
 import weakref
 from typing import Any, ForwardRef, overload
 
-from .callStack import getCallStack, getStackFrame
-from .comparison import compareConfigs, compareScalars, getComparisonName
-from .config import Config, Field, FieldValidationError, UnexpectedProxyUsageError, _joinNamePath, _typeStr
+from .callStack import getStackFrame
+from .comparison import ConfigPatchEntry, _diffConfigs, compareConfigs, compareScalars, getComparisonName
+from .config import (
+    Config,
+    Field,
+    FieldValidationError,
+    UnexpectedProxyUsageError,
+    _getDefaultConfig,
+    _historyCallStack,
+    _isLazy,
+    _iterConfigNames,
+    _joinNamePath,
+    _modified,
+    _recordHistory,
+    _typeStr,
+)
 
 
 class SelectionSet(collections.abc.MutableSet):
@@ -65,7 +78,7 @@ class SelectionSet(collections.abc.MutableSet):
 
     def __init__(self, dict_, value, at=None, label="assignment", setHistory=True):
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(dict_._config)
         self._dict = dict_
         self._field = self._dict._field
         self._config_ = weakref.ref(self._dict._config)
@@ -73,9 +86,7 @@ class SelectionSet(collections.abc.MutableSet):
         if value is not None:
             try:
                 for v in value:
-                    if v not in self._dict:
-                        # invoke __getitem__ to ensure it's present
-                        self._dict.__getitem__(v, at=at)
+                    self._dict._ensure(v, at=at)
             except TypeError:
                 msg = f"Value {value} is of incorrect type {_typeStr(value)}. Sequence type expected"
                 raise FieldValidationError(self._field, self._config, msg)
@@ -84,7 +95,7 @@ class SelectionSet(collections.abc.MutableSet):
             self._set = set()
 
         if setHistory:
-            self.__history.append((f"Set selection to {self}", at, label))
+            _recordHistory(self._config, self.__history, f"Set selection to {self}", at, label)
 
     @property
     def _config(self) -> Config:
@@ -108,13 +119,11 @@ class SelectionSet(collections.abc.MutableSet):
             raise FieldValidationError(self._field, self._config, "Cannot modify a frozen Config")
 
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(self._config)
 
-        if value not in self._dict:
-            # invoke __getitem__ to make sure it's present
-            self._dict.__getitem__(value, at=at)
+        self._dict._ensure(value, at=at)
 
-        self.__history.append((f"added {value} to selection", at, "selection"))
+        _recordHistory(self._config, self.__history, f"added {value} to selection", at, "selection")
         self._set.add(value)
 
     def discard(self, value, at=None):
@@ -135,9 +144,9 @@ class SelectionSet(collections.abc.MutableSet):
             return
 
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(self._config)
 
-        self.__history.append((f"removed {value} from selection", at, "selection"))
+        _recordHistory(self._config, self.__history, f"removed {value} from selection", at, "selection")
         self._set.discard(value)
 
     def __len__(self):
@@ -205,17 +214,16 @@ class ConfigInstanceDict(collections.abc.Mapping[str, Config]):
             raise FieldValidationError(self._field, self._config, "Cannot modify a frozen Config")
 
         if at is None:
-            at = getCallStack(1)
+            at = _historyCallStack(self._config, 1)
 
         if value is None:
             self._selection = None
         elif self._field.multi:
-            self._selection = SelectionSet(self, value, setHistory=False)
+            self._selection = SelectionSet(self, value, at=at, setHistory=False)
         else:
-            if value not in self._dict:
-                self.__getitem__(value, at=at)  # just invoke __getitem__ to make sure it's present
+            self._ensure(value, at=at)
             self._selection = value
-        self._history.append((value, at, label))
+        _recordHistory(self._config, self._history, value, at, label)
 
     def _getNames(self):
         if not self._field.multi:
@@ -236,6 +244,7 @@ class ConfigInstanceDict(collections.abc.Mapping[str, Config]):
             raise FieldValidationError(
                 self._field, self._config, "Single-selection field has no attribute 'names'"
             )
+        _modified(self._config)
         self._selection = None
 
     def _getName(self):
@@ -257,6 +266,7 @@ class ConfigInstanceDict(collections.abc.Mapping[str, Config]):
             raise FieldValidationError(
                 self._field, self._config, "Multi-selection field has no attribute 'name'"
             )
+        _modified(self._config)
         self._selection = None
 
     names = property(_getNames, _setNames, _delNames)
@@ -287,21 +297,70 @@ class ConfigInstanceDict(collections.abc.Mapping[str, Config]):
     self.names]``. For single-selection, this is equivalent to: ``self[name]``.
     """
 
+    def _getType(self, k):
+        """Return the config class for a key.
+
+        Parameters
+        ----------
+        k : `str`
+            The key.
+
+        Returns
+        -------
+        dtype : `type`
+            The config class.
+
+        Raises
+        ------
+        FieldValidationError
+            Raised if ``k`` is not a valid key.
+        """
+        try:
+            return self.types[k]
+        except Exception:
+            raise FieldValidationError(
+                self._field, self._config, f"Unknown key {k!r} in Registry/ConfigChoiceField"
+            )
+
+    def _ensure(self, k, at=None):
+        """Make sure that a config can be selected.
+
+        Parameters
+        ----------
+        k : `str`
+            The key of the config.
+        at : `list` of `~lsst.pex.config.callStack.StackFrame` or `None`,\
+                optional
+            The call stack.
+
+        Raises
+        ------
+        FieldValidationError
+            Raised if ``k`` is not a valid key.
+
+        Notes
+        -----
+        The config is built now unless the subconfigs of the containing
+        config are built on first use (see `~lsst.pex.config.lazySubconfigs`).
+        """
+        if k not in self._dict:
+            if _isLazy(self._config):
+                self._getType(k)
+            else:
+                self.__getitem__(k, at=at)
+
     def __getitem__(self, k, at=None, label="default"):
         try:
             value = self._dict[k]
         except KeyError:
-            try:
-                dtype = self.types[k]
-            except Exception:
-                raise FieldValidationError(
-                    self._field, self._config, f"Unknown key {k!r} in Registry/ConfigChoiceField"
-                )
+            dtype = self._getType(k)
             name = _joinNamePath(self._config._name, self._field.name, k)
             if at is None:
-                at = getCallStack()
-                at.insert(0, dtype._source)
-            value = self._dict.setdefault(k, dtype(__name=name, __at=at, __label=label))
+                at = [dtype._source] + _historyCallStack(self._config)
+            value = dtype(__name=name, __at=at, __label=label)
+            if self._config._frozen:
+                value.freeze()
+            value = self._dict.setdefault(k, value)
         return value
 
     def __setitem__(self, k, value, at=None, label="assignment"):
@@ -321,7 +380,7 @@ class ConfigInstanceDict(collections.abc.Mapping[str, Config]):
             raise FieldValidationError(self._field, self._config, msg)
 
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(self._config)
         name = _joinNamePath(self._config._name, self._field.name, k)
         oldValue = self._dict.get(k, None)
         if oldValue is None:
@@ -329,9 +388,10 @@ class ConfigInstanceDict(collections.abc.Mapping[str, Config]):
                 self._dict[k] = value(__name=name, __at=at, __label=label)
             else:
                 self._dict[k] = dtype(__name=name, __at=at, __label=label, **value._storage)
+            _modified(self._config)
         else:
             if value == dtype:
-                value = value()
+                value = value(__at=at)
             oldValue.update(__at=at, __label=label, **value._storage)
 
     def _rename(self, fullname):
@@ -430,8 +490,11 @@ class ConfigChoiceField(Field[ConfigInstanceDict]):
     ``active`` attribute is `None` and the field is not optional, validation
     will fail.
 
-    When saving a configuration with a ``ConfigChoiceField``, the entire set is
-    saved, as well as the active selection.
+    When saving a configuration with a ``ConfigChoiceField``, every config in
+    the set that has been accessed or assigned is saved, as well as the active
+    selection. Configs that were never used still hold their defaults, so they
+    are not built just to be saved; the same applies to freezing and
+    `~lsst.pex.config.Config.toDict`.
 
     Examples
     --------
@@ -502,15 +565,16 @@ class ConfigChoiceField(Field[ConfigInstanceDict]):
     def __class_getitem__(cls, params: tuple[type, ...] | type | ForwardRef):
         raise ValueError("ConfigChoiceField does not support typing argument")
 
-    def _getOrMake(self, instance, label="default"):
+    def _getOrMake(self, instance, at=None, label="default"):
         instanceDict = instance._storage.get(self.name)
         if instanceDict is None:
-            at = getCallStack(1)
+            if at is None:
+                at = _historyCallStack(instance, 1)
             instanceDict = self.dtype(instance, self)
             instanceDict.__doc__ = self.doc
             instance._storage[self.name] = instanceDict
             history = instance._history.setdefault(self.name, [])
-            history.append(("Initialized from defaults", at, label))
+            _recordHistory(instance, history, "Initialized from defaults", at, label)
 
         return instanceDict
 
@@ -536,8 +600,8 @@ class ConfigChoiceField(Field[ConfigInstanceDict]):
         if instance._frozen:
             raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
         if at is None:
-            at = getCallStack()
-        instanceDict = self._getOrMake(instance)
+            at = _historyCallStack(instance)
+        instanceDict = self._getOrMake(instance, at=at)
         if isinstance(value, self.instanceDictClass):
             for k, v in value.items():
                 instanceDict.__setitem__(k, v, at=at, label=label)
@@ -546,10 +610,9 @@ class ConfigChoiceField(Field[ConfigInstanceDict]):
         else:
             instanceDict._setSelection(value, at=at, label=label)
 
-    def rename(self, instance):
-        instanceDict = self.__get__(instance)
-        fullname = _joinNamePath(instance._name, self.name)
-        instanceDict._rename(fullname)
+    def _iterSubconfigs(self, instance, path):
+        # Docstring inherited from Field.
+        return [(_joinNamePath(name=path, index=k), v) for k, v in self.__get__(instance)._dict.items()]
 
     def validate(self, instance):
         instanceDict = self.__get__(instance)
@@ -573,33 +636,119 @@ class ConfigChoiceField(Field[ConfigInstanceDict]):
             dict_["name"] = instanceDict.name
 
         values = {}
-        for k, v in instanceDict.items():
+        for k, v in instanceDict._dict.items():
             values[k] = v.toDict()
         dict_["values"] = values
 
         return dict_
 
     def freeze(self, instance):
-        instanceDict = self.__get__(instance)
-        instanceDict.freeze()
-        for v in instanceDict.values():
-            v.freeze()
+        self.__get__(instance).freeze()
 
     def _collectImports(self, instance, imports):
         instanceDict = self.__get__(instance)
-        for config in instanceDict.values():
-            config._collectImports()
-            imports |= config._imports
+        # Selections that have not been built still need their types
+        # registered when loading.
+        selection = instanceDict._selection
+        if selection is not None:
+            for k in selection if self.multi else (selection,):
+                if k not in instanceDict._dict:
+                    imports.add(instanceDict.types[k].__module__)
+
+    def _saveAs(self, outfile, instance, fullname, compact=False, reference=None):
+        # Docstring inherited from Field.
+        instanceDict = self.__get__(instance)
+        referenceDict = None if reference is None else self.__get__(reference)
+        for k, v in instanceDict._dict.items():
+            # Loading the output builds the config at each key, as indexing
+            # the reference does.
+            referenceValue = None if referenceDict is None else referenceDict[k]
+            v._saveAs(outfile, _joinNamePath(name=fullname, index=k), compact, referenceValue)
+        selection = self._formatSelection(fullname, instanceDict)
+        if referenceDict is None or selection != self._formatSelection(fullname, referenceDict):
+            outfile.write(selection)
+
+    def _formatSelection(self, fullname, instanceDict):
+        """Format the assignment of the selection of this field.
+
+        Parameters
+        ----------
+        fullname : `str`
+            Full name of this field.
+        instanceDict : `ConfigInstanceDict`
+            The value of this field.
+
+        Returns
+        -------
+        assignment : `str`
+            The assignment, with a trailing newline.
+        """
+        if self.multi:
+            return f"{fullname}.names={sorted(instanceDict.names)!r}\n"
+        return f"{fullname}.name={instanceDict.name!r}\n"
+
+    def _iterNames(self, instance, name):
+        # Docstring inherited from Field.
+        instanceDict = None if instance is None else self.__get__(instance)
+        types = self.typemap if instanceDict is None else instanceDict.types
+        for k in types:
+            value = None if instanceDict is None else instanceDict._dict.get(k)
+            dtype = types[k] if value is None else type(value)
+            yield from _iterConfigNames(dtype, value, _joinNamePath(name=name, index=k))
+        yield f"{name}.names" if self.multi else f"{name}.name"
+
+    def _getState(self, instance):
+        # Docstring inherited from Field.
+        instanceDict = self.__get__(instance)
+        selection = instanceDict._selection
+        if self.multi and selection is not None:
+            selection = sorted(selection)
+        return (selection, {k: v._getState() for k, v in instanceDict._dict.items()})
+
+    def _setState(self, instance, state, at, label):
+        # Docstring inherited from Field.
+        selection, values = state
+        instanceDict = self.__get__(instance)
+        for k, valueState in values.items():
+            instanceDict.__getitem__(k, at=at, label=label)._setState(valueState, at, label)
+        instanceDict._setSelection(selection, at=at, label=label)
 
-    def save(self, outfile, instance):
+    def _updateFingerprint(self, instance, fingerprint):
+        # Docstring inherited from Field.
+        # Unselected choices are not part of the value.
         instanceDict = self.__get__(instance)
-        fullname = _joinNamePath(instance._name, self.name)
-        for v in instanceDict.values():
-            v._save(outfile)
+        selection = instanceDict._selection
+        fingerprint.add(selection)
+        if selection is not None:
+            names = selection if self.multi else (selection,)
+            fingerprint.add({name: instanceDict[name] for name in names})
+
+    def _diff(self, instance1, instance2, path, patch):
+        # Docstring inherited from Field.
+        # Unselected choices are not part of the value.
+        d1 = self.__get__(instance1)
+        d2 = self.__get__(instance2)
+        selection1 = d1._selection
+        selection2 = d2._selection
         if self.multi:
-            outfile.write(f"{fullname}.names={sorted(instanceDict.names)!r}\n")
-        else:
-            outfile.write(f"{fullname}.name={instanceDict.name!r}\n")
+            selection1 = None if selection1 is None else sorted(selection1)
+            selection2 = None if selection2 is None else sorted(selection2)
+        if selection1 != selection2:
+            patch.append(ConfigPatchEntry(path, "select", selection1, selection2))
+        if selection2 is None:
+            return
+        names1 = () if selection1 is None else selection1 if self.multi else (selection1,)
+        for name in selection2 if self.multi else (selection2,):
+            itemPath = _joinNamePath(name=path, index=name)
+            if name in names1:
+                _diffConfigs(d1[name], d2[name], itemPath, patch)
+            else:
+                # A config equal to instance1 may hold anything at a key that
+                # instance1 does not select, so the config there is replaced
+                # with a default one before being changed.
+                dtype = type(d2[name])
+                patch.append(ConfigPatchEntry(itemPath, "set", dtype, dtype))
+                _diffConfigs(_getDefaultConfig(dtype), d2[name], itemPath, patch)
 
     def __deepcopy__(self, memo):
         """Customize deep-copying, because we always want a reference to the
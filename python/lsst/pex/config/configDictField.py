@@ -27,9 +27,19 @@
 
 __all__ = ["ConfigDictField"]
 
-from .callStack import getCallStack, getStackFrame
-from .comparison import compareConfigs, compareScalars, getComparisonName
-from .config import Config, FieldValidationError, _autocast, _joinNamePath, _typeStr
+from .callStack import getStackFrame
+from .comparison import ConfigPatchEntry, _diffConfigs, compareConfigs, compareScalars, getComparisonName
+from .config import (
+    Config,
+    FieldValidationError,
+    _autocast,
+    _getDefaultConfig,
+    _historyCallStack,
+    _iterConfigNames,
+    _joinNamePath,
+    _recordHistory,
+    _typeStr,
+)
 from .dictField import Dict, DictField
 
 
@@ -55,7 +65,12 @@ class ConfigDict(Dict[str, Config]):
 
     def __init__(self, config, field, value, at, label):
         Dict.__init__(self, config, field, value, at, label, setHistory=False)
-        self.history.append(("Dict initialized", at, label))
+        _recordHistory(self._config, self.history, "Dict initialized", at, label)
+
+    def _setItems(self, value, at, label):
+        for k in value:
+            # do not set history per-item
+            self.__setitem__(k, value[k], at=at, label=label, setHistory=False)
 
     def __setitem__(self, k, x, at=None, label="setitem", setHistory=True):
         if self._config._frozen:
@@ -83,7 +98,7 @@ class ConfigDict(Dict[str, Config]):
             raise FieldValidationError(self._field, self._config, msg)
 
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(self._config)
         name = _joinNamePath(self._config._name, self._field.name, k)
         oldValue = self._dict.get(k, None)
         if oldValue is None:
@@ -92,19 +107,19 @@ class ConfigDict(Dict[str, Config]):
             else:
                 self._dict[k] = dtype(__name=name, __at=at, __label=label, **x._storage)
             if setHistory:
-                self.history.append((f"Added item at key {k}", at, label))
+                _recordHistory(self._config, self.history, f"Added item at key {k}", at, label)
         else:
             if x == dtype:
-                x = dtype()
+                x = dtype(__at=at)
             oldValue.update(__at=at, __label=label, **x._storage)
             if setHistory:
-                self.history.append((f"Modified item at key {k}", at, label))
+                _recordHistory(self._config, self.history, f"Modified item at key {k}", at, label)
 
     def __delitem__(self, k, at=None, label="delitem"):
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(self._config)
         Dict.__delitem__(self, k, at, label, False)
-        self.history.append((f"Removed item at key {k}", at, label))
+        _recordHistory(self._config, self.history, f"Removed item at key {k}", at, label)
 
 
 class ConfigDictField(DictField):
@@ -212,12 +227,12 @@ class ConfigDictField(DictField):
         self.keyCheck = keyCheck
         self.itemCheck = itemCheck
 
-    def rename(self, instance):
+    def _iterSubconfigs(self, instance, path):
+        # Docstring inherited from Field.
         configDict = self.__get__(instance)
-        if configDict is not None:
-            for k in configDict:
-                fullname = _joinNamePath(instance._name, self.name, k)
-                configDict[k]._rename(fullname)
+        if configDict is None:
+            return ()
+        return [(_joinNamePath(name=path, index=k), v) for k, v in configDict.items()]
 
     def validate(self, instance):
         """Validate the field.
@@ -258,31 +273,75 @@ class ConfigDictField(DictField):
 
         return dict_
 
-    def _collectImports(self, instance, imports):
-        # docstring inherited from Field
-        configDict = self.__get__(instance)
-        if configDict is not None:
-            for v in configDict.values():
-                v._collectImports()
-                imports |= v._imports
-
-    def save(self, outfile, instance):
+    def _saveAs(self, outfile, instance, fullname, compact=False, reference=None):
+        # Docstring inherited from Field.
         configDict = self.__get__(instance)
-        fullname = _joinNamePath(instance._name, self.name)
         if configDict is None:
             outfile.write(f"{fullname}={configDict!r}\n")
             return
 
         outfile.write(f"{fullname}={{}}\n")
-        for v in configDict.values():
-            outfile.write(f"{v._name}={_typeStr(v)}()\n")
-            v._save(outfile)
+        for k, v in configDict.items():
+            itemName = _joinNamePath(name=fullname, index=k)
+            outfile.write(f"{itemName}={_typeStr(v)}()\n")
+            # Loading the output assigns a new config to the item.
+            v._saveAs(outfile, itemName, compact, None if reference is None else type(v)())
+
+    def _iterNames(self, instance, name):
+        # Docstring inherited from Field.
+        yield name
+        configDict = self.default if instance is None else self.__get__(instance)
+        if configDict is None:
+            return
+        for k, v in configDict.items():
+            itemName = _joinNamePath(name=name, index=k)
+            yield itemName
+            if isinstance(v, type):
+                yield from _iterConfigNames(v, None, itemName)
+            else:
+                yield from _iterConfigNames(type(v), v, itemName)
 
-    def freeze(self, instance):
+    def _getState(self, instance):
+        # Docstring inherited from Field.
         configDict = self.__get__(instance)
-        if configDict is not None:
-            for k in configDict:
-                configDict[k].freeze()
+        if configDict is None:
+            return None
+        return {k: v._getState() for k, v in configDict.items()}
+
+    def _setState(self, instance, state, at, label):
+        # Docstring inherited from Field.
+        if state is None:
+            self.__set__(instance, None, at=at, label=label)
+            return
+        self.__set__(instance, {}, at=at, label=label)
+        configDict = self.__get__(instance)
+        for k, itemState in state.items():
+            configDict.__setitem__(k, self.itemtype, at=at, label=label)
+            configDict[k]._setState(itemState, at, label)
+
+    def _diff(self, instance1, instance2, path, patch):
+        # Docstring inherited from Field.
+        # Configs are given as their class, which assigning builds with its
+        # defaults, followed by the changes from these defaults.
+        d1 = self.__get__(instance1)
+        d2 = self.__get__(instance2)
+        if d2 is None:
+            if d1 is not None:
+                patch.append(ConfigPatchEntry(path, "set", {k: type(v) for k, v in d1.items()}, None))
+            return
+        if d1 is None:
+            patch.append(ConfigPatchEntry(path, "set", None, {}))
+            d1 = {}
+        for k, v1 in d1.items():
+            if k not in d2:
+                patch.append(ConfigPatchEntry(_joinNamePath(name=path, index=k), "remove", type(v1), None))
+            else:
+                _diffConfigs(v1, d2[k], _joinNamePath(name=path, index=k), patch)
+        for k, v2 in d2.items():
+            if k not in d1:
+                itemPath = _joinNamePath(name=path, index=k)
+                patch.append(ConfigPatchEntry(itemPath, "add", None, type(v2)))
+                _diffConfigs(_getDefaultConfig(type(v2)), v2, itemPath, patch)
 
     def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
         """Compare two fields for equality.
@@ -29,9 +29,24 @@ __all__ = ["ConfigField"]
 
 from typing import Any, overload
 
-from .callStack import getCallStack, getStackFrame
-from .comparison import compareConfigs, getComparisonName
-from .config import Config, Field, FieldTypeVar, FieldValidationError, _joinNamePath, _typeStr
+from .callStack import getStackFrame
+from .comparison import _diffConfigs, compareConfigs, getComparisonName
+from .config import (
+    Config,
+    Field,
+    FieldTypeVar,
+    FieldValidationError,
+    _UNCHANGED,
+    _classImports,
+    _historyCallStack,
+    _isLazy,
+    _iterConfigNames,
+    _joinNamePath,
+    _LazyDefault,
+    _modified,
+    _recordHistory,
+    _typeStr,
+)
 
 
 class ConfigField(Field[FieldTypeVar]):
@@ -95,6 +110,7 @@ class ConfigField(Field[FieldTypeVar]):
             source=source,
             deprecated=deprecated,
         )
+        self._validDefault = None
 
     @overload
     def __get__(
@@ -112,11 +128,40 @@ class ConfigField(Field[FieldTypeVar]):
         else:
             value = instance._storage.get(self.name, None)
             if value is None:
-                at = getCallStack()
-                at.insert(0, self.source)
+                at = [self.source] + _historyCallStack(instance)
                 self.__set__(instance, self.default, at=at, label="default")
+            elif type(value) is _LazyDefault:
+                value = self._makeDefault(instance, value.at, value.label)
+                instance._storage[self.name] = value
+                if instance._frozen:
+                    value.freeze()
+                else:
+                    # The fingerprint of instance must follow the new value.
+                    _modified(instance)
             return value
 
+    def _makeDefault(self, instance, at, label):
+        """Build the default subconfig.
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+        at : `list` of `~lsst.pex.config.callStack.StackFrame`
+            The call stack.
+        label : `str`
+            Event label for the history.
+
+        Returns
+        -------
+        value : `lsst.pex.config.Config`
+            The new subconfig.
+        """
+        name = _joinNamePath(prefix=instance._name, name=self.name)
+        if self.default == self.dtype:
+            return self.dtype(__name=name, __at=at, __label=label)
+        return self.dtype(__name=name, __at=at, __label=label, **self.default._storage)
+
     def __set__(
         self, instance: Config, value: FieldTypeVar | None, at: Any = None, label: str = "assignment"
     ) -> None:
@@ -124,16 +169,24 @@ class ConfigField(Field[FieldTypeVar]):
             raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
         name = _joinNamePath(prefix=instance._name, name=self.name)
 
+        oldValue = instance._storage.get(self.name, None)
+        if type(oldValue) is _LazyDefault:
+            oldValue = None
+        lazy = oldValue is None and _isLazy(instance)
+        if type(value) is _LazyDefault:
+            # An unbuilt default, as copied from the storage of another config.
+            value = self.default
         if value != self.dtype and type(value) is not self.dtype:
             msg = f"Value {value} is of incorrect type {_typeStr(value)}. Expected {_typeStr(self.dtype)}"
             raise FieldValidationError(self, instance, msg)
 
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(instance)
 
-        oldValue = instance._storage.get(self.name, None)
         if oldValue is None:
-            if value == self.dtype:
+            if lazy and value is self.default:
+                instance._storage[self.name] = _LazyDefault(at, label)
+            elif value == self.dtype:
                 instance._storage[self.name] = self.dtype(__name=name, __at=at, __label=label)
             else:
                 instance._storage[self.name] = self.dtype(
@@ -141,40 +194,36 @@ class ConfigField(Field[FieldTypeVar]):
                 )
         else:
             if value == self.dtype:
-                value = value()
+                value = value(__at=at)
             oldValue.update(__at=at, __label=label, **value._storage)
         history = instance._history.setdefault(self.name, [])
-        history.append(("config value set", at, label))
+        _recordHistory(instance, history, "config value set", at, label)
 
-    def rename(self, instance):
-        r"""Rename the field in a `~lsst.pex.config.Config` (for internal use
-        only).
-
-        Parameters
-        ----------
-        instance : `lsst.pex.config.Config`
-            The config instance that contains this field.
-
-        Notes
-        -----
-        This method is invoked by the `lsst.pex.config.Config` object that
-        contains this field and should not be called directly.
-
-        Renaming is only relevant for `~lsst.pex.config.Field` instances that
-        hold subconfigs. `~lsst.pex.config.Field`\s that hold subconfigs should
-        rename each subconfig with the full field name as generated by
-        `lsst.pex.config.config._joinNamePath`.
-        """
-        value = self.__get__(instance)
-        value._rename(_joinNamePath(instance._name, self.name))
+    def _iterSubconfigs(self, instance, path):
+        # Docstring inherited from Field.
+        if type(instance._storage.get(self.name)) is _LazyDefault:
+            return ()
+        return ((path, self.__get__(instance)),)
 
     def _collectImports(self, instance, imports):
-        value = self.__get__(instance)
-        value._collectImports()
-        imports |= value._imports
-
-    def save(self, outfile, instance):
-        """Save this field to a file (for internal use only).
+        if type(instance._storage.get(self.name)) is _LazyDefault:
+            imports.add(self.dtype.__module__)
+
+    def _classImports(self):
+        # Docstring inherited from Field.
+        cls = type(self)
+        if (
+            cls.__set__ is not ConfigField.__set__
+            or cls._collectImports is not ConfigField._collectImports
+            or cls._iterSubconfigs is not ConfigField._iterSubconfigs
+        ):
+            # The value may not be an instance of dtype.
+            return None
+        return _classImports(self.dtype)
+
+    def _saveAs(self, outfile, instance, fullname, compact=False, reference=None):
+        """Save this field to a file under a given name (for internal use
+        only).
 
         Parameters
         ----------
@@ -182,6 +231,15 @@ class ConfigField(Field[FieldTypeVar]):
             A writeable field handle.
         instance : `~lsst.pex.config.Config`
             The `~lsst.pex.config.Config` instance that contains this field.
+        fullname : `str`
+            Full name of this field in the output, including the name of the
+            root config.
+        compact : `bool`, optional
+            If `True`, leave out the documentation comments and blank lines.
+        reference : `~lsst.pex.config.Config` or `None`, optional
+            Config of the same type as ``instance`` that the output will be
+            loaded into. If given, values that would not change it are left
+            out.
 
         Notes
         -----
@@ -192,28 +250,32 @@ class ConfigField(Field[FieldTypeVar]):
         (`lsst.pex.config.Field.doc`) formatted as a Python comment. The second
         line is formatted as an assignment: ``{fullname}={value}``.
 
-        This output can be executed with Python.
+        This output can be executed with Python. A subconfig that has been
+        left at its default without being built is not saved.
         """
+        if type(instance._storage.get(self.name)) is _LazyDefault:
+            return
         value = self.__get__(instance)
-        value._save(outfile)
-
-    def freeze(self, instance):
-        """Make this field read-only.
+        value._saveAs(outfile, fullname, compact, None if reference is None else self.__get__(reference))
 
-        Parameters
-        ----------
-        instance : `lsst.pex.config.Config`
-            The config instance that contains this field.
+    def _iterNames(self, instance, name):
+        # Docstring inherited from Field.
+        if instance is None or type(instance._storage.get(self.name)) is _LazyDefault:
+            yield from _iterConfigNames(self.dtype, None, name)
+            return
+        value = self.__get__(instance)
+        if value is not None:
+            yield from _iterConfigNames(type(value), value, name)
 
-        Notes
-        -----
-        Freezing is only relevant for fields that hold subconfigs. Fields which
-        hold subconfigs should freeze each subconfig.
+    def _getState(self, instance):
+        # Docstring inherited from Field.
+        if type(instance._storage.get(self.name)) is _LazyDefault:
+            return _UNCHANGED
+        return self.__get__(instance)._getState()
 
-        **Subclasses should implement this method.**
-        """
-        value = self.__get__(instance)
-        value.freeze()
+    def _setState(self, instance, state, at, label):
+        # Docstring inherited from Field.
+        self.__get__(instance)._setState(state, at, label)
 
     def toDict(self, instance):
         """Convert the field value so that it can be set as the value of an
@@ -267,7 +329,16 @@ class ConfigField(Field[FieldTypeVar]):
         Most `~lsst.pex.config.Field` subclasses should call
         `lsst.pex.config.Field.validate` if they re-implement
         `~lsst.pex.config.Field.validate`.
+
+        A subconfig that has been left at its default without being built is
+        not built, unless the field has a ``check`` function; its default is
+        validated once instead.
         """
+        if type(instance._storage.get(self.name)) is _LazyDefault and self.check is None:
+            if self._validDefault is not self.default:
+                self._makeDefault(instance, [], "default").validate()
+                self._validDefault = self.default
+            return
         value = self.__get__(instance)
         value.validate()
 
@@ -275,6 +346,22 @@ class ConfigField(Field[FieldTypeVar]):
             msg = f"{value} is not a valid value"
             raise FieldValidationError(self, instance, msg)
 
+    def _updateFingerprint(self, instance, fingerprint):
+        # Docstring inherited from Field.
+        if type(instance._storage.get(self.name)) is _LazyDefault:
+            fingerprint.addDefault(self.default)
+        else:
+            fingerprint.add(self.__get__(instance))
+
+    def _diff(self, instance1, instance2, path, patch):
+        # Docstring inherited from Field.
+        if (
+            type(instance1._storage.get(self.name)) is _LazyDefault
+            and type(instance2._storage.get(self.name)) is _LazyDefault
+        ):
+            return
+        _diffConfigs(self.__get__(instance1), self.__get__(instance2), path, patch)
+
     def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
         """Compare two fields for equality.
 
@@ -304,7 +391,15 @@ class ConfigField(Field[FieldTypeVar]):
         Notes
         -----
         Floating point comparisons are performed by `numpy.allclose`.
+
+        Subconfigs that have both been left at their defaults without being
+        built are equal.
         """
+        if (
+            type(instance1._storage.get(self.name)) is _LazyDefault
+            and type(instance2._storage.get(self.name)) is _LazyDefault
+        ):
+            return True
         c1 = getattr(instance1, self.name)
         c2 = getattr(instance2, self.name)
         name = getComparisonName(
@@ -24,9 +24,15 @@ __all__ = ("ConfigurableActionField",)
 
 from typing import Any, overload
 
-from lsst.pex.config import Config, ConfigField, FieldValidationError
-from lsst.pex.config.callStack import getCallStack
-from lsst.pex.config.config import _joinNamePath, _typeStr
+from lsst.pex.config import Config, ConfigField, ConfigPatchEntry, FieldValidationError
+from lsst.pex.config.comparison import _diffConfigs
+from lsst.pex.config.config import (
+    _getDefaultConfig,
+    _historyCallStack,
+    _joinNamePath,
+    _recordHistory,
+    _typeStr,
+)
 
 from . import ActionTypeVar, ConfigurableAction
 
@@ -81,14 +87,14 @@ class ConfigurableActionField(ConfigField[ActionTypeVar]):
             raise FieldValidationError(self, instance, msg)
 
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(instance)
 
         if isinstance(value, self.dtype):
             instance._storage[self.name] = type(value)(__name=name, __at=at, __label=label, **value._storage)
         else:
             instance._storage[self.name] = value(__name=name, __at=at, __label=label)
         history = instance._history.setdefault(self.name, [])
-        history.append(("config value set", at, label))
+        _recordHistory(instance, history, "config value set", at, label)
 
     @overload
     def __get__(
@@ -106,15 +112,34 @@ class ConfigurableActionField(ConfigField[ActionTypeVar]):
             result.identity = self.name  # type: ignore
         return result
 
-    def save(self, outfile, instance):
+    def _saveAs(self, outfile, instance, fullname, compact=False, reference=None):
         # docstring inherited from parent
         # This is different that the parent class in that this field must
         # serialize which config class is assigned to this field prior to
         # serializing any assignments to that config class's fields.
         value = self.__get__(instance)
-        fullname = _joinNamePath(instance._name, self.name)
         outfile.write(f"{fullname}={_typeStr(value)}\n")
-        super().save(outfile, instance)
+        # Loading the assignment above replaces the action with a new one.
+        value._saveAs(outfile, fullname, compact, None if reference is None else type(value)())
+
+    def _diff(self, instance1, instance2, path, patch):
+        # docstring inherited from parent
+        value1 = self.__get__(instance1)
+        value2 = self.__get__(instance2)
+        if type(value1) is type(value2):
+            super()._diff(instance1, instance2, path, patch)
+            return
+        # Assigning the class of an action replaces it with a new one, whose
+        # fields are then set as in value2.
+        patch.append(ConfigPatchEntry(path, "set", type(value1), type(value2)))
+        _diffConfigs(_getDefaultConfig(type(value2)), value2, path, patch)
+
+    def _iterNames(self, instance, name):
+        # docstring inherited from parent
+        # The assignment of the config class comes before the assignments to
+        # its fields.
+        yield name
+        yield from super()._iterNames(instance, name)
 
     def __init__(self, doc, dtype=ConfigurableAction, default=None, check=None, deprecated=None):
         if not issubclass(dtype, ConfigurableAction):
@@ -27,9 +27,26 @@ from collections.abc import Iterable, Iterator, Mapping
 from types import GenericAlias, SimpleNamespace
 from typing import Any, Generic, TypeVar, overload
 
-from lsst.pex.config.callStack import StackFrame, getCallStack, getStackFrame
-from lsst.pex.config.comparison import compareConfigs, compareScalars, getComparisonName
-from lsst.pex.config.config import Config, Field, FieldValidationError, _joinNamePath, _typeStr
+from lsst.pex.config.callStack import StackFrame, getStackFrame
+from lsst.pex.config.comparison import (
+    ConfigPatchEntry,
+    _diffConfigs,
+    compareConfigs,
+    compareScalars,
+    getComparisonName,
+)
+from lsst.pex.config.config import (
+    Config,
+    Field,
+    FieldValidationError,
+    _getDefaultConfig,
+    _historyCallStack,
+    _iterConfigNames,
+    _joinNamePath,
+    _modified,
+    _recordHistory,
+    _typeStr,
+)
 
 from . import ActionTypeVar, ConfigurableAction
 
@@ -165,11 +182,11 @@ class ConfigurableActionStruct(Generic[ActionTypeVar]):
         object.__setattr__(self, "_field", field)
         object.__setattr__(self, "_history", [])
 
-        self.history.append(("Struct initialized", at, label))
+        _recordHistory(config, self._history, "Struct initialized", at, label)
 
         if value is not None:
             for k, v in value.items():
-                setattr(self, k, v)
+                self.__setattr__(k, v, at=at, label=label)
 
     @property
     def _config(self) -> Config:
@@ -208,12 +225,13 @@ class ConfigurableActionStruct(Generic[ActionTypeVar]):
             base_name = _joinNamePath(self._config._name, self._field.name)
             name = _joinNamePath(base_name, attr)
             if at is None:
-                at = getCallStack()
+                at = _historyCallStack(self._config)
             if isinstance(value, ConfigurableAction):
                 valueInst = type(value)(__name=name, __at=at, __label=label, **value._storage)
             else:
                 valueInst = value(__name=name, __at=at, __label=label)
             self._attrs[attr] = valueInst
+            _modified(self._config)
         else:
             super().__setattr__(attr, value)
 
@@ -228,6 +246,7 @@ class ConfigurableActionStruct(Generic[ActionTypeVar]):
     def __delattr__(self, name):
         if name in self._attrs:
             del self._attrs[name]
+            _modified(self._config)
         else:
             super().__delattr__(name)
 
@@ -319,7 +338,7 @@ class ConfigurableActionStructField(Field[ActionTypeVar]):
             raise FieldValidationError(self, instance, msg)
 
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(instance)
 
         if value is None or (self.default is not None and self.default == value):
             value = self.StructClass(instance, self, value, at=at, label=label)
@@ -343,7 +362,7 @@ class ConfigurableActionStructField(Field[ActionTypeVar]):
                 raise ValueError(f"Unrecognized value {value}, cannot be assigned to this field")
 
             history = instance._history.setdefault(self.name, [])
-            history.append((value, at, label))
+            _recordHistory(instance, history, value, at, label)
 
         if not isinstance(value, ConfigurableActionStruct):
             raise FieldValidationError(
@@ -368,13 +387,40 @@ class ConfigurableActionStructField(Field[ActionTypeVar]):
             field: ConfigurableActionStruct | None = instance._storage[self.name]
             return field
 
-    def rename(self, instance: Config):
+    def _iterSubconfigs(self, instance: Config, path: str):
+        # docstring inherited from Field
         actionStruct: ConfigurableActionStruct = self.__get__(instance)
-        if actionStruct is not None:
-            for k, v in actionStruct.items():
-                base_name = _joinNamePath(instance._name, self.name)
-                fullname = _joinNamePath(base_name, k)
-                v._rename(fullname)
+        if actionStruct is None:
+            return ()
+        return [(_joinNamePath(path, k), v) for k, v in sorted(actionStruct.items())]
+
+    def _updateFingerprint(self, instance, fingerprint):
+        # docstring inherited from Field
+        actionStruct = self.__get__(instance)
+        fingerprint.add(None if actionStruct is None else dict(actionStruct.items()))
+
+    def _diff(self, instance1, instance2, path, patch):
+        # docstring inherited from Field
+        # Actions are given as their class, which assigning builds with its
+        # defaults, followed by the changes from these defaults.
+        actionStruct1 = self.__get__(instance1)
+        actionStruct2 = self.__get__(instance2)
+        actions1 = {} if actionStruct1 is None else dict(actionStruct1.items())
+        actions2 = {} if actionStruct2 is None else dict(actionStruct2.items())
+        for k, v1 in actions1.items():
+            if k not in actions2:
+                patch.append(ConfigPatchEntry(_joinNamePath(path, k), "remove", type(v1), None))
+            elif type(v1) is type(actions2[k]):
+                _diffConfigs(v1, actions2[k], _joinNamePath(path, k), patch)
+        for k, v2 in actions2.items():
+            v1 = actions1.get(k)
+            if v1 is None or type(v1) is not type(v2):
+                actionPath = _joinNamePath(path, k)
+                if v1 is None:
+                    patch.append(ConfigPatchEntry(actionPath, "add", None, type(v2)))
+                else:
+                    patch.append(ConfigPatchEntry(actionPath, "set", type(v1), type(v2)))
+                _diffConfigs(_getDefaultConfig(type(v2)), v2, actionPath, patch)
 
     def validate(self, instance: Config):
         value = self.__get__(instance)
@@ -391,9 +437,9 @@ class ConfigurableActionStructField(Field[ActionTypeVar]):
 
         return dict_
 
-    def save(self, outfile, instance):
+    def _saveAs(self, outfile, instance, fullname, compact=False, reference=None):
+        # docstring inherited from Field
         actionStruct = self.__get__(instance)
-        fullname = _joinNamePath(instance._name, self.name)
 
         # Ensure that a struct is always empty before assigning to it.
         outfile.write(f"{fullname}=None\n")
@@ -401,22 +447,24 @@ class ConfigurableActionStructField(Field[ActionTypeVar]):
         if actionStruct is None:
             return
 
-        for _, v in sorted(actionStruct.items()):
-            outfile.write(f"{v._name}={_typeStr(v)}()\n")
-            v._save(outfile)
-
-    def freeze(self, instance):
-        actionStruct = self.__get__(instance)
-        if actionStruct is not None:
-            for v in actionStruct:
-                v.freeze()
+        for k, v in sorted(actionStruct.items()):
+            itemName = _joinNamePath(fullname, k)
+            outfile.write(f"{itemName}={_typeStr(v)}()\n")
+            v._saveAs(outfile, itemName, compact, None if reference is None else type(v)())
 
-    def _collectImports(self, instance, imports):
+    def _iterNames(self, instance, name):
         # docstring inherited from Field
-        actionStruct = self.__get__(instance)
-        for v in actionStruct:
-            v._collectImports()
-            imports |= v._imports
+        yield name
+        actionStruct = self.default if instance is None else self.__get__(instance)
+        if actionStruct is None:
+            return
+        for k, v in sorted(actionStruct.items()):
+            itemName = _joinNamePath(name, k)
+            yield itemName
+            if isinstance(v, type):
+                yield from _iterConfigNames(v, None, itemName)
+            else:
+                yield from _iterConfigNames(type(v), v, itemName)
 
     def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
         """Compare two fields for equality.
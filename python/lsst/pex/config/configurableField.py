@@ -34,15 +34,22 @@ import weakref
 from collections.abc import Mapping
 from typing import Any, Generic, overload
 
-from .callStack import getCallStack, getStackFrame
-from .comparison import compareConfigs, getComparisonName
+from .callStack import getStackFrame
+from .comparison import ConfigPatchEntry, _diffConfigs, compareConfigs, getComparisonName
 from .config import (
     Config,
     Field,
     FieldTypeVar,
     FieldValidationError,
     UnexpectedProxyUsageError,
+    _getDefaultConfig,
+    _historyCallStack,
+    _isLazy,
+    _iterConfigNames,
     _joinNamePath,
+    _LazyDefault,
+    _modified,
+    _recordHistory,
     _typeStr,
 )
 
@@ -100,12 +107,15 @@ class ConfigurableInstance(Generic[FieldTypeVar]):
         object.__setattr__(self, "_value", None)
 
         if at is None:
-            at = getCallStack()
-        at += [self._field.source]
-        self.__initValue(at, label)
+            at = _historyCallStack(config)
+        at = at + [self._field.source]
+        if _isLazy(config):
+            object.__setattr__(self, "_value", _LazyDefault(at, label))
+        else:
+            self.__initValue(at, label)
 
         history = config._history.setdefault(field.name, [])
-        history.append(("Targeted and initialized from defaults", at, label))
+        _recordHistory(config, history, "Targeted and initialized from defaults", at, label)
 
     @property
     def _config(self) -> Config:
@@ -122,10 +132,25 @@ class ConfigurableInstance(Generic[FieldTypeVar]):
     """The configuration class (read-only)
     """
 
-    value = property(lambda x: x._value)
-    """The `ConfigClass` instance (`lsst.pex.config.Config`-type,
-    read-only).
-    """
+    @property
+    def value(self):
+        """The `ConfigClass` instance (`lsst.pex.config.Config`-type,
+        read-only).
+        """
+        if type(self._value) is _LazyDefault:
+            self.__initValue(self._value.at, self._value.label)
+            if self._config._frozen:
+                self._value.freeze()
+            else:
+                # The fingerprint of the config must follow the new value.
+                _modified(self._config)
+        return self._value
+
+    def _isLazyDefault(self):
+        """Return `True` if the ``value`` has been left at its default
+        without being built (see `~lsst.pex.config.lazySubconfigs`).
+        """
+        return type(self._value) is _LazyDefault
 
     def apply(self, *args, **kw):
         """Call the configurable.
@@ -169,7 +194,7 @@ class ConfigurableInstance(Generic[FieldTypeVar]):
             raise FieldValidationError(self._field, self._config, e.message)
 
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(self._config)
         object.__setattr__(self, "_target", target)
         if ConfigClass != self.ConfigClass:
             object.__setattr__(self, "_ConfigClass", ConfigClass)
@@ -177,10 +202,10 @@ class ConfigurableInstance(Generic[FieldTypeVar]):
 
         history = self._config._history.setdefault(self._field.name, [])
         msg = f"retarget(target={_typeStr(target)}, ConfigClass={_typeStr(ConfigClass)})"
-        history.append((msg, at, label))
+        _recordHistory(self._config, history, msg, at, label)
 
     def __getattr__(self, name):
-        return getattr(self._value, name)
+        return getattr(self.value, name)
 
     def __setattr__(self, name, value, at=None, label="assignment"):
         """Pretend to be an instance of ConfigClass.
@@ -196,8 +221,8 @@ class ConfigurableInstance(Generic[FieldTypeVar]):
             object.__setattr__(self, name, value)
         else:
             if at is None:
-                at = getCallStack()
-            self._value.__setattr__(name, value, at=at, label=label)
+                at = _historyCallStack(self._config)
+            self.value.__setattr__(name, value, at=at, label=label)
 
     def __delattr__(self, name, at=None, label="delete"):
         """
@@ -213,8 +238,8 @@ class ConfigurableInstance(Generic[FieldTypeVar]):
             object.__delattr__(self, name)
         except AttributeError:
             if at is None:
-                at = getCallStack()
-            self._value.__delattr__(name, at=at, label=label)
+                at = _historyCallStack(self._config)
+            self.value.__delattr__(name, at=at, label=label)
 
     def __reduce__(self):
         raise UnexpectedProxyUsageError(
@@ -341,6 +366,7 @@ class ConfigurableField(Field[ConfigurableInstance[FieldTypeVar]]):
         )
         self.target = target
         self.ConfigClass = ConfigClass
+        self._validDefault = None
 
     @staticmethod
     def _parseTypingArgs(
@@ -352,7 +378,7 @@ class ConfigurableField(Field[ConfigurableInstance[FieldTypeVar]]):
         value = instance._storage.get(self.name, None)
         if value is None:
             if at is None:
-                at = getCallStack(1)
+                at = _historyCallStack(instance, 1)
             value = ConfigurableInstance(instance, self, at=at, label=label)
             instance._storage[self.name] = value
         return value
@@ -377,7 +403,7 @@ class ConfigurableField(Field[ConfigurableInstance[FieldTypeVar]]):
         if instance._frozen:
             raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(instance)
         oldValue = self.__getOrMake(instance, at=at)
 
         if isinstance(value, ConfigurableInstance):
@@ -386,7 +412,10 @@ class ConfigurableField(Field[ConfigurableInstance[FieldTypeVar]]):
         elif type(value) is oldValue._ConfigClass:
             oldValue.update(__at=at, __label=label, **value._storage)
         elif value == oldValue.ConfigClass:
-            value = oldValue.ConfigClass()
+            if oldValue._isLazyDefault():
+                # A fresh ConfigClass is what the lazy value will build.
+                return
+            value = oldValue.ConfigClass(__at=at)
             oldValue.update(__at=at, __label=label, **value._storage)
         else:
             msg = (
@@ -395,36 +424,97 @@ class ConfigurableField(Field[ConfigurableInstance[FieldTypeVar]]):
             )
             raise FieldValidationError(self, instance, msg)
 
-    def rename(self, instance):
-        fullname = _joinNamePath(instance._name, self.name)
+    def _iterSubconfigs(self, instance, path):
+        # Docstring inherited from Field.
         value = self.__getOrMake(instance)
-        value._rename(fullname)
+        if value._isLazyDefault():
+            return ()
+        return ((path, value.value),)
 
     def _collectImports(self, instance, imports):
         value = self.__get__(instance)
-        target = value.target
-        imports.add(target.__module__)
-        value.value._collectImports()
-        imports |= value.value._imports
+        imports.add(value.target.__module__)
+        if value._isLazyDefault():
+            imports.add(value.ConfigClass.__module__)
 
-    def save(self, outfile, instance):
-        fullname = _joinNamePath(instance._name, self.name)
+    def _saveAs(self, outfile, instance, fullname, compact=False, reference=None):
+        # Docstring inherited from Field.
         value = self.__getOrMake(instance)
         target = value.target
+        referenceValue = None if reference is None else self.__getOrMake(reference)
 
         if target != self.target:
             # not targeting the field-default target.
             # save target information
             ConfigClass = value.ConfigClass
             outfile.write(
-                f"{fullname}.retarget(target={_typeStr(target)}, ConfigClass={_typeStr(ConfigClass)})\n\n"
+                f"{fullname}.retarget(target={_typeStr(target)}, ConfigClass={_typeStr(ConfigClass)})\n"
             )
+            if not compact:
+                outfile.write("\n")
+            if referenceValue is not None:
+                # Loading the output retargets the reference in the same way.
+                referenceValue.retarget(target, ConfigClass)
         # save field values
-        value._save(outfile)
+        if not value._isLazyDefault():
+            value.value._saveAs(
+                outfile, fullname, compact, None if referenceValue is None else referenceValue.value
+            )
 
-    def freeze(self, instance):
-        value = self.__getOrMake(instance)
-        value.freeze()
+    def _iterNames(self, instance, name):
+        # Docstring inherited from Field.
+        if instance is None:
+            return _iterConfigNames(self.ConfigClass, None, name)
+        value = self.__get__(instance)
+        return _iterConfigNames(value.ConfigClass, None if value._isLazyDefault() else value.value, name)
+
+    def _getState(self, instance):
+        # Docstring inherited from Field.
+        value = self.__get__(instance)
+        target = None
+        if value.target != self.target or value.ConfigClass != self.ConfigClass:
+            target = (value.target, value.ConfigClass)
+        return (target, None if value._isLazyDefault() else value.value._getState())
+
+    def _setState(self, instance, state, at, label):
+        # Docstring inherited from Field.
+        target, valueState = state
+        value = self.__get__(instance)
+        if target is not None:
+            value.retarget(*target, at=at, label=label)
+        if valueState is not None:
+            value.value._setState(valueState, at, label)
+
+    def _updateFingerprint(self, instance, fingerprint):
+        # Docstring inherited from Field.
+        value = self.__get__(instance)
+        fingerprint.add(_typeStr(value.target))
+        if not value._isLazyDefault():
+            fingerprint.add(value.value)
+        elif type(self.default) is value.ConfigClass:
+            fingerprint.addDefault(self.default)
+        else:
+            fingerprint.addDefault(value.ConfigClass)
+
+    def _diff(self, instance1, instance2, path, patch):
+        # Docstring inherited from Field.
+        value1 = self.__get__(instance1)
+        value2 = self.__get__(instance2)
+        if value1.target != value2.target or value1.ConfigClass != value2.ConfigClass:
+            patch.append(
+                ConfigPatchEntry(
+                    path, "retarget", (value1.target, value1.ConfigClass), (value2.target, value2.ConfigClass)
+                )
+            )
+        if value1.ConfigClass != value2.ConfigClass:
+            # Retargeting builds a new value, with the defaults of the field
+            # if they are of the new ConfigClass.
+            if value2._isLazyDefault():
+                return
+            default = self.default if type(self.default) is value2.ConfigClass else value2.ConfigClass
+            _diffConfigs(_getDefaultConfig(default), value2.value, path, patch)
+        elif not (value1._isLazyDefault() and value2._isLazyDefault()):
+            _diffConfigs(value1.value, value2.value, path, patch)
 
     def toDict(self, instance):
         value = self.__get__(instance)
@@ -432,6 +522,14 @@ class ConfigurableField(Field[ConfigurableInstance[FieldTypeVar]]):
 
     def validate(self, instance):
         value = self.__get__(instance)
+        if value._isLazyDefault() and self.check is None:
+            # Validate the defaults once, rather than building the value.
+            if self._validDefault is not self.default:
+                storage = self.default._storage if type(self.default) is self.ConfigClass else {}
+                name = _joinNamePath(instance._name, self.name)
+                self.ConfigClass(__name=name, __at=[], **storage).validate()
+                self._validDefault = self.default
+            return
         value.validate()
 
         if self.check is not None and not self.check(value):
@@ -482,8 +580,12 @@ class ConfigurableField(Field[ConfigurableInstance[FieldTypeVar]]):
         -----
         Floating point comparisons are performed by `numpy.allclose`.
         """
-        c1 = getattr(instance1, self.name)._value
-        c2 = getattr(instance2, self.name)._value
+        c1 = getattr(instance1, self.name)
+        c2 = getattr(instance2, self.name)
+        if c1._isLazyDefault() and c2._isLazyDefault() and c1.ConfigClass is c2.ConfigClass:
+            return True
+        c1 = c1.value
+        c2 = c2.value
         name = getComparisonName(
             _joinNamePath(instance1._name, self.name), _joinNamePath(instance2._name, self.name)
         )
@@ -34,15 +34,23 @@ import weakref
 from collections.abc import Iterator, Mapping
 from typing import Any, ForwardRef, Generic, TypeVar, cast
 
-from .callStack import getCallStack, getStackFrame
-from .comparison import compareScalars, getComparisonName
+from .callStack import getStackFrame
+from .comparison import ConfigPatchEntry, _compareItems, _equalValues, compareScalars, getComparisonName
 from .config import (
+    _DELETED,
+    _UNCHANGED,
+    _WHOLE,
     Config,
     Field,
     FieldValidationError,
     UnexpectedProxyUsageError,
     _autocast,
+    _containerHistory,
+    _historyCallStack,
     _joinNamePath,
+    _modified,
+    _recordChange,
+    _recordHistory,
     _typeStr,
 )
 
@@ -75,18 +83,19 @@ class Dict(collections.abc.MutableMapping[KeyTypeVar, ItemTypeVar]):
         self._field = field
         self._config_ = weakref.ref(config)
         self._dict = {}
-        self._history = self._config._history.setdefault(self._field.name, [])
+        self._history = _containerHistory(self._config, self._field.name)
         self.__doc__ = field.doc
         if value is not None:
             try:
-                for k in value:
-                    # do not set history per-item
-                    self.__setitem__(k, value[k], at=at, label=label, setHistory=False)
+                self._setItems(value, at, label)
             except TypeError:
                 msg = f"Value {value} is of incorrect type {_typeStr(value)}. Mapping type expected."
                 raise FieldValidationError(self._field, self._config, msg)
         if setHistory:
-            self._history.append((dict(self._dict), at, label))
+            _recordChange(self._config, self._history, self, self._dict, _WHOLE, None, at, label)
+        else:
+            _modified(self._config)
+            self._history.invalidate()
 
     @property
     def _config(self) -> Config:
@@ -112,13 +121,62 @@ class Dict(collections.abc.MutableMapping[KeyTypeVar, ItemTypeVar]):
     def __contains__(self, k: Any) -> bool:
         return k in self._dict
 
-    def __setitem__(
-        self, k: KeyTypeVar, x: ItemTypeVar, at: Any = None, label: str = "setitem", setHistory: bool = True
-    ) -> None:
-        if self._config._frozen:
-            msg = f"Cannot modify a frozen Config. Attempting to set item at key {k!r} to value {x}"
-            raise FieldValidationError(self._field, self._config, msg)
+    def _setItems(self, value, at, label):
+        """Set the items of a new container, without recording history.
+
+        Parameters
+        ----------
+        value : `~collections.abc.Mapping`
+            Items to set.
+        at : `list` of `~lsst.pex.config.callStack.StackFrame`
+            The call stack.
+        label : `str`
+            Event label.
+
+        Notes
+        -----
+        The items are validated in a single pass, and the checks of each item
+        are only run in full if some item needs a cast or a user check.
+        """
+        items = {k: value[k] for k in value}
+        field = self._field
+        keytype = field.keytype
+        itemtype = field.itemtype
+        if (
+            field.keyCheck is None
+            and field.itemCheck is None
+            and itemtype is not None
+            and all(type(k) is keytype for k in items)
+            and all(type(x) is itemtype or x is None for x in items.values())
+        ):
+            self._dict = items
+        else:
+            self._dict = dict(self._validateItem(k, x) for k, x in items.items())
+
+    def _validateItem(self, k, x):
+        """Cast and validate an item.
+
+        Parameters
+        ----------
+        k : `object`
+            Key of the item.
+        x : `object`
+            Value of the item.
+
+        Returns
+        -------
+        k : `object`
+            Key of the item, cast to the key type of the field.
+        x : `object`
+            Value of the item, cast to the item type of the field.
 
+        Raises
+        ------
+        FieldValidationError
+            Raised if the key or value does not have the appropriate type for
+            this field or does not pass the field's ``keyCheck`` or
+            ``itemCheck`` methods.
+        """
         # validate keytype
         k = _autocast(k, self._field.keytype)
         if type(k) is not self._field.keytype:
@@ -149,12 +207,24 @@ class Dict(collections.abc.MutableMapping[KeyTypeVar, ItemTypeVar]):
             msg = f"Item at key {k!r} is not a valid value: {x}"
             raise FieldValidationError(self._field, self._config, msg)
 
-        if at is None:
-            at = getCallStack()
+        return k, x
+
+    def __setitem__(
+        self, k: KeyTypeVar, x: ItemTypeVar, at: Any = None, label: str = "setitem", setHistory: bool = True
+    ) -> None:
+        if self._config._frozen:
+            msg = f"Cannot modify a frozen Config. Attempting to set item at key {k!r} to value {x}"
+            raise FieldValidationError(self._field, self._config, msg)
 
+        k, x = self._validateItem(k, x)
         self._dict[k] = x
         if setHistory:
-            self._history.append((dict(self._dict), at, label))
+            if at is None:
+                at = _historyCallStack(self._config)
+            _recordChange(self._config, self._history, self, self._dict, k, x, at, label)
+        else:
+            _modified(self._config)
+            self._history.invalidate()
 
     def __delitem__(
         self, k: KeyTypeVar, at: Any = None, label: str = "delitem", setHistory: bool = True
@@ -165,8 +235,11 @@ class Dict(collections.abc.MutableMapping[KeyTypeVar, ItemTypeVar]):
         del self._dict[k]
         if setHistory:
             if at is None:
-                at = getCallStack()
-            self._history.append((dict(self._dict), at, label))
+                at = _historyCallStack(self._config)
+            _recordChange(self._config, self._history, self, self._dict, k, _DELETED, at, label)
+        else:
+            _modified(self._config)
+            self._history.invalidate()
 
     def __repr__(self):
         return repr(self._dict)
@@ -375,12 +448,12 @@ class DictField(Field[Dict[KeyTypeVar, ItemTypeVar]], Generic[KeyTypeVar, ItemTy
             raise FieldValidationError(self, instance, msg)
 
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(instance)
         if value is not None:
             value = self.DictClass(instance, self, value, at=at, label=label)
         else:
             history = instance._history.setdefault(self.name, [])
-            history.append((value, at, label))
+            _recordHistory(instance, history, value, at, label)
 
         instance._storage[self.name] = value
 
@@ -402,6 +475,32 @@ class DictField(Field[Dict[KeyTypeVar, ItemTypeVar]], Generic[KeyTypeVar, ItemTy
         value = self.__get__(instance)
         return dict(value) if value is not None else None
 
+    def _getState(self, instance):
+        # Docstring inherited from Field.
+        value = self.__get__(instance)
+        if self.deprecated and value == self.default:
+            return _UNCHANGED
+        return dict(value) if value is not None else None
+
+    def _diff(self, instance1, instance2, path, patch):
+        # Docstring inherited from Field.
+        d1 = self.toDict(instance1)
+        d2 = self.toDict(instance2)
+        if d1 is None or d2 is None:
+            if d1 is not d2:
+                patch.append(ConfigPatchEntry(path, "set", d1, d2))
+            return
+        # Keys are added and removed one by one, rather than by replacing
+        # the whole dict.
+        for k, v1 in d1.items():
+            if k not in d2:
+                patch.append(ConfigPatchEntry(_joinNamePath(name=path, index=k), "remove", v1, None))
+            elif not _equalValues(v1, d2[k]):
+                patch.append(ConfigPatchEntry(_joinNamePath(name=path, index=k), "set", v1, d2[k]))
+        for k, v2 in d2.items():
+            if k not in d1:
+                patch.append(ConfigPatchEntry(_joinNamePath(name=path, index=k), "add", None, v2))
+
     def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
         """Compare two fields for equality.
 
@@ -443,13 +542,15 @@ class DictField(Field[Dict[KeyTypeVar, ItemTypeVar]], Generic[KeyTypeVar, ItemTy
             return True
         if not compareScalars(f"keys for {name}", set(d1.keys()), set(d2.keys()), output=output):
             return False
-        equal = True
-        for k, v1 in d1.items():
-            v2 = d2[k]
-            result = compareScalars(
-                f"{name}[{k!r}]", v1, v2, dtype=self.itemtype, rtol=rtol, atol=atol, output=output
-            )
-            if not result and shortcut:
-                return False
-            equal = equal and result
-        return equal
+        keys = list(d1.keys())
+        return _compareItems(
+            name,
+            keys,
+            [d1[k] for k in keys],
+            [d2[k] for k in keys],
+            shortcut=shortcut,
+            rtol=rtol,
+            atol=atol,
+            output=output,
+            dtype=self.itemtype,
+        )
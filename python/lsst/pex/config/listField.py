@@ -32,16 +32,26 @@ import weakref
 from collections.abc import Iterable, MutableSequence
 from typing import Any, Generic, overload
 
-from .callStack import getCallStack, getStackFrame
-from .comparison import compareScalars, getComparisonName
+import numpy
+
+from .callStack import getStackFrame
+from .comparison import ConfigPatchEntry, _compareItems, _equalValues, compareScalars, getComparisonName
 from .config import (
+    _DELETED,
+    _UNCHANGED,
+    _WHOLE,
     Config,
     Field,
     FieldTypeVar,
     FieldValidationError,
     UnexpectedProxyUsageError,
     _autocast,
+    _containerHistory,
+    _historyCallStack,
     _joinNamePath,
+    _modified,
+    _recordChange,
+    _recordHistory,
     _typeStr,
 )
 
@@ -76,18 +86,20 @@ class List(collections.abc.MutableSequence[FieldTypeVar]):
     def __init__(self, config, field, value, at, label, setHistory=True):
         self._field = field
         self._config_ = weakref.ref(config)
-        self._history = self._config._history.setdefault(self._field.name, [])
+        self._history = _containerHistory(self._config, self._field.name)
         self._list = []
         self.__doc__ = field.doc
         if value is not None:
             try:
-                for i, x in enumerate(value):
-                    self.insert(i, x, setHistory=False)
+                self._list = self._validateItems(value)
             except TypeError:
                 msg = f"Value {value} is of incorrect type {_typeStr(value)}. Sequence type expected"
                 raise FieldValidationError(self._field, config, msg)
         if setHistory:
-            self.history.append((list(self._list), at, label))
+            _recordChange(self._config, self._history, self, self._list, _WHOLE, None, at, label)
+        else:
+            _modified(self._config)
+            self._history.invalidate()
 
     @property
     def _config(self) -> Config:
@@ -125,6 +137,50 @@ class List(collections.abc.MutableSequence[FieldTypeVar]):
             msg = f"Item at position {i} is not a valid value: {x}"
             raise FieldValidationError(self._field, self._config, msg)
 
+    def _validateItems(self, value):
+        """Cast and validate the items of a new list in a single pass.
+
+        Parameters
+        ----------
+        value : iterable
+            Items of the list.
+
+        Returns
+        -------
+        items : `list`
+            The validated items.
+
+        Raises
+        ------
+        FieldValidationError
+            Raised if an item does not have the appropriate type for this
+            field or does not pass the field's `ListField.itemCheck` method.
+
+        Notes
+        -----
+        One-dimensional `numpy.ndarray` objects of ``float64`` are converted
+        to `float` in bulk.
+        """
+        itemtype = self._field.itemtype
+        if (
+            itemtype is float
+            and isinstance(value, numpy.ndarray)
+            and value.ndim == 1
+            and value.dtype == numpy.float64
+        ):
+            items = value.tolist()
+            exact = True
+        else:
+            items = list(value)
+            exact = all(type(x) is itemtype for x in items)
+            if not exact and itemtype is float:
+                items = [_autocast(x, itemtype) for x in items]
+                exact = all(type(x) is itemtype for x in items)
+        if not exact or self._field.itemCheck is not None:
+            for i, x in enumerate(items):
+                self.validateItem(i, x)
+        return items
+
     def list(self):
         """Sequence of items contained by the `List` (`list`)."""
         return self._list
@@ -171,8 +227,13 @@ class List(collections.abc.MutableSequence[FieldTypeVar]):
         self._list[i] = x
         if setHistory:
             if at is None:
-                at = getCallStack()
-            self.history.append((list(self._list), at, label))
+                at = _historyCallStack(self._config)
+            if isinstance(i, slice):
+                x = list(x)
+            _recordChange(self._config, self._history, self, self._list, i, x, at, label)
+        else:
+            _modified(self._config)
+            self._history.invalidate()
 
     @overload
     def __getitem__(self, i: int) -> FieldTypeVar: ...
@@ -189,8 +250,11 @@ class List(collections.abc.MutableSequence[FieldTypeVar]):
         del self._list[i]
         if setHistory:
             if at is None:
-                at = getCallStack()
-            self.history.append((list(self._list), at, label))
+                at = _historyCallStack(self._config)
+            _recordChange(self._config, self._history, self, self._list, i, _DELETED, at, label)
+        else:
+            _modified(self._config)
+            self._history.invalidate()
 
     def __iter__(self):
         return iter(self._list)
@@ -214,8 +278,8 @@ class List(collections.abc.MutableSequence[FieldTypeVar]):
             Enable setting the field's history, using the value of the ``at``
             parameter. Default is `True`.
         """
-        if at is None:
-            at = getCallStack()
+        if at is None and setHistory:
+            at = _historyCallStack(self._config)
         self.__setitem__(slice(i, i), [x], at=at, label=label, setHistory=setHistory)
 
     def __repr__(self):
@@ -433,13 +497,13 @@ class ListField(Field[List[FieldTypeVar]], Generic[FieldTypeVar]):
             raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
 
         if at is None:
-            at = getCallStack()
+            at = _historyCallStack(instance)
 
         if value is not None:
             value = List(instance, self, value, at, label)
         else:
             history = instance._history.setdefault(self.name, [])
-            history.append((value, at, label))
+            _recordHistory(instance, history, value, at, label)
 
         instance._storage[self.name] = value
 
@@ -461,6 +525,20 @@ class ListField(Field[List[FieldTypeVar]], Generic[FieldTypeVar]):
         value = self.__get__(instance)
         return list(value) if value is not None else None
 
+    def _getState(self, instance):
+        # Docstring inherited from Field.
+        value = self.__get__(instance)
+        if self.deprecated and value == self.default:
+            return _UNCHANGED
+        return list(value) if value is not None else None
+
+    def _diff(self, instance1, instance2, path, patch):
+        # Docstring inherited from Field.
+        value1 = self.toDict(instance1)
+        value2 = self.toDict(instance2)
+        if not _equalValues(value1, value2):
+            patch.append(ConfigPatchEntry(path, "set", value1, value2))
+
     def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
         """Compare two config instances for equality with respect to this
         field.
@@ -505,13 +583,14 @@ class ListField(Field[List[FieldTypeVar]], Generic[FieldTypeVar]):
             return True
         if not compareScalars(f"size for {name}", len(l1), len(l2), output=output):
             return False
-        equal = True
-        for n, v1, v2 in zip(range(len(l1)), l1, l2):
-            result = compareScalars(
-                f"{name}[{n}]", v1, v2, dtype=self.dtype, rtol=rtol, atol=atol, output=output
-            )
-
-            if not result and shortcut:
-                return False
-            equal = equal and result
-        return equal
+        return _compareItems(
+            name,
+            range(len(l1)),
+            list(l1),
+            list(l2),
+            shortcut=shortcut,
+            rtol=rtol,
+            atol=atol,
+            output=output,
+            dtype=self.itemtype,
+        )
@@ -31,8 +31,8 @@ import importlib
 import inspect
 import re
 
-from .callStack import StackFrame, getCallerFrame, getCallStack
-from .config import Config, Field
+from .callStack import StackFrame, getCallerFrame
+from .config import Config, Field, _historyCallStack
 from .configField import ConfigField
 from .listField import List, ListField
 
@@ -259,7 +259,7 @@ def makeConfigClass(ctrl, name=None, base=Config, doc=None, module=None, cls=Non
         use only; they are used to remove internal calls from the history.
         """
         if __at is None:
-            __at = getCallStack()
+            __at = _historyCallStack(self)
         values = {}
         for k, f in fields.items():
             if isinstance(f, ConfigField):
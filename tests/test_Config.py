@@ -27,11 +27,17 @@
 
 import io
 import itertools
+import marshal
+import math
 import os
 import pickle
 import re
+import sys
 import tempfile
+import threading
+import traceback
 import unittest
+import unittest.mock
 from types import SimpleNamespace
 
 try:
@@ -107,6 +113,35 @@ class Complex(pexConfig.Config):
     p = pexConfig.ConfigChoiceField("another registry", typemap=GLOBAL_REGISTRY, default="BBB", optional=True)
 
 
+class InnerTarget:
+    """A configurable target for testing."""
+
+    ConfigClass = InnerConfig
+
+
+class ComplexTarget:
+    """Another configurable target for testing."""
+
+    ConfigClass = Complex
+
+
+class LazyConfig(pexConfig.Config, lazy=True):
+    """A config whose subconfigs are built on first use."""
+
+    c = pexConfig.ConfigField("an inner config", InnerConfig)
+    t = pexConfig.ConfigurableField("a configurable", target=InnerTarget)
+    r = pexConfig.ConfigChoiceField("a registry field", typemap=GLOBAL_REGISTRY, default="BBB")
+
+
+class Keyed(pexConfig.Config):
+    """A config with fields whose items are saved with their keys."""
+
+    d = pexConfig.DictField("a dict", str, str, default={})
+    c = pexConfig.ConfigDictField("a dict of configs", str, InnerConfig, default={})
+    t = pexConfig.ConfigurableField("a configurable", target=InnerTarget)
+    r = pexConfig.ConfigChoiceField("a registry field", typemap=GLOBAL_REGISTRY, multi=True)
+
+
 class Deprecation(pexConfig.Config):
     """A test config with a deprecated field."""
 
@@ -333,6 +368,109 @@ class ConfigTest(unittest.TestCase):
             Cfg1()
             Cfg2()
 
+    def testDefaultTemplate(self):
+        """Test that validated defaults are reused, and are revalidated when
+        a field or its default changes.
+        """
+
+        class Cfg(pexConfig.Config):
+            f = pexConfig.Field("f", float, default=1)
+            r = pexConfig.RangeField("r", int, default=2, min=0)
+
+        self.assertEqual(Cfg().f, 1.0)
+        self.assertIs(type(Cfg().f), float)
+        self.assertIsNotNone(Cfg._defaultTemplate)
+        config = Cfg()
+        self.assertEqual([h[0] for h in config.history["f"]], [1.0])
+        self.assertEqual(config.history["r"][0][2], "default")
+
+        Cfg.r.default = -1
+        self.assertRaises(pexConfig.FieldValidationError, Cfg)
+        self.assertRaises(pexConfig.FieldValidationError, Cfg)
+        Cfg.r.default = 3
+        self.assertEqual(Cfg().r, 3)
+
+        Cfg.f = pexConfig.Field("f", str, default="a")
+        self.assertIsNone(Cfg._defaultTemplate)
+        self.assertEqual(Cfg().f, "a")
+
+        # Interrupting the validation of a default does not mark it invalid.
+        interrupts = [KeyboardInterrupt]
+
+        def check(value):
+            if interrupts:
+                raise interrupts.pop()
+            return True
+
+        Cfg.c = pexConfig.Field("c", int, default=4, check=check)
+        self.assertRaises(KeyboardInterrupt, Cfg)
+        self.assertIsNone(Cfg._defaultTemplate)
+        self.assertEqual(Cfg().c, 4)
+        self.assertIsNot(Cfg._defaultTemplate[-1][2], pexConfig.config._UNCACHED)
+
+    def testLazySubconfigs(self):
+        """Test that subconfigs are only built when first used in lazy
+        mode.
+        """
+
+        def isBuilt(config):
+            return (
+                not isinstance(config._storage["c"], pexConfig.config._LazyDefault),
+                not config.t._isLazyDefault(),
+            )
+
+        config = LazyConfig()
+        self.assertEqual(isBuilt(config), (False, False))
+        self.assertNotIn("BBB", config.r._dict)
+        config.validate()
+        self.assertTrue(config.compare(LazyConfig()))
+        stream = io.StringIO()
+        config.saveToStream(stream)
+        self.assertEqual(isBuilt(config), (False, False))
+
+        # Values read or written after freezing are built frozen.
+        config.c.f = 2.0
+        config.freeze()
+        self.assertEqual(config.t.f, 0.0)
+        self.assertEqual(config.r.active.f, 0.0)
+        self.assertEqual(isBuilt(config), (True, True))
+        with self.assertRaises(pexConfig.FieldValidationError):
+            config.t.f = 1.0
+        self.assertFalse(config.compare(LazyConfig()))
+
+        loaded = LazyConfig()
+        loaded.loadFromStream(stream.getvalue())
+        self.assertEqual(isBuilt(loaded), (False, False))
+        self.assertEqual(loaded.c.f, 0.0)
+        loaded = LazyConfig()
+        loaded.loadFromString(config.saveToString())
+        self.assertTrue(config.compare(loaded))
+
+        # Eager configs are unaffected, unless requested.
+        self.assertIsInstance(Complex()._storage["c"], InnerConfig)
+        with pexConfig.lazySubconfigs():
+            config = Complex()
+        self.assertIsInstance(config._storage["c"], pexConfig.config._LazyDefault)
+        self.assertIsInstance(dict(config.items())["c"], InnerConfig)
+        configs = []
+        with pexConfig.lazySubconfigs():
+            thread = threading.Thread(target=lambda: configs.append(Complex()))
+            thread.start()
+            thread.join()
+        self.assertIsInstance(configs[0]._storage["c"], InnerConfig)
+
+        # Invalid defaults are still caught.
+        def setDefaults(self):
+            self.f = -1.0
+
+        InvalidConfig = type("InvalidConfig", (InnerConfig,), {"setDefaults": setDefaults})
+        InvalidLazyConfig = type(
+            "InvalidLazyConfig",
+            (LazyConfig,),
+            {"c": pexConfig.ConfigField("an invalid config", InvalidConfig)},
+        )
+        self.assertRaises(pexConfig.FieldValidationError, InvalidLazyConfig().validate)
+
     def testSave(self):
         self.comp.r = "BBB"
         self.comp.p = "AAA"
@@ -382,6 +520,96 @@ class ConfigTest(unittest.TestCase):
             roundTrip.loadFromString(saved_string, root="config", extraLocals={"config": 6})
         del roundTrip
 
+    def testSaveWithoutRenaming(self):
+        """Check that saving a config does not rename its subconfigs, unless
+        a field type needs them renamed.
+        """
+        self.comp.r["AAA"].f = 4.0
+        with unittest.mock.patch.object(pexConfig.Config, "_rename", autospec=True) as rename:
+            saved = self.comp.saveToString()
+            savedSub = self.comp.r["AAA"].saveToString()
+        rename.assert_not_called()
+        self.assertIn("\nconfig.r['AAA'].f=4.0\n", saved)
+        self.assertIn("\nconfig.f=4.0\n", savedSub)
+        self.assertEqual(self.comp.r["AAA"]._name, "r['AAA']")
+
+        # Field types that only override save find their names in the
+        # configs, as before.
+        class NamedField(pexConfig.Field):
+            def save(self, outfile, instance):
+                outfile.write(f"# {instance._name}\n")
+                super().save(outfile, instance)
+
+        class NamedConfig(pexConfig.Config):
+            x = NamedField("x", int, default=1)
+
+        class HolderConfig(pexConfig.Config):
+            a = pexConfig.ConfigField("a", NamedConfig)
+
+        holder = HolderConfig()
+        saved = holder.saveToString()
+        self.assertIn("# config.a\n", saved)
+        self.assertIn("\nconfig.a.x=1\n", saved)
+        self.assertEqual(holder.a._name, "a")
+
+    def testSaveCompact(self):
+        """Check that configs saved without comments or default values are
+        loaded like any other.
+        """
+        self.comp.r.name = "BBB"
+        self.comp.r["AAA"].ll = [4]
+        self.comp.p["AAA"].f = 5.0
+        self.comp.c.f = 2.5
+
+        saved = self.comp.saveToString(compact=True)
+        self.assertNotIn("#", saved)
+        self.assertNotIn("\n\n", saved.split("\n\n", 1)[1])
+        self.assertIn("\nconfig.r['AAA'].b=False\n", saved)
+        roundTrip = Complex()
+        roundTrip.loadFromString(saved)
+        self.assertTrue(self.comp.compare(roundTrip))
+
+        saved = self.comp.saveToString(skipDefaults=True)
+        self.assertIn("# Inner.f\nconfig.c.f=2.5\n", saved)
+        self.assertNotIn("config.r['AAA'].b", saved)
+        self.assertNotIn("config.p.name", saved)
+        roundTrip = Complex()
+        roundTrip.loadFromString(saved)
+        self.assertTrue(self.comp.compare(roundTrip))
+
+        lazy = LazyConfig()
+        lazy.t.retarget(ComplexTarget)
+        lazy.t.c.f = 3.0
+        saved = lazy.saveToString(compact=True, skipDefaults=True)
+        self.assertEqual(
+            saved.split("\n\n", 1)[1],
+            "config.t.retarget(target=test_Config.ComplexTarget, ConfigClass=test_Config.Complex)\n"
+            "config.t.c.f=3.0\n",
+        )
+        roundTrip = LazyConfig()
+        roundTrip.loadFromString(saved)
+        self.assertTrue(lazy.compare(roundTrip))
+
+    def testSaveToChunks(self):
+        """Check that a config can be saved in chunks, and that streams are
+        written in chunks.
+        """
+        saved = self.comp.saveToString()
+        self.assertEqual(list(self.comp.saveToChunks()), [saved])
+        chunks = list(self.comp.saveToChunks(chunkSize=1))
+        self.assertEqual(len(chunks), len(Complex._fields))
+        self.assertEqual("".join(chunks), saved)
+        stream = io.StringIO()
+        self.comp.saveToStream(stream, root="root", compact=True)
+        self.assertEqual(
+            "".join(self.comp.saveToChunks(root="root", compact=True, chunkSize=100)), stream.getvalue()
+        )
+
+        stream = io.StringIO()
+        with unittest.mock.patch.object(stream, "write", wraps=stream.write) as write:
+            self.comp.saveToStream(stream)
+        write.assert_called_once_with(saved)
+
     def testDuplicateRegistryNames(self):
         self.comp.r["AAA"].f = 5.0
         self.assertEqual(self.comp.p["AAA"].f, 3.0)
@@ -464,6 +692,23 @@ class ConfigTest(unittest.TestCase):
         self.assertRaises(pexConfig.FieldValidationError, setattr, self.comp, "p", "AAA")
         self.assertRaises(pexConfig.FieldValidationError, setattr, self.comp.p["AAA"], "f", 5.0)
 
+    def testChoiceFieldEntries(self):
+        """Test that only the entries of a choice field that have been used
+        are saved, frozen and converted.
+        """
+        self.assertEqual(set(self.comp.p._dict), {"BBB"})
+        self.assertEqual(set(self.comp.toDict()["p"]["values"]), {"BBB"})
+        self.assertNotIn("config.p['AAA']", self.comp.saveToString())
+        self.assertEqual(set(self.comp.p._dict), {"BBB"})
+
+        self.comp.p["AAA"].f = 4.0
+        self.assertEqual(set(self.comp.toDict()["p"]["values"]), {"AAA", "BBB"})
+        roundtrip = Complex()
+        roundtrip.loadFromString(self.comp.saveToString())
+        self.assertTrue(self.comp.compare(roundtrip))
+        self.assertEqual(roundtrip.p["AAA"].f, 4.0)
+        self.assertEqual(roundtrip.r["BBB"].f, 0.0)
+
     def checkImportRoundTrip(self, importStatement, searchString, shouldBeThere):
         self.comp.c.f = 5.0
 
@@ -511,6 +756,22 @@ except ImportError:
         self.assertIsInstance(comp, Complex)
         self.assertEqual(self.comp.c.f, comp.c.f)
 
+        # Values are pickled directly, without Python code.
+        self.simple.ll = None
+        self.comp.r = "BBB"
+        self.comp.p["AAA"].f = 6.0
+        self.comp.p = None
+        for config in (self.simple, self.comp):
+            self.assertIs(config.__reduce__()[0], pexConfig.config.unreduceConfigState)
+            self.assertTrue(config.compare(pickle.loads(pickle.dumps(config))))
+        self.assertEqual(set(pickle.loads(pickle.dumps(self.comp)).p._dict), {"AAA", "BBB"})
+
+        # The code written by saveToStream can still be unpickled.
+        stream = io.StringIO()
+        self.comp.saveToStream(stream)
+        comp = pexConfig.config.unreduceConfig(Complex, stream.getvalue().encode())
+        self.assertTrue(self.comp.compare(comp))
+
     @unittest.skipIf(yaml is None, "Test requires pyyaml")
     def testYaml(self):
         self.simple.f = 5
@@ -577,6 +838,231 @@ except ImportError:
         # Before DM-16561, this raised.
         self.assertFalse(self.outer.compare(self.inner))
 
+    def testCompareFloatContainers(self):
+        """Check the comparison of lists and dicts of floating point values,
+        short and long enough to be compared by NumPy.
+        """
+
+        class FloatConfig(pexConfig.Config):
+            ll = pexConfig.ListField("List of floats.", float, optional=True)
+            d = pexConfig.DictField("Dict of floats.", str, float, optional=True)
+
+        for size in (3, 1000):
+            with self.subTest(size=size):
+                config1 = FloatConfig()
+                config2 = FloatConfig()
+                config1.ll = [float(n) for n in range(size)]
+                config1.d = {str(n): float(n) for n in range(size)}
+                config1.ll[0] = config1.d["0"] = float("nan")
+                config2.ll = [value * (1 + 1e-12) for value in config1.ll]
+                config2.d = {key: value * (1 + 1e-12) for key, value in config1.d.items()}
+                self.assertTrue(config1.compare(config2))
+
+                config2.ll[1] = 1.5
+                config2.ll[2] = None
+                config2.d["1"] = float("inf")
+                config2.d["2"] = None
+                outList = []
+                self.assertFalse(config1.compare(config2, shortcut=True, output=outList.append))
+                self.assertEqual(outList, ["Inequality in ll[1]: 1.0 != 1.5"])
+                del outList[:]
+                self.assertFalse(config1.compare(config2, shortcut=False, output=outList.append))
+                self.assertEqual(
+                    outList,
+                    [
+                        "Inequality in ll[1]: 1.0 != 1.5",
+                        "Inequality in ll[2]: 2.0 != None",
+                        "Inequality in d['1']: 1.0 != inf",
+                        "Inequality in d['2']: 2.0 != None",
+                    ],
+                )
+
+    def testFingerprint(self):
+        """Check that fingerprints follow the values of configs as they
+        change.
+        """
+        comp2 = Complex()
+        simple2 = Simple()
+        self.assertEqual(self.comp.fingerprint(), comp2.fingerprint())
+        self.assertEqual(self.simple.fingerprint(), simple2.fingerprint())
+        self.assertNotEqual(self.inner.fingerprint(), OuterConfig().i.fingerprint())
+        self.assertNotEqual(self.inner.fingerprint(), self.outer.fingerprint())
+
+        simple2.n = float("-nan")
+        simple2.f = 3
+        self.assertEqual(self.simple.fingerprint(), simple2.fingerprint())
+        for change in (
+            lambda config: setattr(config, "i", 4),
+            lambda config: config.ll.append(4),
+            lambda config: config.d.__setitem__("foo", "var"),
+            lambda config: setattr(config, "c", "World"),
+        ):
+            before = simple2.fingerprint()
+            change(simple2)
+            self.assertNotEqual(simple2.fingerprint(), before)
+
+        # Changes to subconfigs change the fingerprints of the configs that
+        # hold them, except for unselected choices.
+        comp2.r["BBB"].f = 1.0
+        self.assertEqual(self.comp.fingerprint(), comp2.fingerprint())
+        comp2.r["AAA"].i = 56
+        self.assertNotEqual(self.comp.fingerprint(), comp2.fingerprint())
+        comp2.r["AAA"].i = None
+        self.assertEqual(self.comp.fingerprint(), comp2.fingerprint())
+        comp2.r = "BBB"
+        self.assertNotEqual(self.comp.fingerprint(), comp2.fingerprint())
+
+        lazy = LazyConfig()
+        fingerprint = lazy.fingerprint()
+        self.assertTrue(lazy.t._isLazyDefault())
+        built = LazyConfig()
+        built.c.f = 0.0
+        built.t.f = 0.0
+        self.assertEqual(built.fingerprint(), fingerprint)
+        lazy.t.retarget(ComplexTarget)
+        self.assertNotEqual(lazy.fingerprint(), fingerprint)
+        fingerprint = lazy.fingerprint()
+        lazy.t.c.f = 2.0
+        self.assertNotEqual(lazy.fingerprint(), fingerprint)
+
+        # A frozen config keeps its fingerprint.
+        comp2.freeze()
+        self.assertIs(comp2._fingerprintDigest(), comp2._fingerprintDigest())
+
+    def testCompareFingerprints(self):
+        """Check that subconfigs with equal fingerprints are not compared
+        field by field.
+        """
+        comp2 = Complex()
+        with unittest.mock.patch.object(
+            pexConfig.Field, "_compare", autospec=True, side_effect=pexConfig.Field._compare
+        ) as mock:
+            self.assertTrue(self.comp.compare(comp2))
+            self.assertEqual(mock.call_count, 0)
+            comp2.r["AAA"].i = 56
+            outList = []
+            self.assertFalse(self.comp.compare(comp2, shortcut=False, output=outList.append))
+            self.assertEqual(outList, ["Inequality in r['AAA'].i: None != 56"])
+        # Only the fields of the selected choice are compared, not those of
+        # c.
+        compared = {id(call.args[1]) for call in mock.call_args_list}
+        self.assertEqual(compared, {id(self.comp.r["AAA"])})
+
+    def testDiff(self):
+        """Check that the patch between two configs turns a config equal to
+        the first into the second.
+        """
+        self.assertEqual(self.comp.diff(Complex()), [])
+        self.assertRaises(TypeError, self.comp.diff, self.simple)
+
+        comp2 = Complex()
+        comp2.c.f = 2.0
+        comp2.r["AAA"].ll.append(4)
+        comp2.r["AAA"].d["key"] = "vv"
+        comp2.r["AAA"].d["new"] = "v"
+        del comp2.r["AAA"].d["key"]
+        comp2.r["AAA"].n = float("nan")
+        comp2.p = "AAA"
+        comp2.p["AAA"].f = 5.0
+        comp2.p["BBB"].f = 6.0
+        entry = pexConfig.ConfigPatchEntry
+        patch = self.comp.diff(comp2)
+        self.assertEqual(
+            patch,
+            [
+                entry("c.f", "set", 0.0, 2.0),
+                entry("r['AAA'].ll", "set", [1, 2, 3], [1, 2, 3, 4]),
+                entry("r['AAA'].d['key']", "remove", "value", None),
+                entry("r['AAA'].d['new']", "add", None, "v"),
+                entry("p", "select", "BBB", "AAA"),
+                entry("p['AAA']", "set", Simple, Simple),
+                entry("p['AAA'].f", "set", 3.0, 5.0),
+            ],
+        )
+        # Unselected choices are replaced when they are selected.
+        comp3 = Complex()
+        comp3.p["AAA"].i = 4
+        comp3.applyPatch(patch)
+        self.assertTrue(comp3.compare(comp2))
+        self.assertEqual(comp3.fingerprint(), comp2.fingerprint())
+        self.assertEqual(comp3.diff(comp2), [])
+        self.assertEqual(comp3.c.history["f"][-1][2], "assignment")
+
+        lazy1 = LazyConfig()
+        lazy2 = LazyConfig()
+        lazy2.t.retarget(ComplexTarget)
+        lazy2.t.c.f = 1.0
+        self.assertEqual(
+            lazy1.diff(lazy2),
+            [
+                entry("t", "retarget", (InnerTarget, InnerConfig), (ComplexTarget, Complex)),
+                entry("t.c.f", "set", 0.0, 1.0),
+            ],
+        )
+        lazy1.applyPatch(lazy1.diff(lazy2))
+        self.assertTrue(lazy1.compare(lazy2))
+        self.assertRaises(ValueError, lazy1.applyPatch, [entry("c.f", "move", 0.0, 1.0)])
+
+    def testDefaultConfig(self):
+        """Check that the default instances of classes whose defaults may
+        change are not reused.
+        """
+        getDefaultConfig = pexConfig.config._getDefaultConfig
+        self.assertIs(getDefaultConfig(InnerConfig), getDefaultConfig(InnerConfig))
+        self.assertIsNot(getDefaultConfig(OuterConfig), getDefaultConfig(OuterConfig))
+
+        defaults = [1.0]
+
+        class Varying(pexConfig.Config):
+            f = pexConfig.Field("a float", float, default=0.0)
+
+            def setDefaults(self):
+                self.f = defaults[0]
+
+        class Holder(pexConfig.Config, lazy=True):
+            c = pexConfig.ConfigField("a varying config", Varying)
+
+        self.assertEqual(getDefaultConfig(Varying).f, 1.0)
+        self.assertIsNot(getDefaultConfig(Holder), getDefaultConfig(Holder))
+        holder = Holder()
+        holder.fingerprint()
+        defaults[0] = 2.0
+        self.assertEqual(getDefaultConfig(Varying).f, 2.0)
+        lazy = Holder()
+        built = Holder()
+        built.c.f
+        self.assertEqual(lazy.fingerprint(), built.fingerprint())
+        self.assertEqual(lazy.diff(built), [])
+
+    def testBatchComparison(self):
+        """Check the grouping of many configs and their patches against a
+        reference config.
+        """
+        configs = [Complex() for _ in range(6)]
+        configs[1].c.f = 1.0
+        configs[3].c.f = 1.0
+        configs[4].r["BBB"].f = 2.0  # Not selected, so equal to the default.
+        configs[5].p = None
+        self.assertEqual(pexConfig.groupConfigs(configs), [[0, 2, 4], [1, 3], [5]])
+        self.assertEqual(pexConfig.groupConfigs(configs + [self.simple]), [[0, 2, 4], [1, 3], [5], [6]])
+        self.assertEqual(pexConfig.groupConfigs([]), [])
+
+        entry = pexConfig.ConfigPatchEntry
+        patches = pexConfig.diffConfigsBatch(self.comp, configs)
+        self.assertEqual(
+            patches,
+            [
+                [],
+                [entry("c.f", "set", 0.0, 1.0)],
+                [],
+                [entry("c.f", "set", 0.0, 1.0)],
+                [],
+                [entry("p", "select", "BBB", None)],
+            ],
+        )
+        self.assertIsNot(patches[1], patches[3])
+        self.assertRaises(TypeError, pexConfig.diffConfigsBatch, self.comp, [self.simple])
+
     def testLoadError(self):
         """Check that loading allows errors in the file being loaded to
         propagate.
@@ -584,6 +1070,346 @@ except ImportError:
         self.assertRaises(SyntaxError, self.simple.loadFromStream, "bork bork bork")
         self.assertRaises(NameError, self.simple.loadFromStream, "config.f = bork")
 
+    def testLoadSavedLines(self):
+        """Check that the lines written by saveToStream are loaded without
+        being executed, alongside lines that must be executed.
+        """
+        self.comp.c.f = 5.0
+        self.comp.p["AAA"].ll = [4, 5]
+        self.comp.r = "BBB"
+        with unittest.mock.patch("builtins.exec", wraps=exec) as mock:
+            comp = Complex()
+            comp.loadFromString(self.comp.saveToString())
+            self.assertEqual(mock.call_count, 0)
+        self.assertTrue(self.comp.compare(comp))
+        _, stack, label = comp.c.history["f"][-1]
+        self.assertEqual(label, "assignment")
+        self.assertEqual(stack[-1].content, "config.c.f=5.0")
+
+        code = "x = 3\nconfig.i = x\nif x > 2:\n    config.f = 4.0\n"
+        self.simple.loadFromString(code)
+        self.assertEqual((self.simple.i, self.simple.f), (3, 4.0))
+        self.simple.loadFromString("import math\nconfig.f = math.pi; config.i = 5\nconfig.ll = [2]\n")
+        self.assertEqual((self.simple.f, self.simple.i, self.simple.ll), (math.pi, 5, [2]))
+        with self.assertRaises(pexConfig.FieldValidationError):
+            self.simple.loadFromString("config.i = 'one'")
+
+    def _checkLoadedLikeExec(self, configClass, code):
+        """Check that loading code gives the same config and history as
+        executing it.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "override.py")
+            with open(filename, "w") as f:
+                f.write(code)
+            loaded = configClass()
+            loaded.load(filename)
+            executed = configClass()
+            executed.loadFromString(compile(code, filename, "exec"), filename=filename)
+            self.assertTrue(loaded.compare(executed, shortcut=False))
+            self.assertEqual(loaded._imports, executed._imports)
+            walked = itertools.zip_longest(
+                pexConfig.config._walkConfigs(loaded), pexConfig.config._walkConfigs(executed)
+            )
+            for (path, config), (otherPath, other) in walked:
+                self.assertEqual(path, otherPath)
+                for name in config._fields:
+                    history = [
+                        (label, (stack[-1].filename, stack[-1].lineno, stack[-1].content))
+                        for _, stack, label in config.history.get(name, [])
+                    ]
+                    otherHistory = [
+                        (label, (stack[-1].filename, stack[-1].lineno, stack[-1].content))
+                        for _, stack, label in other.history.get(name, [])
+                    ]
+                    self.assertEqual(history, otherHistory, msg=f"{path}.{name}")
+        return loaded
+
+    def testLoadSavedLinesLikeExec(self):
+        """Check that the lines loaded without being executed have the same
+        effect as executing them.
+        """
+        keys = ["a]b", "[c", "q'uote", 'd"ouble', "back\\slash", "new\nline", "']"]
+        keyed = Keyed()
+        for i, key in enumerate(keys):
+            keyed.d[key] = f"v{i}"
+            keyed.c[key] = InnerConfig()
+            keyed.c[key].f = float(i)
+        keyed.t.retarget(ComplexTarget)
+        keyed.t.r["AAA"].d = {"x]": "v"}
+        keyed.t.p.name = "AAA"
+        keyed.r.names = ["AAA", "BBB"]
+        keyed.r["BBB"].f = 2.0
+        code = keyed.saveToString()
+        with unittest.mock.patch("builtins.exec", wraps=exec) as mock:
+            Keyed().loadFromString(code)
+            self.assertEqual(mock.call_count, 0)
+        loaded = self._checkLoadedLikeExec(Keyed, code)
+        self.assertEqual(loaded.d, keyed.d)
+        self.assertEqual(list(loaded.c.keys()), keys)
+        self.assertEqual(loaded.c["a]b"].f, 0.0)
+        self.assertIs(loaded.t.target, ComplexTarget)
+        self.assertEqual(loaded.t.p.name, "AAA")
+        self.assertEqual(set(loaded.r.names), {"AAA", "BBB"})
+        self.assertTrue(keyed.compare(loaded))
+
+        # Keys are parsed like Python; lines that are not written by
+        # saveToStream are executed instead.
+        lines = [
+            "config.d['a]b'] = 'v1'",
+            "config.d['\\x41'] = 'v2'",
+            "config.d[\"']\"] = 'v3'",
+            "config.d['a' 'b'] = 'v4'",
+            "config.d[r'\\\\'] = 'v5'",
+            "config.d[('x')] = 'v6'",
+            "config.c['k'] = test_Config.InnerConfig()",
+            "config.c['k'].f = 1.0; config.c['k'].f += 1",
+            "config.r.names = ['BBB']",
+            "config.t.retarget(target=test_Config.ComplexTarget, ConfigClass=test_Config.Complex)",
+            "config.t.c.f = 4.0",
+        ]
+        loaded = self._checkLoadedLikeExec(Keyed, "import test_Config\n" + "\n".join(lines) + "\n")
+        self.assertEqual(loaded.d, {"a]b": "v1", "A": "v2", "']": "v3", "ab": "v4", "\\\\": "v5", "x": "v6"})
+        self.assertEqual(loaded.c["k"].f, 2.0)
+        self.assertEqual(loaded.t.c.f, 4.0)
+
+        # Objects found along a path are looked up again once an assignment
+        # may have changed them.
+        lines = [
+            "config.r.active.f = 4.0",
+            "config.r.name = 'BBB'",
+            "config.r.active.f = 2.0",
+            "config.p.name = 'BBB'",
+            "config.p['BBB'].f = 1.0",
+            "config.p = 'AAA'",
+            "config.p.active.f = 5.0",
+        ]
+        loaded = self._checkLoadedLikeExec(Complex, "\n".join(lines) + "\n")
+        self.assertEqual((loaded.r["AAA"].f, loaded.r["BBB"].f), (4.0, 2.0))
+        self.assertEqual((loaded.p["AAA"].f, loaded.p["BBB"].f), (5.0, 1.0))
+
+    def testLoadSavedLinesErrors(self):
+        """Check that a line that fails when loaded is only applied once, and
+        that lookup errors are raised as when executing the line.
+        """
+        calls = []
+
+        def makeConfig():
+            calls.append(None)
+            return InnerConfig()
+
+        keyed = Keyed()
+        with self.assertRaises(pexConfig.FieldValidationError):
+            keyed.loadFromString("config.d['a'] = 1\n")
+        self.assertNotIn("a", keyed.d)
+        with self.assertRaises(KeyError):
+            keyed.loadFromString("config.c['a'].f = 3.0\n")
+        try:
+            keyed.loadFromString("config.missing.f = 3.0\n")
+        except AttributeError as error:
+            self.assertIn("<string>", [frame.filename for frame in traceback.extract_tb(error.__traceback__)])
+        else:
+            self.fail("AttributeError not raised")
+        with self.assertRaises(NameError):
+            keyed.loadFromString("config.c['a'] = makeConfig2()\n")
+        check = Simple().saveToString().split("\n")
+        check = "\n".join(line for line in check if line.startswith(("import", "assert")))
+        with self.assertRaisesRegex(AssertionError, "config is of type test_Config.Keyed instead of"):
+            keyed.loadFromString(check)
+        keyed.loadFromString("config.c['a'] = makeConfig()\n", extraLocals={"makeConfig": makeConfig})
+        self.assertEqual(len(calls), 1)
+        with self.assertRaises(KeyError):
+            keyed.loadFromString("config.c['b'].f = makeConfig()\n", extraLocals={"makeConfig": makeConfig})
+        self.assertEqual(len(calls), 2)
+
+    def testOverrideCache(self):
+        """Check that compiled override code is reused."""
+        compileSource = pexConfig._overrideCache._compileSource
+        code = "x = 2\nif x > 1:\n    config.f = 6.0\n"
+        with (
+            tempfile.TemporaryDirectory() as tmpdir,
+            unittest.mock.patch.dict(pexConfig._overrideCache._programCache, clear=True),
+            unittest.mock.patch.object(
+                pexConfig._overrideCache, "_compileSource", wraps=compileSource
+            ) as mock,
+        ):
+            filename = os.path.join(tmpdir, "override.py")
+            with open(filename, "w") as f:
+                f.write(code)
+            for _ in range(2):
+                Simple().load(filename)
+                Simple().loadFromString(self.simple.saveToString())
+            self.assertEqual(mock.call_count, 2)
+
+            # Modified files are compiled again.
+            with open(filename, "a") as f:
+                f.write("config.i = 4\n")
+            simple = Simple()
+            simple.load(filename)
+            self.assertEqual((simple.f, simple.i), (6.0, 4))
+            self.assertEqual(mock.call_count, 3)
+
+            # Compiled code can be shared through a directory.
+            cacheDir = os.path.join(tmpdir, "cache")
+            previous = pexConfig.setOverrideCacheDirectory(cacheDir)
+            try:
+                for _ in range(2):
+                    with unittest.mock.patch.dict(pexConfig._overrideCache._programCache, clear=True):
+                        for text in (code, self.simple.saveToString()):
+                            simple = Simple()
+                            simple.loadFromString(text)
+                self.assertEqual(simple.f, self.simple.f)
+            finally:
+                pexConfig.setOverrideCacheDirectory(previous)
+            self.assertEqual(len(os.listdir(cacheDir)), 2)
+            self.assertEqual(mock.call_count, 5)
+
+            # Files written with another format are compiled again.
+            for name in os.listdir(cacheDir):
+                with open(os.path.join(cacheDir, name), "wb") as f:
+                    marshal.dump((pexConfig._overrideCache._PROGRAM_FORMAT + 1, []), f)
+            previous = pexConfig.setOverrideCacheDirectory(cacheDir)
+            try:
+                with unittest.mock.patch.dict(pexConfig._overrideCache._programCache, clear=True):
+                    simple = Simple()
+                    simple.loadFromString(code)
+                    self.assertEqual(simple.f, 6.0)
+                    self.assertEqual(mock.call_count, 6)
+
+                    # Failed writes leave no temporary file behind.
+                    with unittest.mock.patch("marshal.dump", side_effect=ValueError):
+                        Simple().loadFromString("config.i = 8\n")
+            finally:
+                pexConfig.setOverrideCacheDirectory(previous)
+            self.assertEqual(len(os.listdir(cacheDir)), 2)
+
+    def testOverrideCacheSize(self):
+        """Check that the least recently used override code is forgotten
+        first.
+        """
+        codes = [f"config.i = {i}\n" for i in range(3)]
+        with (
+            unittest.mock.patch.dict(pexConfig._overrideCache._programCache, clear=True),
+            unittest.mock.patch.object(pexConfig._overrideCache, "_MAX_CACHED_PROGRAMS", 2),
+        ):
+            for code in (codes[0], codes[1], codes[0], codes[2]):
+                Simple().loadFromString(code)
+            programs = list(pexConfig._overrideCache._programCache.values())
+            self.assertEqual(len(programs), 2)
+            self.assertIs(pexConfig._overrideCache._getProgram(codes[0], "config", "<string>"), programs[0])
+            self.assertIs(pexConfig._overrideCache._getProgram(codes[2], "config", "<string>"), programs[1])
+
+    def testOverrideImports(self):
+        """Check that the imports of cached override code are only recorded
+        once.
+        """
+        module = "lsst.pex.config._doNotImportMe"
+        code = f"import {module}\nconfig.i = 3\n"
+        with (
+            unittest.mock.patch.dict(pexConfig._overrideCache._programCache, clear=True),
+            unittest.mock.patch.dict(sys.modules),
+            unittest.mock.patch.object(
+                pexConfig.config, "RecordingImporter", wraps=pexConfig.config.RecordingImporter
+            ) as mock,
+        ):
+            sys.modules.pop(module, None)
+            configs = [Simple() for _ in range(3)]
+            configs[0].loadFromString(code)
+            configs[1].loadFromString(code)
+            self.assertEqual(mock.call_count, 1)
+            self.assertIn(module, configs[0]._imports)
+            self.assertEqual(configs[0]._imports, configs[1]._imports)
+            self.assertIn(f"import {module}\n", configs[1].saveToString())
+
+            # Imports are recorded again if the module has to be reimported.
+            del sys.modules[module]
+            configs[2].loadFromString(code)
+            self.assertEqual(mock.call_count, 2)
+            self.assertEqual(configs[2]._imports, configs[0]._imports)
+
+            # The imports of code run with extra variables are recorded for
+            # each load.
+            del sys.modules[module]
+            code = f"if load:\n    import {module}\nconfig.i = 3\n"
+            configs = [Simple() for _ in range(3)]
+            configs[0].loadFromString(code, extraLocals={"load": False})
+            configs[1].loadFromString(code, extraLocals={"load": True})
+            configs[2].loadFromString(code, extraLocals={"load": False})
+            self.assertEqual(mock.call_count, 5)
+            self.assertNotIn(module, configs[0]._imports)
+            self.assertIn(module, configs[1]._imports)
+            self.assertNotIn(module, configs[2]._imports)
+
+    def testImportClosure(self):
+        """Check that the modules of configs whose subconfigs are fixed by
+        their class are found from the class, and that the imports of code
+        loaded into a subconfig are still saved.
+        """
+        self.assertEqual(pexConfig.config._classImports(OuterConfig), {__name__})
+        self.assertIsNone(pexConfig.config._classImports(Complex))
+        self.assertIsNone(pexConfig.config._classImports(LazyConfig))
+
+        module = "lsst.pex.config._doNotImportMe"
+        with unittest.mock.patch.dict(sys.modules):
+            sys.modules.pop(module, None)
+            config = OuterConfig()
+            config.i.loadFromString(f"import {module}\nconfig.f = 6.0\n")
+            self.assertIn(f"import {module}\n", config.saveToString())
+        self.assertIn(module, pexConfig.config._loadedSubconfigs[id(config.i)]._imports)
+
+        # Only the subconfigs along the names of loaded subconfigs are walked.
+        class Middle(pexConfig.Config):
+            i = pexConfig.ConfigField("an inner config", InnerConfig)
+
+        class Wrapper(pexConfig.Config):
+            w = pexConfig.ConfigField("a wrapped config", Middle)
+
+        subconfigsOf = pexConfig.config._subconfigsOf
+        with unittest.mock.patch.object(pexConfig.config, "_subconfigsOf", wraps=subconfigsOf) as mock:
+            Wrapper().saveToString()
+            self.assertEqual(mock.call_count, 1)
+            wrapper = Wrapper()
+            with unittest.mock.patch.dict(sys.modules):
+                sys.modules.pop(module, None)
+                wrapper.w.i.loadFromString(f"import {module}\nconfig.f = 6.0\n")
+                mock.reset_mock()
+                self.assertIn(f"import {module}\n", wrapper.saveToString())
+            self.assertEqual(mock.call_count, 3)
+
+        # Modules found from the classes are those found by walking the
+        # subconfigs.
+        def makeLazy():
+            lazy = LazyConfig()
+            lazy.t.retarget(ComplexTarget)
+            return lazy
+
+        def makeKeyed():
+            keyed = Keyed()
+            keyed.c["a"] = InnerConfig()
+            keyed.r.names = ["AAA"]
+            return keyed
+
+        loaded = OuterConfig()
+        for makeConfig in (OuterConfig, Complex, makeLazy, makeKeyed):
+            config = makeConfig()
+            config.saveToString()
+            walked = makeConfig()
+            with unittest.mock.patch.dict(pexConfig.config._loadedSubconfigs, {0: loaded.i}):
+                walked.saveToString()
+            self.assertEqual(config._imports, walked._imports)
+
+        # Adding a field to a class changes the closure of the classes that
+        # hold it.
+        class Leaf(pexConfig.Config):
+            pass
+
+        class Branch(pexConfig.Config):
+            leaf = pexConfig.ConfigField("a leaf", Leaf)
+
+        self.assertEqual(pexConfig.config._classImports(Branch), {__name__})
+        Leaf.choice = pexConfig.ConfigChoiceField("a registry field", typemap=GLOBAL_REGISTRY, default="AAA")
+        self.assertIsNone(pexConfig.config._classImports(Branch))
+
     def testNames(self):
         """Check that the names() method returns valid keys.
 
@@ -595,6 +1421,122 @@ except ImportError:
         for name in names:
             self.assertTrue(hasattr(self.simple, name))
 
+        # The names of nested configs are those of their assignments in the
+        # saved config.
+        self.comp.r.name = "BBB"
+        innerNames = [f"r['{k}'].{n}" for k in ("AAA", "BBB") for n in GLOBAL_REGISTRY[k]().names()]
+        self.assertEqual(self.comp.names()[: len(innerNames) + 2], ["c.f"] + innerNames + ["r.name"])
+        for k in GLOBAL_REGISTRY:
+            self.comp.p[k]
+        saved = self.comp.saveToString()
+        for name in self.comp.iterNames():
+            self.assertIn(f"\nconfig.{name}=", saved)
+
+        # Subconfigs are not built to get their names.
+        lazy = LazyConfig()
+        self.assertEqual(lazy.names(), ["c.f", "t.f"] + innerNames + ["r.name"])
+        self.assertEqual(len(lazy.r._dict), 0)
+
+    def testWalk(self):
+        """Check that walk visits the fields of all built subconfigs."""
+        self.comp.p["AAA"]
+        simpleNames = [f"['AAA'].{name}" for name in Simple._fields]
+        walked = list(self.comp.walk())
+        self.assertEqual(
+            [name for name, _, _ in walked],
+            ["c", "c.f", "r"]
+            + [f"r{name}" for name in simpleNames]
+            + ["p", "p['BBB'].f"]
+            + [f"p{name}" for name in simpleNames],
+        )
+        self.assertEqual(walked[0], ("c", Complex.c, self.comp.c))
+        self.assertEqual(walked[1], ("c.f", InnerConfig.f, 0.0))
+        self.assertEqual(walked[2], ("r", Complex.r, self.comp.r))
+
+        # Names can be given a prefix, and subconfigs can be skipped.
+        walked = list(self.comp.walk(root="config", prune=lambda name, field, value: name == "config.r"))
+        names = [name for name, _, _ in walked]
+        self.assertIn(("config.c.f", InnerConfig.f, 0.0), walked)
+        self.assertIn("config.r", names)
+        self.assertNotIn("config.r['AAA'].f", names)
+        self.assertIn("config.p['AAA'].f", names)
+
+        # Subconfigs that have not been built are neither walked nor built.
+        lazy = LazyConfig()
+        walked = list(lazy.walk())
+        self.assertEqual([name for name, _, _ in walked], ["c", "t", "r"])
+        self.assertIsNone(walked[0][2])
+        self.assertEqual(len(lazy.r._dict), 0)
+        lazy.c.f = 2.0
+        self.assertEqual([name for name, _, _ in lazy.walk()], ["c", "c.f", "t", "r"])
+
+        # Subconfigs that override the methods built on the walk are handled
+        # by their own methods.
+        calls = []
+
+        class RecordingConfig(InnerConfig):
+            def freeze(self):
+                calls.append(self._name)
+                super().freeze()
+
+        class OuterRecordingConfig(pexConfig.Config):
+            a = pexConfig.ConfigField("a", RecordingConfig)
+            b = pexConfig.ConfigDictField("b", str, RecordingConfig, default={})
+
+        outer = OuterRecordingConfig()
+        outer.b["x"] = RecordingConfig()
+        outer.freeze()
+        self.assertEqual(calls, ["a", "b['x']"])
+        self.assertTrue(outer.a._frozen)
+        self.assertTrue(outer.b["x"]._frozen)
+
+    def testGetSetByPath(self):
+        """Check that fields can be got and set from their full names."""
+        self.comp.r.name = "BBB"
+        for name in self.comp.iterNames():
+            value = self.comp.getByPath(name)
+            if name.endswith(".n"):
+                self.assertTrue(math.isnan(value))
+            else:
+                self.assertEqual(value, eval(f"config.{name}", {"config": self.comp}))
+        self.assertIs(self.comp.getByPath("r.active"), self.comp.r["BBB"])
+
+        self.comp.setByPath("c.f", 2.0)
+        self.comp.setByPath("r['AAA'].d", {"key": "value"})
+        self.comp.setByPath("r['AAA'].d['other']", "very")
+        self.comp.setByPath("r['AAA'].ll[0]", 5)
+        self.comp.setByPath("r.name", "AAA")
+        self.assertEqual(self.comp.c.f, 2.0)
+        self.assertEqual(self.comp.r["AAA"].d, {"key": "value", "other": "very"})
+        self.assertEqual(self.comp.r["AAA"].ll, [5, 2, 3])
+        self.assertEqual(self.comp.r.name, "AAA")
+        value, at, label = self.comp.c.history["f"][-1]
+        self.assertEqual((value, label), (2.0, "assignment"))
+        self.assertEqual(at[-1].function, "testGetSetByPath")
+
+        # Retargets are followed.
+        class WrapperConfig(pexConfig.Config):
+            i = pexConfig.ConfigField("an inner config", InnerConfig)
+
+        class WrapperTarget:
+            ConfigClass = WrapperConfig
+
+        lazy = LazyConfig()
+        with self.assertRaises(AttributeError):
+            lazy.getByPath("t.i.f")
+        lazy.t.retarget(WrapperTarget)
+        lazy.setByPath("t.i.f", 4.0)
+        self.assertEqual(lazy.getByPath("t.i.f"), 4.0)
+        self.assertEqual(lazy.t.i.f, 4.0)
+
+        for path in ("", "c.", "c..f", "r[AAA]", "r['AAA'", "c.f()", "[0]"):
+            with self.assertRaises(ValueError):
+                self.comp.getByPath(path)
+        with self.assertRaises(AttributeError):
+            self.comp.setByPath("c.g", 1.0)
+        with self.assertRaises(pexConfig.FieldValidationError):
+            self.comp.setByPath("r['CCC'].f", 1.0)
+
     def testIteration(self):
         self.assertIn("ll", self.simple)
         self.assertIn("ll", self.simple.keys())
@@ -207,6 +207,33 @@ class ConfigDictFieldTest(unittest.TestCase):
 
         self.assertTrue(pexConfig.compareConfigs("test", c1, c2))
 
+    def testDiff(self):
+        """Test that keys are added and removed by the patch between two
+        configs.
+        """
+        c1 = Config2(d1={"a": Config1(f=1.0), "b": Config1()})
+        c2 = Config2(d1={"b": Config1(f=2.0), "c": Config1(f=4.0)})
+        entry = pexConfig.ConfigPatchEntry
+        patch = c1.diff(c2)
+        self.assertEqual(
+            patch,
+            [
+                entry("d1['a']", "remove", Config1, None),
+                entry("d1['b'].f", "set", 3.0, 2.0),
+                entry("d1['c']", "add", None, Config1),
+                entry("d1['c'].f", "set", 3.0, 4.0),
+            ],
+        )
+        c1.applyPatch(patch)
+        self.assertTrue(pexConfig.compareConfigs("test", c1, c2))
+        self.assertEqual(list(c1.d1.keys()), ["b", "c"])
+
+        c3 = Config2()
+        c3.applyPatch(c3.diff(c2))
+        self.assertTrue(pexConfig.compareConfigs("test", c3, c2))
+        c3.applyPatch(c3.diff(Config2()))
+        self.assertIsNone(c3.d1)
+
 
 if __name__ == "__main__":
     unittest.main()
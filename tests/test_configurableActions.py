@@ -19,6 +19,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import pickle
 import unittest
 from io import StringIO
 from types import SimpleNamespace
@@ -210,6 +211,35 @@ class ConfigurableActionsTestCase(unittest.TestCase):
         config4.singleAction.var = 99
         self.assertFalse(config.compare(config4))
 
+    def testDiff(self):
+        configClass = self._createConfig(
+            default={"test1": ActionTest1, "test2": ActionTest2}, singleDefault=ActionTest1
+        )
+        config = configClass()
+        config2 = configClass()
+        config2.actions.test1 = ActionTest3
+        del config2.actions.test2
+        config2.actions.test4 = ActionTest1
+        config2.actions.test4.var = 4
+        config2.singleAction = ActionTest2
+        config2.singleAction.var = 5
+
+        patch = config.diff(config2)
+        self.assertEqual(
+            [(entry.path, entry.kind) for entry in patch],
+            [
+                ("actions.test2", "remove"),
+                ("actions.test1", "set"),
+                ("actions.test4", "add"),
+                ("actions.test4.var", "set"),
+                ("singleAction", "set"),
+                ("singleAction.var", "set"),
+            ],
+        )
+        config.applyPatch(patch)
+        self.assertTrue(config.compare(config2))
+        self.assertEqual(config.diff(config2), [])
+
     def testSave(self):
         # This method will also test rename, as it is part of the
         # implementation in pex_config
@@ -245,6 +275,21 @@ class ConfigurableActionsTestCase(unittest.TestCase):
         self.maxDiff = None
         self.assertEqual(string1, ioObject2.getvalue())
 
+    def testPickle(self):
+        """Test that configs holding actions survive a pickle round trip."""
+        config = actionTests.TestConfig()
+        config.actions.test1 = ActionTest1
+        config.actions.test2 = ActionTest2
+        config.actions.test2.var = 3
+        config.singleAction = actionTests.TestDivideAction(
+            colA=actionTests.TestSingleColumnAction(column="a"),
+            colB=actionTests.TestSingleColumnAction(column="b"),
+        )
+        unpickled = pickle.loads(pickle.dumps(config))
+        self.assertTrue(config.compare(unpickled), msg=f"{config} != {unpickled}")
+        self.assertEqual(unpickled.actions.test2.var, 3)
+        self.assertEqual(unpickled.singleAction.colB.column, "b")
+
     def testToDict(self):
         """Test the toDict interface."""
         configClass = self._createConfig(default={"test1": ActionTest1}, singleDefault=ActionTest1)
@@ -151,6 +151,11 @@ class ConfigurableFieldTest(unittest.TestCase):
         self.assertEqual(c.c2.f, r.c2.f)
         self.assertEqual(c.c2.target, r.c2.target)
 
+        r = pickle.loads(pickle.dumps(c))
+        self.assertEqual(c.c2.f, r.c2.f)
+        self.assertEqual(c.c2.target, r.c2.target)
+        self.assertEqual(r.c1.f, 5)
+
     def testNoPickle(self):
         """Test that pickle support is disabled for the proxy container."""
         c = Config2()
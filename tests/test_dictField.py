@@ -144,6 +144,17 @@ class DictFieldTest(unittest.TestCase):
         self.assertIsNone(c.d4["c"])
         self.assertRaises(pexConfig.FieldValidationError, setattr, c, "d4", {"hi": [1, 2, 3]})
 
+    def testBulkAssignment(self):
+        c = Config1()
+        c.d3 = {1.5: 2.0, 2: 3}
+        self.assertEqual(c.d3, {1.5: 2.0, 2.0: 3.0})
+        self.assertEqual([type(k) for k in c.d3.keys()], [float, float])
+        c.d2 = {"a": "b", "c": None}
+        self.assertEqual(c.d2, {"a": "b", "c": None})
+        self.assertRaises(pexConfig.FieldValidationError, setattr, c, "d2", {"a": "b", "c": 1})
+        self.assertRaises(pexConfig.FieldValidationError, setattr, c, "d3", {1.5: 2.0, 2.5: -1.0})
+        self.assertEqual(c.d2, {"a": "b", "c": None})
+
     def testValidate(self):
         c = Config1()
         self.assertRaises(pexConfig.FieldValidationError, Config1.validate, c)
@@ -25,9 +25,12 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import threading
 import unittest
+import unittest.mock
 
 import lsst.pex.config as pexConfig
+import lsst.pex.config.callStack as pexConfigCallStack
 import lsst.pex.config.history as pexConfigHistory
 
 
@@ -37,6 +40,42 @@ class PexTestConfig(pexConfig.Config):
     a = pexConfig.Field("Parameter A", float, default=1.0)
 
 
+class LastHistoryConfig(pexConfig.Config, history="last"):
+    """Config that only records the most recent event per field."""
+
+    a = pexConfig.Field("Parameter A", float, default=1.0)
+    b = pexConfig.ListField("Parameter B", int, default=[1])
+
+
+class NoHistoryConfig(pexConfig.Config, history="off"):
+    """Config that records no history."""
+
+    a = pexConfig.Field("Parameter A", float, default=1.0)
+    b = pexConfig.ListField("Parameter B", int, default=[1])
+    c = pexConfig.ConfigField("Parameter C", PexTestConfig)
+
+
+class Target:
+    """Configurable target for testing."""
+
+    ConfigClass = PexTestConfig
+
+    def __init__(self, config):
+        pass
+
+
+class NestedConfig(pexConfig.Config):
+    """Config with one field of each kind that builds subconfigs."""
+
+    a = pexConfig.ConfigField("Parameter A", PexTestConfig)
+    b = pexConfig.ListField("Parameter B", int, default=[1, 2, 3])
+    c = pexConfig.DictField("Parameter C", str, int, default={"x": 1, "y": 2})
+    d = pexConfig.ConfigChoiceField("Parameter D", {"A": PexTestConfig, "B": LastHistoryConfig}, default="A")
+    e = pexConfig.ConfigChoiceField("Parameter E", {"A": PexTestConfig}, default=["A"], multi=True)
+    f = pexConfig.ConfigurableField("Parameter F", target=Target)
+    g = pexConfig.ConfigDictField("Parameter G", str, PexTestConfig, default={"x": PexTestConfig()})
+
+
 class HistoryTest(unittest.TestCase):
     """Test history recording."""
 
@@ -84,6 +123,204 @@ class HistoryTest(unittest.TestCase):
 
         self.assertIn("\n    b.update(a=4.0)", output)
 
+    def testLazyCallStack(self):
+        previous = pexConfigCallStack.setLazyCallStacks(True)
+        try:
+            b = PexTestConfig()
+            b.update(a=4.0)
+        finally:
+            pexConfigCallStack.setLazyCallStacks(previous)
+
+        _, stack, _ = b.history["a"][-1]
+        self.assertIsInstance(stack, pexConfigCallStack.CallStack)
+        self.assertIsInstance(stack[-1], pexConfigCallStack.StackFrame)
+
+        # The setting does not apply to other threads.
+        stacks = []
+        previous = pexConfigCallStack.setLazyCallStacks(True)
+        try:
+            thread = threading.Thread(target=lambda: stacks.append(pexConfigCallStack.getCallStack()))
+            thread.start()
+            thread.join()
+        finally:
+            pexConfigCallStack.setLazyCallStacks(previous)
+        self.assertIsInstance(stacks[0], list)
+        self.assertEqual(stack[-1].function, "testLazyCallStack")
+        self.assertEqual(stack[-1].content, "b.update(a=4.0)")
+
+        pexConfigHistory.Color.colorize(False)
+        output = b.formatHistory("a", writeSourceLine=False)
+        self.assertIn(
+            """
+    b = PexTestConfig()
+    a = pexConfig.Field("Parameter A", float, default=1.0)
+4.0""",
+            output,
+        )
+        self.assertIn("\n    b.update(a=4.0)", output)
+
+        # Lazy stacks can be combined with lists of frames.
+        extended = [stack[0]] + stack + [stack[-1]]
+        self.assertIsInstance(extended, pexConfigCallStack.CallStack)
+        self.assertEqual(len(extended), len(stack) + 2)
+        self.assertIs(extended[1].function, stack[0].function)
+
+    def testSharedCallStacks(self):
+        def capture():
+            return pexConfigCallStack.getCallStack(lazy=True)
+
+        stacks = []
+        for _ in range(2):
+            stacks.append(capture())
+        # Identical stacks are the same object.
+        self.assertIs(stacks[0], stacks[1])
+        other = pexConfigCallStack.getCallStack(lazy=True)
+        # Stacks from the same caller share their prefix and frames.
+        self.assertIsNot(other, stacks[0])
+        self.assertEqual(len(stacks[0]), len(other) + 1)
+        self.assertIs(other[-2], stacks[0][-3])
+
+        eager = []
+        for _ in range(2):
+            eager.append(pexConfigCallStack.getCallStack())
+        self.assertIsInstance(eager[0], list)
+        for frame0, frame1 in zip(*eager):
+            self.assertIs(frame0, frame1)
+
+        config = PexTestConfig()
+        for value in (2.0, 3.0):
+            config.a = value
+        self.assertIs(config.history["a"][-1][1][-1], config.history["a"][-2][1][-1])
+
+    def testHistoryLevelClassKeyword(self):
+        config = LastHistoryConfig()
+        config.a = 2.0
+        config.a = 3.0
+        config.b.append(2)
+        self.assertEqual([h[0] for h in config.history["a"]], [3.0])
+        self.assertEqual([h[0] for h in config.history["b"]], [[1, 2]])
+        self.assertEqual(config.history["a"][0][2], "assignment")
+        self.assertIn("config.a = 3.0", config.formatHistory("a", writeSourceLine=False))
+
+        config = NoHistoryConfig()
+        config.a = 2.0
+        config.b.append(2)
+        config.c.a = 5.0
+        self.assertEqual(config.a, 2.0)
+        self.assertEqual(config.b, [1, 2])
+        self.assertEqual(config.history["a"], [])
+        self.assertEqual(config.history["b"], [])
+        self.assertEqual(config.history["c"], [])
+        # The subconfig class does not set a level, so it records history.
+        self.assertEqual([h[0] for h in config.c.history["a"]], [1.0, 5.0])
+
+        with self.assertRaises(ValueError):
+
+            class BadConfig(pexConfig.Config, history="some"):
+                pass
+
+    def testHistoryLevelContext(self):
+        with pexConfig.historyLevel("off"):
+            config = PexTestConfig()
+            config.a = 2.0
+            self.assertEqual(config.history["a"], [])
+            # Classes with their own level are unaffected.
+            last = LastHistoryConfig()
+            last.a = 4.0
+            self.assertEqual(len(last.history["a"]), 1)
+        config.a = 3.0
+        self.assertEqual([h[0] for h in config.history["a"]], [3.0])
+
+        with pexConfig.historyLevel("last"):
+            config = PexTestConfig()
+            config.a = 2.0
+            config.a = 5.0
+        self.assertEqual([h[0] for h in config.history["a"]], [5.0])
+
+        with self.assertRaises(ValueError):
+            with pexConfig.historyLevel("everything"):
+                pass
+
+        # The level does not apply to other threads.
+        configs = []
+        with pexConfig.historyLevel("off"):
+            thread = threading.Thread(target=lambda: configs.append(PexTestConfig()))
+            thread.start()
+            thread.join()
+        self.assertEqual(len(configs[0].history["a"]), 1)
+
+    def testSingleCapture(self):
+        """Test that the call stack is captured once per user-level
+        operation, however deeply the operation nests.
+        """
+        getCallStack = pexConfig.config.getCallStack
+        with unittest.mock.patch.object(pexConfig.config, "getCallStack", wraps=getCallStack) as mock:
+            config = NestedConfig()
+            self.assertEqual(mock.call_count, 1)
+            mock.reset_mock()
+            config.a = PexTestConfig
+            self.assertEqual(mock.call_count, 1)
+            mock.reset_mock()
+            config.b = list(range(10))
+            self.assertEqual(mock.call_count, 1)
+            mock.reset_mock()
+            config.e = ["A"]
+            self.assertEqual(mock.call_count, 1)
+            mock.reset_mock()
+            config.f = PexTestConfig
+            self.assertEqual(mock.call_count, 1)
+            mock.reset_mock()
+            config.g = {"x": PexTestConfig, "y": PexTestConfig}
+            self.assertEqual(mock.call_count, 1)
+
+    def testContainerHistory(self):
+        """Test the history of list and dict fields, which is stored as
+        changes.
+        """
+        config = NestedConfig()
+        old = config.b
+        config.b.append(4)
+        config.b[0] = 0
+        del config.b[1]
+        config.b[1:] = [5, 6]
+        config.b = None
+        config.b = [7]
+        config.b.insert(0, 8)
+        # A proxy for an earlier value still records its own value.
+        old.append(9)
+        config.c["z"] = 3
+        del config.c["x"]
+        expected = [
+            [1, 2, 3],
+            [1, 2, 3, 4],
+            [0, 2, 3, 4],
+            [0, 3, 4],
+            [0, 5, 6],
+            None,
+            [7],
+            [8, 7],
+            [0, 5, 6, 9],
+        ]
+        history = config.history["b"]
+        self.assertEqual([h[0] for h in history], expected)
+        self.assertEqual([history[i][0] for i in range(len(history))], expected)
+        self.assertEqual([h[0] for h in history[-2:]], expected[-2:])
+        self.assertEqual(history[3][2], "delitem")
+        self.assertEqual(
+            [h[0] for h in config.history["c"]],
+            [{"x": 1, "y": 2}, {"x": 1, "y": 2, "z": 3}, {"y": 2, "z": 3}],
+        )
+        # Values read from the history are independent of the field.
+        history[-2][0].append(10)
+        self.assertEqual(history[-2][0], [8, 7])
+
+        config = LastHistoryConfig()
+        for i in range(2, 5):
+            config.b.append(i)
+        self.assertEqual(config.history["b"], [([1, 2, 3, 4], config.history["b"][0][1], "insert")])
+        config.b.append(5)
+        self.assertEqual(config.history["b"][0][0], [1, 2, 3, 4, 5])
+
 
 if __name__ == "__main__":
     unittest.main()
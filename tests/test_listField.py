@@ -28,6 +28,8 @@
 import pickle
 import unittest
 
+import numpy as np
+
 import lsst.pex.config as pexConfig
 
 
@@ -178,6 +180,19 @@ class ListFieldTest(unittest.TestCase):
         c.ls.append("foo")
         self.assertEqual(c.ls, ["hi", "foo"])
 
+    def testBulkAssignment(self):
+        c = Config2()
+        c.lf = np.arange(4.0)
+        self.assertEqual(c.lf, [0.0, 1.0, 2.0, 3.0])
+        self.assertIs(type(c.lf[0]), float)
+        c.lf = [1, 2.5, None]
+        self.assertEqual(c.lf, [1.0, 2.5, None])
+        self.assertIs(type(c.lf[0]), float)
+        self.assertRaises(pexConfig.FieldValidationError, setattr, c, "lf", [1.0, "2"])
+        self.assertRaises(pexConfig.FieldValidationError, setattr, c, "lf", np.arange(4, dtype=np.float32))
+        self.assertRaises(pexConfig.FieldValidationError, setattr, c, "lf", 4.0)
+        self.assertEqual(len(c.history["lf"]), 3)
+
     def testNoArbitraryAttributes(self):
         c = Config1()
         self.assertRaises(pexConfig.FieldValidationError, setattr, c.l1, "should", "fail")